@@ -0,0 +1,173 @@
+"""Versioned binary asset pack holding baked sprites and sound PCM.
+
+Layout: a fixed header (magic, format version, index length), a JSON index,
+then 16-byte aligned blobs. Sprites are stored as raw premultiplied BGRA
+pixels — pygame's native SRCALPHA layout — so surfaces wrap the
+memory-mapped file directly; PCM is stored as int16 samples. ``bake.py``
+writes the pack. A pack whose fingerprint does not match this build is
+ignored as a whole, and entries it lacks are rendered procedurally by the
+caller, so a stale or missing pack only costs speed.
+"""
+
+import functools
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+import pygame
+
+from config import ASSET_PACK_PATH, SPRITE_FADE_STEPS
+
+MAGIC = b'SBAP'
+FORMAT_VERSION = 1
+# The modules whose code draws the baked sprites, and the config they read:
+# editing any of them invalidates existing packs
+ART_SOURCES = ('renderer.py', 'background.py', 'particles.py', 'sprites.py', 'screens.py',
+               'config.py')
+
+_HEADER = struct.Struct('<4sII')  # magic, format version, index length
+_ALIGN = 16
+
+_default = None
+_default_loaded = False
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def fingerprint():
+    """Hash of everything that decides whether a pack's sprites are still valid.
+
+    That is the pack format, the fade steps and the source of
+    ``ART_SOURCES``, so a pack baked before any change to the drawing code
+    is ignored. Sound entries carry their own synthesis cache key instead.
+    """
+    digest = hashlib.sha1(json.dumps({
+        'format': FORMAT_VERSION, 'fade_steps': SPRITE_FADE_STEPS,
+    }, sort_keys=True).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ART_SOURCES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(name.encode())
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _aligned(n):
+    return -(-n // _ALIGN) * _ALIGN
+
+
+# ---------- Writing ----------
+
+def write(path, surfaces, pcm):
+    """Write a pack atomically.
+
+    Args:
+        surfaces: ``{sprite key: premultiplied SRCALPHA Surface}``.
+        pcm: ``{effect name: (cache key, int16 ndarray)}``.
+
+    Returns:
+        int: Size of the written file in bytes.
+    """
+    index = {'fingerprint': fingerprint(), 'sprites': {}, 'pcm': {}}
+    blobs = []
+    offset = 0
+    for key, surf in surfaces.items():
+        data = pygame.image.tobytes(surf, 'BGRA')
+        index['sprites'][repr(key)] = [offset, surf.get_width(), surf.get_height()]
+        blobs.append((offset, data))
+        offset = _aligned(offset + len(data))
+    for name, (key, samples) in pcm.items():
+        data = samples.astype('<i2').tobytes()
+        index['pcm'][name] = [offset, key, list(samples.shape)]
+        blobs.append((offset, data))
+        offset = _aligned(offset + len(data))
+
+    index_bytes = json.dumps(index, separators=(',', ':')).encode()
+    data_start = _aligned(_HEADER.size + len(index_bytes))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for blob_offset, data in blobs:
+            f.seek(data_start + blob_offset)
+            f.write(data)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return data_start + offset
+
+
+# ---------- Reading ----------
+
+class AssetPack:
+    """Read-only, memory-mapped view of a baked pack.
+
+    Raises ``OSError`` if the file can't be opened and ``ValueError`` if it
+    is not a pack for this build.
+    """
+
+    def __init__(self, path=ASSET_PACK_PATH):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} asset pack')
+        index = json.loads(self._map[_HEADER.size:_HEADER.size + index_len])
+        if index.get('fingerprint') != fingerprint():
+            raise ValueError(f'{path} was baked for a different build')
+        self.path = path
+        self._data = _aligned(_HEADER.size + index_len)
+        self._view = memoryview(self._map)
+        self._sprites = index['sprites']
+        self._pcm = index['pcm']
+
+    def __len__(self):
+        return len(self._sprites) + len(self._pcm)
+
+    def surface(self, key):
+        """Return a Surface sharing the pack's memory, or None if ``key`` is absent."""
+        entry = self._sprites.get(repr(key))
+        if entry is None:
+            return None
+        offset, w, h = entry
+        start = self._data + offset
+        return pygame.image.frombuffer(self._view[start:start + w * h * 4], (w, h), 'BGRA')
+
+    def pcm(self, name, key):
+        """Return an effect's int16 variants without copying, or None if absent or stale."""
+        entry = self._pcm.get(name)
+        if entry is None or entry[1] != key:
+            return None
+        import numpy as np
+
+        offset, _, shape = entry
+        count = 1
+        for n in shape:
+            count *= n
+        return np.frombuffer(self._map, '<i2', count, self._data + offset).reshape(shape)
+
+
+def default():
+    """Return the pack at ``ASSET_PACK_PATH``, opened on first use.
+
+    Returns:
+        AssetPack or None: None when the pack is missing, stale or disabled.
+    """
+    global _default, _default_loaded
+    with _lock:
+        if not _default_loaded:
+            try:
+                _default = AssetPack()
+            except (OSError, ValueError, KeyError, struct.error):
+                _default = None
+            _default_loaded = True
+        return _default
+
+
+def disable():
+    """Stop serving assets from the pack (used while baking a new one)."""
+    global _default, _default_loaded
+    with _lock:
+        _default, _default_loaded = None, True
@@ -5,6 +5,9 @@ import random
 
 import pygame
 
+import sprites
+from sprites import BLEND
+from renderqueue import RenderQueue, LAYER_GALAXY, LAYER_BACKGROUND
 from config import (
     SCREEN_WIDTH, SCREEN_HEIGHT,
     STAR_LAYER_CONFIGS,
@@ -14,8 +17,8 @@ from config import (
 
 # ---------- Starfield ----------
 
-def create_star_layers():
-    """Create three parallax star layers.
+def create_star_layers(density=1.0):
+    """Create three parallax star layers, with ``density`` times the configured stars.
 
     Returns:
         list of (speed, star_list) tuples.
@@ -23,7 +26,7 @@ def create_star_layers():
     layers = []
     for cfg in STAR_LAYER_CONFIGS:
         stars = []
-        for _ in range(cfg['count']):
+        for _ in range(round(cfg['count'] * density)):
             sx = random.randint(0, SCREEN_WIDTH)
             sy = random.randint(0, SCREEN_HEIGHT)
             lo, hi = cfg['bright_range']
@@ -34,31 +37,43 @@ def create_star_layers():
     return layers
 
 
-def update_and_draw_stars(surface, layers):
-    """Scroll stars downward and draw them."""
+def update_and_draw_stars(surface, layers, step=1, scale=1):
+    """Scroll stars downward by ``step`` frames' worth and draw them.
+
+    ``scale`` is the size of ``surface`` relative to the screen.
+    """
     for speed, stars in layers:
         for s in stars:
-            s[1] += speed
+            s[1] += speed * step
             if s[1] > SCREEN_HEIGHT:
                 s[0] = random.randint(0, SCREEN_WIDTH)
                 s[1] = random.randint(-20, 0)
                 s[2] = random.randint(100, 255)
             c = s[2]
-            pygame.draw.circle(surface, (c, c, c), (int(s[0]), int(s[1])), s[3])
+            pygame.draw.circle(surface, (c, c, c), (int(s[0] * scale), int(s[1] * scale)),
+                               max(1, round(s[3] * scale)))
 
 
 # ---------- Galaxy ----------
 
-def spawn_galaxy():
-    """Create a new galaxy dict positioned just above the screen."""
+GALAXY_TINTS = [
+    (90, 60, 160),
+    (60, 80, 170),
+    (160, 80, 100),
+    (70, 140, 160),
+]
+GALAXY_ARM_DOTS = 18
+
+
+def spawn_galaxy(arm_dots=GALAXY_ARM_DOTS):
+    """Create a new galaxy dict positioned just above the screen.
+
+    ``arm_dots`` (at most ``GALAXY_ARM_DOTS``) spiral arm dots are drawn
+    per arm, spread over the arm's full length.
+    """
     gx = random.randint(80, SCREEN_WIDTH - 80)
     radius = random.randint(40, 70)
-    tint = random.choice([
-        (90, 60, 160),
-        (60, 80, 170),
-        (160, 80, 100),
-        (70, 140, 160),
-    ])
+    tint = random.choice(GALAXY_TINTS)
     angle = random.uniform(0, math.pi * 2)
     return {
         'x': gx, 'y': -radius * 2,
@@ -66,133 +81,225 @@ def spawn_galaxy():
         'tint': tint,
         'angle': angle,
         'speed': random.uniform(0.25, 0.6),
+        'arm_dots': min(arm_dots, GALAXY_ARM_DOTS),
     }
 
 
-def draw_galaxy(surface, g):
-    """Draw a soft, glowing galaxy with spiral-arm hints."""
-    gx, gy, r = int(g['x']), int(g['y']), g['radius']
-    tr, tg_c, tb = g['tint']
-
-    # Outer glow rings
+def _build_galaxy_glow(r, tint):
+    size = int(r * 1.3) * 2
+    surf = sprites.canvas(size, size)
     for i in range(6, 0, -1):
         frac = i / 6.0
         ring_r = int(r * frac * 1.3)
         alpha = int(18 * frac)
-        color = (tr, tg_c, tb)
         glow_surf = pygame.Surface((ring_r * 2, ring_r * 2), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (*color, alpha), (ring_r, ring_r), ring_r)
-        surface.blit(glow_surf, (gx - ring_r, gy - ring_r))
+        pygame.draw.circle(glow_surf, (*tint, alpha), (ring_r, ring_r), ring_r)
+        sprites.layer(surf, glow_surf, (size // 2 - ring_r, size // 2 - ring_r))
+    return surf
+
+
+def _build_galaxy_dot(tint, j):
+    tr, tg_c, tb = tint
+    t = j / GALAXY_ARM_DOTS
+    dot_alpha = int(100 * (1 - t * 0.7))
+    dot_r = max(1, int(2 * (1 - t)))
+    dot_surf = pygame.Surface((dot_r * 2, dot_r * 2), pygame.SRCALPHA)
+    pygame.draw.circle(dot_surf, (tr + 40, tg_c + 40, min(255, tb + 60), dot_alpha),
+                       (dot_r, dot_r), dot_r)
+    return dot_surf.premul_alpha()
+
+
+def _build_galaxy_core():
+    core_surf = pygame.Surface((12, 12), pygame.SRCALPHA)
+    pygame.draw.circle(core_surf, (255, 255, 240, 90), (6, 6), 6)
+    pygame.draw.circle(core_surf, (255, 255, 255, 160), (6, 6), 3)
+    return core_surf.premul_alpha()
+
+
+def galaxy_dot_sprite(tint, j):
+    """Return the cached j-th spiral arm dot (fading outward) for a tint."""
+    return sprites.get(('galaxy_dot', tint, j), _build_galaxy_dot, tint, j)
+
+
+def submit_galaxy(queue, g, layer=LAYER_GALAXY):
+    """Queue a soft, glowing galaxy with spiral-arm hints."""
+    gx, gy, r = int(g['x']), int(g['y']), g['radius']
+    tint = g['tint']
+
+    # Outer glow rings
+    items = []
+    if sprites.glow:
+        glow = sprites.get(('galaxy_glow', r, tint), _build_galaxy_glow, r, tint)
+        half = glow.get_width() // 2
+        items.append((glow, (gx - half, gy - half), None, BLEND))
 
     # Spiral arm dots
     arm_count = 2
     for arm in range(arm_count):
         base_angle = g['angle'] + arm * math.pi
-        for j in range(18):
-            t = j / 18.0
+        for i in range(g['arm_dots']):
+            j = i * GALAXY_ARM_DOTS // g['arm_dots']
+            t = j / GALAXY_ARM_DOTS
             dist = r * 0.2 + r * 0.9 * t
             a = base_angle + t * 2.8
             dx = int(gx + math.cos(a) * dist)
             dy = int(gy + math.sin(a) * dist * 0.55)
-            dot_alpha = int(100 * (1 - t * 0.7))
             dot_r = max(1, int(2 * (1 - t)))
-            dot_surf = pygame.Surface((dot_r * 2, dot_r * 2), pygame.SRCALPHA)
-            pygame.draw.circle(dot_surf, (tr + 40, tg_c + 40, min(255, tb + 60), dot_alpha),
-                               (dot_r, dot_r), dot_r)
-            surface.blit(dot_surf, (dx - dot_r, dy - dot_r))
+            items.append((galaxy_dot_sprite(tint, j), (dx - dot_r, dy - dot_r), None, BLEND))
 
     # Bright core
-    core_surf = pygame.Surface((12, 12), pygame.SRCALPHA)
-    pygame.draw.circle(core_surf, (255, 255, 240, 90), (6, 6), 6)
-    pygame.draw.circle(core_surf, (255, 255, 255, 160), (6, 6), 3)
-    surface.blit(core_surf, (gx - 6, gy - 6))
+    items.append((sprites.get(('galaxy_core',), _build_galaxy_core), (gx - 6, gy - 6),
+                  None, BLEND))
+    queue.blits(layer, items)
+
+
+def draw_galaxy(surface, g):
+    """Draw a soft, glowing galaxy with spiral-arm hints."""
+    queue = RenderQueue(surface.get_rect())
+    submit_galaxy(queue, g)
+    queue.flush(surface)
 
 
 # ---------- Celestial Bodies ----------
 
+# Fixed look per celestial type; 'radius' is the (min, max) spawn range
+CELESTIAL_TYPES = {
+    'moon': {'radius': (20, 35), 'color': (160, 160, 150), 'shadow': (100, 100, 95)},
+    'gas_planet': {'radius': (50, 70), 'color': (80, 60, 160),
+                   'bands': [(100, 80, 180), (60, 40, 140), (90, 70, 170)]},
+    'rocky_planet': {'radius': (35, 50), 'color': (160, 70, 40), 'shadow': (100, 40, 25)},
+    'ringed_planet': {'radius': (40, 55), 'color': (60, 160, 150), 'ring_color': (180, 160, 80)},
+    'dark_planet': {'radius': (55, 75), 'color': (30, 10, 35), 'glow': (200, 50, 200)},
+}
+
+
 def spawn_celestial(cel_type):
     """Create a celestial body dict based on type."""
     x = random.randint(80, SCREEN_WIDTH - 80)
     obj = {'x': float(x), 'y': -120.0, 'speed': random.uniform(0.15, 0.35), 'type': cel_type}
-
-    if cel_type == 'moon':
-        obj['radius'] = random.randint(20, 35)
-        obj['color'] = (160, 160, 150)
-        obj['shadow'] = (100, 100, 95)
-    elif cel_type == 'gas_planet':
-        obj['radius'] = random.randint(50, 70)
-        obj['color'] = (80, 60, 160)
-        obj['bands'] = [(100, 80, 180), (60, 40, 140), (90, 70, 170)]
-    elif cel_type == 'rocky_planet':
-        obj['radius'] = random.randint(35, 50)
-        obj['color'] = (160, 70, 40)
-        obj['shadow'] = (100, 40, 25)
+    obj.update(CELESTIAL_TYPES[cel_type])
+    obj['radius'] = random.randint(*obj['radius'])
+    if cel_type == 'rocky_planet':
         obj['moon_offset'] = (random.randint(40, 60), random.randint(-20, 20))
         obj['moon_radius'] = random.randint(6, 10)
-    elif cel_type == 'ringed_planet':
-        obj['radius'] = random.randint(40, 55)
-        obj['color'] = (60, 160, 150)
-        obj['ring_color'] = (180, 160, 80)
-    elif cel_type == 'dark_planet':
-        obj['radius'] = random.randint(55, 75)
-        obj['color'] = (30, 10, 35)
-        obj['glow'] = (200, 50, 200)
-
     return obj
 
 
-def draw_celestial(surface, obj):
-    """Draw a celestial body on the surface."""
-    cx, cy, r = int(obj['x']), int(obj['y']), obj['radius']
-    t = obj['type']
+def _celestial_extent(cel_type, r):
+    """Half width and half height of a celestial body's sprite."""
+    if cel_type == 'gas_planet':
+        return r * 3 // 2, r * 3 // 2
+    if cel_type == 'ringed_planet':
+        return r * 2, r
+    if cel_type == 'dark_planet':
+        return r + 8, r + 8
+    return r * 3 // 2, r * 3 // 2  # moon, rocky planet: body plus offset shadow
+
+
+def _draw_celestial_body(surface, cel_type, cx, cy, r, glow=True):
+    """Draw the static part of a celestial body centered on (cx, cy)."""
+    obj = CELESTIAL_TYPES[cel_type]
 
-    if t == 'moon':
+    if cel_type == 'moon':
         pygame.draw.circle(surface, obj['color'], (cx, cy), r)
         pygame.draw.circle(surface, obj['shadow'], (cx + r // 4, cy - r // 6), r - 2)
         for offset in [(r // 3, -r // 4), (-r // 4, r // 3), (0, 0)]:
             cr = max(2, r // 8)
             pygame.draw.circle(surface, obj['shadow'], (cx + offset[0], cy + offset[1]), cr)
 
-    elif t == 'gas_planet':
-        glow_s = pygame.Surface((r * 3, r * 3), pygame.SRCALPHA)
-        pygame.draw.circle(glow_s, (*obj['color'], 25), (r * 3 // 2, r * 3 // 2), r * 3 // 2)
-        surface.blit(glow_s, (cx - r * 3 // 2, cy - r * 3 // 2))
+    elif cel_type == 'gas_planet':
+        if glow:
+            glow_s = pygame.Surface((r * 3, r * 3), pygame.SRCALPHA)
+            pygame.draw.circle(glow_s, (*obj['color'], 25), (r * 3 // 2, r * 3 // 2), r * 3 // 2)
+            sprites.layer(surface, glow_s, (cx - r * 3 // 2, cy - r * 3 // 2))
         pygame.draw.circle(surface, obj['color'], (cx, cy), r)
         for i, band_color in enumerate(obj['bands']):
             band_y = cy - r // 2 + i * (r // 2)
             band_s = pygame.Surface((r * 2, r // 4), pygame.SRCALPHA)
             pygame.draw.ellipse(band_s, (*band_color, 80), (0, 0, r * 2, r // 4))
-            surface.blit(band_s, (cx - r, band_y))
+            sprites.layer(surface, band_s, (cx - r, band_y))
 
-    elif t == 'rocky_planet':
+    elif cel_type == 'rocky_planet':
         pygame.draw.circle(surface, obj['color'], (cx, cy), r)
         pygame.draw.circle(surface, obj['shadow'], (cx + r // 3, cy - r // 5), r - 3)
         for dx, dy, cr in [(-r//3, r//4, r//6), (r//4, -r//3, r//7), (0, r//5, r//5)]:
             pygame.draw.circle(surface, (140, 55, 30), (cx + dx, cy + dy), max(2, cr))
-        mx = cx + obj['moon_offset'][0]
-        my = cy + obj['moon_offset'][1]
-        pygame.draw.circle(surface, (140, 140, 130), (mx, my), obj['moon_radius'])
-        pygame.draw.circle(surface, (100, 100, 95), (mx + 2, my - 1), obj['moon_radius'] - 1)
 
-    elif t == 'ringed_planet':
+    elif cel_type == 'ringed_planet':
         ring_s = pygame.Surface((r * 4, r * 2), pygame.SRCALPHA)
         pygame.draw.ellipse(ring_s, (*obj['ring_color'], 60), (0, r // 2, r * 4, r))
         pygame.draw.ellipse(ring_s, (0, 0, 0, 0), (r // 2, r // 2 + r // 4, r * 3, r // 2))
-        surface.blit(ring_s, (cx - r * 2, cy - r))
+        sprites.layer(surface, ring_s, (cx - r * 2, cy - r))
         pygame.draw.circle(surface, obj['color'], (cx, cy), r)
         hl_s = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
         pygame.draw.circle(hl_s, (255, 255, 255, 20), (r, r), r)
         pygame.draw.circle(hl_s, (255, 255, 255, 40), (r - r // 4, r - r // 4), r // 2)
-        surface.blit(hl_s, (cx - r, cy - r))
+        sprites.layer(surface, hl_s, (cx - r, cy - r))
 
-    elif t == 'dark_planet':
-        for i in range(5):
+    elif cel_type == 'dark_planet':
+        for i in range(5 if glow else 0):
             gr = r + 8 - i * 2
             g_s = pygame.Surface((gr * 2, gr * 2), pygame.SRCALPHA)
             pygame.draw.circle(g_s, (*obj['glow'], 15 + i * 8), (gr, gr), gr)
-            surface.blit(g_s, (cx - gr, cy - gr))
+            sprites.layer(surface, g_s, (cx - gr, cy - gr))
         pygame.draw.circle(surface, obj['color'], (cx, cy), r)
+
+
+def _build_celestial(cel_type, r, glow):
+    hw, hh = _celestial_extent(cel_type, r)
+    surf = sprites.canvas(hw * 2, hh * 2)
+    _draw_celestial_body(surf, cel_type, hw, hh, r, glow)
+    return surf
+
+
+def celestial_sprite(cel_type, r):
+    """Return the cached static part of a celestial body of the given radius."""
+    return sprites.get(('celestial', cel_type, r, sprites.glow), _build_celestial, cel_type, r,
+                       sprites.glow)
+
+
+def _draw_celestial_details(surface, transform, obj, spots):
+    """Draw the parts of a celestial body that change between frames.
+
+    Returns:
+        pygame.Rect: The area drawn.
+    """
+    dx, dy, scale = transform
+    cx, cy = int(obj['x']) + dx, int(obj['y']) + dy
+
+    def circle(color, x, y, r):
+        return pygame.draw.circle(surface, color, (x * scale, y * scale), max(1, r * scale))
+
+    dirty = []
+    if obj['type'] == 'rocky_planet':
+        mx = cx + obj['moon_offset'][0]
+        my = cy + obj['moon_offset'][1]
+        dirty.append(circle((140, 140, 130), mx, my, obj['moon_radius']))
+        circle((100, 100, 95), mx + 2, my - 1, obj['moon_radius'] - 1)
+    for tx, ty, tr in spots:
+        dirty.append(circle((40, 15, 45), cx + tx, cy + ty, tr))
+    return dirty[0].unionall(dirty[1:])
+
+
+def submit_celestial(queue, obj, layer=LAYER_BACKGROUND):
+    """Queue a celestial body: its cached sprite, then its moon or shifting spots."""
+    cx, cy, r = int(obj['x']), int(obj['y']), obj['radius']
+    t = obj['type']
+
+    hw, hh = _celestial_extent(t, r)
+    queue.blit(layer, celestial_sprite(t, r), (cx - hw, cy - hh))
+
+    spots = []
+    if t == 'dark_planet':
         for _ in range(4):
-            tx = cx + random.randint(-r // 2, r // 2)
-            ty = cy + random.randint(-r // 2, r // 2)
-            pygame.draw.circle(surface, (40, 15, 45), (tx, ty), random.randint(3, 8))
+            spots.append((random.randint(-r // 2, r // 2), random.randint(-r // 2, r // 2),
+                          random.randint(3, 8)))
+    if t == 'rocky_planet' or spots:
+        queue.call(layer, _draw_celestial_details, obj, spots)
+
+
+def draw_celestial(surface, obj):
+    """Draw a celestial body on the surface."""
+    queue = RenderQueue(surface.get_rect())
+    submit_celestial(queue, obj)
+    queue.flush(surface)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Bake every deterministic sprite and sound effect into the asset pack.
+
+The game reads the pack through a memory map at runtime instead of drawing
+and synthesizing these assets on each launch. Re-run after changing art,
+stage colors or sound parameters (the release workflow bakes before
+packaging); an out-of-date pack is ignored, never wrong.
+
+Usage:
+    python bake.py [--output assets/assets.pack]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+import assetpack  # noqa: E402
+import sprites  # noqa: E402
+from config import (  # noqa: E402
+    ASSET_PACK_PATH, SPRITE_FADE_STEPS,
+    PLAYER_WIDTH, PLAYER_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT,
+    BULLET_WIDTH, BULLET_HEIGHT, ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT,
+    STAGE_CONFIGS, ENEMY_EXPLOSION_COLORS, PLAYER_EXPLOSION_COLORS,
+)
+
+# Largest smoke puff: max start size plus growth over the longest lifetime
+MAX_SMOKE_SIZE = 34
+
+
+def bake_sprites():
+    """Render every deterministic sprite into the sprite cache."""
+    import renderer
+    import background
+    import particles
+
+    # Ships, lasers and the stages' celestial bodies, with their own glow
+    # and without it (for the bloom pass)
+    for glow in (True, False):
+        sprites.set_glow(glow)
+        renderer.player_sprite(PLAYER_WIDTH, PLAYER_HEIGHT)
+        for cfg in STAGE_CONFIGS:
+            renderer.enemy_sprite(ENEMY_WIDTH, ENEMY_HEIGHT, cfg['enemy_body'], cfg['enemy_wing'])
+        renderer.laser_sprite(BULLET_WIDTH, BULLET_HEIGHT)
+        renderer.laser_sprite(ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT, enemy=True)
+        for cel_type in {cfg['celestial'] for cfg in STAGE_CONFIGS}:
+            lo, hi = background.CELESTIAL_TYPES[cel_type]['radius']
+            for r in range(lo, hi + 1):
+                background.celestial_sprite(cel_type, r)
+    sprites.set_glow(True)
+
+    # Engine halo, laser sparks, HUD
+    renderer.player_halo_sprite(PLAYER_WIDTH)
+    lo, hi = renderer.SPARK_ALPHA_RANGE
+    for alpha in range(lo, hi + 1):
+        renderer.spark_sprite(renderer.LASER_SPARK_COLOR, alpha)
+        renderer.spark_sprite(renderer.ENEMY_LASER_SPARK_COLOR, alpha)
+    renderer.heart_sprite()
+
+    # Galaxy arm dots
+    for tint in background.GALAXY_TINTS:
+        for j in range(background.GALAXY_ARM_DOTS):
+            background.galaxy_dot_sprite(tint, j)
+
+    # Explosion particles at every fade level
+    for level in range(SPRITE_FADE_STEPS + 1):
+        for color in ENEMY_EXPLOSION_COLORS + PLAYER_EXPLOSION_COLORS:
+            for sz in range(1, 6):
+                particles.particle_sprite(color, sz, level)
+        for radius in (1, 2):
+            particles.spark_tip_sprite(radius, level)
+        for sz in range(6, MAX_SMOKE_SIZE + 1):
+            particles.smoke_sprite(sz, level)
+    return sprites.cached()
+
+
+def bake_sounds():
+    """Synthesize every sound effect.
+
+    Returns:
+        dict: ``{name: (cache key, int16 variants)}``; empty without numpy.
+    """
+    from sound import SOUND_EFFECTS, synthesize, cache_key
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print('Note: numpy not found — baking sprites only.')
+        return {}
+    return {name: (cache_key(name), synthesize(name)) for name in SOUND_EFFECTS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=ASSET_PACK_PATH, help='pack file to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pygame.display.init()
+    assetpack.disable()  # render from scratch rather than copying an old pack
+    surfaces = bake_sprites()
+    pcm = bake_sounds()
+    size = assetpack.write(args.output, surfaces, pcm)
+    print(f'Baked {len(surfaces)} sprites and {len(pcm)} sounds into {args.output} '
+          f'({size / 1e6:.1f} MB, fingerprint {assetpack.fingerprint()}) '
+          f'in {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for Space Blaster.
+
+Usage:
+    python benchmarks.py env [--envs 4096] [--steps 300] [--workers 0]
+    python benchmarks.py observation [--envs 4096] [--steps 300]
+    python benchmarks.py sound
+    python benchmarks.py bloom [--steps 300]
+    python benchmarks.py endless [--steps 300] [--projectiles 2000]
+    python benchmarks.py pacing [--steps 300] [--work-ms 8]
+    python benchmarks.py record [--steps 300]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+
+# ---------- Scenarios ----------
+
+def bench_env(args):
+    """Throughput of the batched training environment (steps per second)."""
+    from env import BatchEnv, ShardedBatchEnv, NUM_ACTIONS
+
+    rng = np.random.default_rng(0)
+    if args.workers:
+        env = ShardedBatchEnv(args.envs, num_workers=args.workers, seed=0)
+    else:
+        env = BatchEnv(args.envs, seed=0)
+    try:
+        env.reset()
+        for _ in range(10):  # warm-up
+            env.step(rng.integers(0, NUM_ACTIONS, args.envs))
+        actions = [rng.integers(0, NUM_ACTIONS, args.envs) for _ in range(args.steps)]
+        start = time.perf_counter()
+        for a in actions:
+            env.step(a)
+        elapsed = time.perf_counter() - start
+    finally:
+        if args.workers:
+            env.close()
+
+    total = args.envs * args.steps
+    mode = f'{args.workers} workers' if args.workers else 'in-process'
+    print(f'env: {args.envs} instances x {args.steps} steps ({mode})')
+    print(f'  {total / elapsed:,.0f} env steps/s  '
+          f'({elapsed / args.steps * 1000:.2f} ms per batch step)')
+
+
+def bench_observation(args):
+    """Cost of rasterizing occupancy observations from the batched env."""
+    from env import BatchEnv, NUM_ACTIONS
+    from observation import ObservationRenderer
+
+    rng = np.random.default_rng(0)
+    env = BatchEnv(args.envs, seed=0)
+    for _ in range(120):  # let enemies and bullets populate the screen
+        env.step(rng.integers(0, NUM_ACTIONS, args.envs))
+    renderer = ObservationRenderer()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        renderer.render_batch(env)
+    elapsed = time.perf_counter() - start
+
+    per_frame = elapsed / (args.steps * args.envs) * 1e6
+    print(f'observation: {args.envs} instances x {args.steps} frames '
+          f'({renderer.width}x{renderer.height})')
+    print(f'  {per_frame:.2f} us per instance frame')
+
+
+def bench_sound(args):
+    """Cold (synthesize + write cache) vs. warm (load cache) sound bank startup."""
+    import os
+    import tempfile
+
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from sound import SoundBank
+
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ('cold', 'warm'):
+            bank = SoundBank(cache_dir=cache_dir)
+            start = time.perf_counter()
+            bank.preload()
+            total = time.perf_counter() - start
+            detail = ', '.join(f'{name} {src} {sec * 1000:.2f} ms'
+                               for name, (src, sec) in bank.timings.items())
+            print(f'sound {label}: {total * 1000:.2f} ms total ({detail})')
+    pygame.mixer.quit()
+
+
+def bench_bloom(args):
+    """Cost of the bloom pass over an empty and a crowded 800x600 frame."""
+    import os
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from bloom import Bloom
+    from config import SCREEN_WIDTH, SCREEN_HEIGHT
+    from renderer import laser_sprite
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    bloom = Bloom((SCREEN_WIDTH, SCREEN_HEIGHT))
+    beam = laser_sprite(4, 15)
+    rng = np.random.default_rng(0)
+    for count in (0, 500):
+        screen.fill((5, 5, 20))
+        screen.blits([(beam, (int(x), int(y)), None, pygame.BLEND_PREMULTIPLIED)
+                      for x, y in rng.random((count, 2)) * (SCREEN_WIDTH, SCREEN_HEIGHT)])
+        frame = screen.copy()
+        elapsed = 0.0
+        for _ in range(args.steps):
+            screen.blit(frame, (0, 0))
+            start = time.perf_counter()
+            bloom.apply(screen)
+            elapsed += time.perf_counter() - start
+        print(f'bloom: {count} sprites  {elapsed / args.steps * 1000:.2f} ms per frame')
+    pygame.display.quit()
+
+
+ENDLESS_BENCH_STAGE = 30      # deep enough into endless mode for every difficulty cap
+ENDLESS_TARGET_PROJECTILES = 2000  # throughput target: this many live lasers on average...
+# ...updated and drawn within the 1 / FPS frame budget, on average
+
+
+def bench_endless(args):
+    """Frame time of endless mode at full density against the 60 FPS budget.
+
+    The game runs at its real frame rate (spawning and firing are timed in
+    ms), starting from a screen filled with enemies and ``--projectiles``
+    enemy lasers, with an invincible player firing a stream of lasers.
+    The target is met when the mean frame fits the budget; the 99th
+    percentile frame shows the hitches the average hides, and is called
+    out when it does not fit.
+    """
+    import os
+    import random
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from config import (
+        FPS, SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, ENEMY_HEIGHT,
+        BULLET_WIDTH, BULLET_HEIGHT, ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT,
+    )
+    from game import Game
+
+    random.seed(0)
+    game = Game(endless=True)
+    game.reset()
+    game.stage = ENDLESS_BENCH_STAGE
+    game.apply_stage_config()
+    crossing = int((SCREEN_HEIGHT + ENEMY_HEIGHT) / game.enemy_speed)  # frames
+    for _ in range(args.projectiles // 8):
+        game.enemies.extend(game.formations.spawn('single', game.enemy_speed,
+                                                  advance=random.randrange(crossing)))
+    for _ in range(args.projectiles):
+        game.enemy_bullets.append(pygame.Rect(random.randrange(SCREEN_WIDTH),
+                                              random.randrange(SCREEN_HEIGHT),
+                                              ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT))
+
+    budget = 1000 / FPS
+    update_ms, draw_ms, live = [], [], []
+    for frame in range(30 + args.steps):  # the first 30 frames warm up caches
+        game.invincible.start(2)
+        if frame % 6 == 0:
+            game.player_x = random.randrange(SCREEN_WIDTH - PLAYER_WIDTH)
+            game.bullets.append(pygame.Rect(game.player_x + PLAYER_WIDTH // 2, game.player_y,
+                                            BULLET_WIDTH, BULLET_HEIGHT))
+        pygame.event.pump()
+        start = time.perf_counter()
+        game.update()
+        mid = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+        if frame >= 30:
+            update_ms.append((mid - start) * 1000)
+            draw_ms.append((end - mid) * 1000)
+            live.append(len(game.enemy_bullets) + len(game.bullets))
+        game.pacer.tick(FPS)
+
+    frame_ms = sorted(u + d for u, d in zip(update_ms, draw_ms))
+    mean = sum(frame_ms) / args.steps
+    p99 = frame_ms[min(len(frame_ms) - 1, len(frame_ms) * 99 // 100)]
+    projectiles = sum(live) / args.steps
+    if mean > budget or projectiles < ENDLESS_TARGET_PROJECTILES:
+        verdict = 'MISSED'
+    elif p99 > budget:
+        verdict = 'met on average, but the p99 frame is over budget'
+    else:
+        verdict = 'met'
+    print(f'endless: stage {game.stage}, {args.steps} frames, {projectiles:,.0f} live projectiles '
+          f'({min(live):,}-{max(live):,}), {len(game.enemies)} enemies at the end')
+    print(f'  update {sum(update_ms) / args.steps:.2f} ms + draw {sum(draw_ms) / args.steps:.2f} '
+          f'ms = {mean:.2f} ms per frame (p99 {p99:.2f} ms)')
+    print(f'  target {ENDLESS_TARGET_PROJECTILES:,}+ projectiles in {budget:.1f} ms '
+          f'({FPS} FPS): {verdict}')
+    pygame.quit()
+
+
+def bench_pacing(args):
+    """Frame delivery of ``Clock.tick`` vs. ``FramePacer`` under a steady workload.
+
+    Each frame busy-waits ``--work-ms`` to stand in for update and draw,
+    so every frame fits the budget and any jitter is the pacing's own.
+    """
+    import os
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from config import FPS
+    from pacing import FramePacer
+
+    def work():
+        end = time.perf_counter() + args.work_ms / 1000
+        while time.perf_counter() < end:
+            pass
+
+    pygame.init()
+    period = 1000 / FPS
+    clock = pygame.time.Clock()
+    clock.tick(FPS)
+    last, jitter = time.perf_counter(), []
+    for _ in range(args.steps):
+        work()
+        clock.tick(FPS)
+        now = time.perf_counter()
+        jitter.append(abs((now - last) * 1000 - period))
+        last = now
+    jitter.sort()
+    print(f'pacing: Clock.tick      mean jitter {sum(jitter) / len(jitter):.3f} ms, '
+          f'p99 {jitter[len(jitter) * 99 // 100]:.3f} ms, worst {jitter[-1]:.3f} ms')
+
+    pacer = FramePacer(report=True)
+    pacer.tick(FPS, record=False)
+    for _ in range(args.steps):
+        work()
+        pacer.tick(FPS)
+    s = pacer.stats()
+    print(f'pacing: FramePacer      mean jitter {s["mean_jitter_ms"]:.3f} ms, '
+          f'worst {s["worst_jitter_ms"]:.3f} ms')
+    pacer.report()
+    pygame.quit()
+
+
+def bench_record(args):
+    """Main-thread cost and dropped frames of recording gameplay at 60 FPS."""
+    import os
+    import tempfile
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from config import FPS
+    from game import Game
+    from recorder import FORMATS, start_recording
+
+    game = Game()
+    game.reset()
+    for fmt in FORMATS:
+        with tempfile.TemporaryDirectory() as out_dir:
+            recorder = start_recording(game.display.frame(), fmt, out_dir)
+            for _ in range(args.steps):
+                pygame.event.pump()
+                game.update()
+                game.draw()
+                recorder.capture(game.display.frame())
+                game.pacer.tick(FPS)
+            started = time.perf_counter()
+            stats = recorder.close()
+            flush = time.perf_counter() - started
+        print(f'record {fmt}: {args.steps} frames, {stats["dropped"]} dropped, capture '
+              f'{stats["mean_capture_ms"]:.3f} ms mean / {stats["p99_capture_ms"]:.3f} ms p99 / '
+              f'{stats["max_capture_ms"]:.3f} ms max on the game loop, {stats["failed"]} failed, '
+              f'{flush * 1000:.0f} ms to finish writing')
+    pygame.quit()
+
+
+SCENARIOS = {
+    'env': bench_env,
+    'observation': bench_observation,
+    'sound': bench_sound,
+    'bloom': bench_bloom,
+    'endless': bench_endless,
+    'pacing': bench_pacing,
+    'record': bench_record,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenario', choices=sorted(SCENARIOS))
+    parser.add_argument('--envs', type=int, default=4096, help='batch size (env, observation)')
+    parser.add_argument('--steps', type=int, default=300,
+                        help='steps to time (env, observation, bloom, endless, pacing, '
+                             'record)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes, 0 = in-process (env)')
+    parser.add_argument('--projectiles', type=int, default=2000,
+                        help='enemy lasers on screen at the start (endless)')
+    parser.add_argument('--work-ms', type=float, default=8,
+                        help='simulated work per frame in ms (pacing)')
+    args = parser.parse_args()
+    SCENARIOS[args.scenario](args)
+
+
+if __name__ == '__main__':
+    main()
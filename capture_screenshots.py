@@ -13,10 +13,12 @@ pygame.init()
 pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
 
 from config import SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT, STAGE_CONFIGS
-from screens import Fonts, BUTTON_RECT, draw_title_screen, draw_hud, draw_game_over_screen
+from screens import (Fonts, BUTTON_RECT, draw_title_screen, submit_title_ship, draw_hud,
+                     draw_game_over_screen)
 from renderer import draw_player_ship, draw_enemy_ship, draw_laser, draw_enemy_laser
 from background import create_star_layers, update_and_draw_stars, spawn_galaxy, draw_galaxy
 from particles import ParticleSystem
+from renderqueue import RenderQueue
 
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 fonts = Fonts()
@@ -40,9 +42,11 @@ draw_bg(screen)
 galaxy = spawn_galaxy()
 galaxy['y'] = SCREEN_HEIGHT * 0.6
 draw_galaxy(screen, galaxy)
+queue = RenderQueue(screen.get_rect())
+submit_title_ship(queue, 60, PLAYER_WIDTH, PLAYER_HEIGHT)
+queue.flush(screen)
 draw_title_screen(screen, fonts, [5200, 4100, 3800, 2500, 1200],
-                  (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80), 60,
-                  PLAYER_WIDTH, PLAYER_HEIGHT)
+                  (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80), 60)
 pygame.image.save(screen, os.path.join(out_dir, 'title_screen.png'))
 print('Saved title_screen.png')
 
@@ -4,11 +4,21 @@ import os
 
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FONT_PATH = os.path.join(_BASE_DIR, 'assets', 'PressStart2P-Regular.ttf')
+SOUND_CACHE_DIR = os.path.join(_BASE_DIR, '.soundcache')
+ASSET_PACK_PATH = os.path.join(_BASE_DIR, 'assets', 'assets.pack')  # written by bake.py
+SETTINGS_PATH = os.path.join(_BASE_DIR, 'settings.json')  # saved quality preset
+RECORD_DIR = os.path.join(_BASE_DIR, 'recordings')  # one directory per recording
 
 # ---------- Display ----------
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+MENU_FPS = 30   # title screen (attract mode)
+IDLE_FPS = 10   # static menus: paused, and game over once the explosion settles
+SHAKE_MAX = 18  # strongest screen shake (player death), in pixels
+RENDER_BACKEND = 'software'  # or 'gpu': SDL renderer textures (see gpu.py)
+VSYNC = False          # wait for the display's refresh on present, where supported
+PACING_SPIN_MS = 0.75  # spin-wait (instead of sleeping) for the last part of a frame
 TITLE = 'Space Blaster'
 
 # ---------- Player ----------
@@ -36,10 +46,50 @@ ENEMY_SPEED_DEFAULT = 2
 ENEMY_SPAWN_TIME_DEFAULT = 2000  # ms
 ENEMY_FIRE_CHANCE_DEFAULT = 0.004
 
+# Formations (see formations.py): each stage's 'formations' weights pick
+# the pattern of every wave
+FORMATION_SINE_SHIPS = 3         # ships per weaving column
+FORMATION_SINE_LAG = 14          # frames between them
+FORMATION_SINE_AMPLITUDE = 70    # px either side of the spawn column
+FORMATION_SINE_WAVELENGTH = 260  # px of descent per full weave
+FORMATION_V_SHIPS = 5            # ships per V (odd: one leads)
+FORMATION_V_SPACING = 56         # px across between neighbours
+FORMATION_V_LAG = 12             # frames each rank trails the one ahead
+FORMATION_DIVE_HOLD_Y = 120      # divers cruise down to here...
+FORMATION_DIVE_CRUISE = 0.5      # ...at this fraction of the stage speed,
+FORMATION_DIVE_PAUSE = 40        # hover this many frames...
+FORMATION_DIVE_SPEED = 2.5       # ...then dive at this multiple of it,
+FORMATION_DIVE_SWERVE = 180      # swerving this far (px) toward the player
+
+# ---------- Sound ----------
+SAMPLE_RATE = 44100
+# Pitch / decay multipliers for the variants generated per effect
+SOUND_VARIANT_PITCH = (1.0, 0.94, 1.06, 0.89, 1.12)
+SOUND_VARIANT_DECAY = (1.0, 1.08, 0.93, 1.15, 0.88)
+SOUND_PAN_STEPS = 5        # pre-panned copies per variant, left to right
+SOUND_PAN_WIDTH = 0.7      # 1.0 = hard left/right at the screen edges
+SOUND_CHANNELS = 6         # mixer channels shared by all effects
+# Per-effect voice limits: max simultaneous voices, priority (higher may
+# steal a channel from lower) and minimum ms between starts
+SOUND_VOICES = {
+    'laser': {'cap': 3, 'priority': 1, 'min_interval': 45},
+    'explosion': {'cap': 3, 'priority': 2, 'min_interval': 30},
+    'hit': {'cap': 2, 'priority': 3, 'min_interval': 0},
+}
+
+# ---------- Music ----------
+# Stage music is described by the 'music' entry of each stage config:
+# tempo in BPM, root note in Hz and intensity (0..1, adds drums and layers)
+MUSIC_CHANNEL = SOUND_CHANNELS   # first channel after the effect pool
+MUSIC_CHUNK_SECONDS = 0.5
+MUSIC_QUEUE_CHUNKS = 3           # synthesized chunks buffered ahead
+MUSIC_VOLUME = 0.25
+
 # ---------- Scoring ----------
 SCORE_PER_KILL = 100
 SCORE_PENALTY_ESCAPE = 50
 MAX_HIGH_SCORES = 5
+LEADERBOARD_INDEX_SIZE = 100  # records kept in the on-disk top-N index (overall and per stage)
 
 # ---------- Stage / Difficulty ----------
 STAGE_DURATION = 30_000  # ms per stage
@@ -49,34 +99,56 @@ STAGE_CONFIGS = [
         'bg': (4, 4, 18),
         'enemy_body': (220, 40, 40), 'enemy_wing': (180, 30, 30),
         'enemy_speed': 2, 'spawn_time': 2000, 'fire_chance': 0.004,
+        'formations': {'single': 4, 'sine': 1},
         'celestial': 'moon',
+        'music': {'tempo': 112, 'root': 110.0, 'intensity': 0.3},
     },
     {  # Stage 2
         'bg': (10, 4, 24),
         'enemy_body': (40, 180, 220), 'enemy_wing': (30, 130, 180),
         'enemy_speed': 2.5, 'spawn_time': 1700, 'fire_chance': 0.006,
+        'formations': {'single': 3, 'sine': 2, 'v': 1},
         'celestial': 'gas_planet',
+        'music': {'tempo': 120, 'root': 123.47, 'intensity': 0.45},
     },
     {  # Stage 3
         'bg': (18, 8, 8),
         'enemy_body': (50, 220, 50), 'enemy_wing': (30, 160, 30),
         'enemy_speed': 3, 'spawn_time': 1400, 'fire_chance': 0.008,
+        'formations': {'single': 2, 'sine': 2, 'v': 1, 'dive': 1},
         'celestial': 'rocky_planet',
+        'music': {'tempo': 128, 'root': 98.0, 'intensity': 0.6},
     },
     {  # Stage 4
         'bg': (4, 14, 14),
         'enemy_body': (220, 160, 40), 'enemy_wing': (180, 120, 30),
         'enemy_speed': 3.5, 'spawn_time': 1100, 'fire_chance': 0.010,
+        'formations': {'single': 2, 'sine': 2, 'v': 2, 'dive': 2},
         'celestial': 'ringed_planet',
+        'music': {'tempo': 136, 'root': 130.81, 'intensity': 0.75},
     },
     {  # Stage 5
         'bg': (14, 4, 18),
         'enemy_body': (200, 50, 200), 'enemy_wing': (160, 30, 160),
         'enemy_speed': 4, 'spawn_time': 900, 'fire_chance': 0.013,
+        'formations': {'single': 1, 'sine': 2, 'v': 2, 'dive': 3},
         'celestial': 'dark_planet',
+        'music': {'tempo': 148, 'root': 103.83, 'intensity': 0.95},
     },
 ]
 
+# Endless mode: past the last stage, stages keep coming. They cycle through
+# the stages' looks and keep the last stage's music intensity, while each
+# one spawns enemies faster, fires more and moves enemies faster, up to
+# hundreds of enemies and thousands of enemy lasers on screen at the caps
+ENDLESS = False                 # play endless mode (also: --endless)
+ENDLESS_SPAWN_RATE = 1.3        # spawn time divisor per stage
+ENDLESS_MIN_SPAWN_TIME = 5      # ms; several enemies spawn per frame below 1000 / FPS
+ENDLESS_FIRE_RATE = 1.2         # fire chance multiplier per stage
+ENDLESS_MAX_FIRE_CHANCE = 0.14  # per enemy per frame
+ENDLESS_SPEED_STEP = 0.25       # enemy speed added per stage
+ENDLESS_MAX_ENEMY_SPEED = 6
+
 # ---------- Explosion colors ----------
 ENEMY_EXPLOSION_COLORS = [
     (255, 200, 50), (255, 140, 30), (255, 80, 20),
@@ -102,6 +174,82 @@ GALAXY_MAX_DELAY = 1200
 CELESTIAL_COOLDOWN_MIN = 600
 CELESTIAL_COOLDOWN_MAX = 1200
 
+# ---------- Sprites ----------
+SPRITE_FADE_STEPS = 16  # alpha levels cached for fading particle sprites
+PREFETCH_QUEUE_SIZE = 2  # stages waiting for their sprites to be built ahead of time
+
+# ---------- Graphics quality ----------
+# Every rendering cost knob, per preset from cheapest to richest:
+#   render_scale     world resolution (HUD and menus stay native)
+#   stars            starfield density (times STAR_LAYER_CONFIGS counts)
+#   particles        explosion density (times each explosion's counts)
+#   galaxy_arm_dots  dots per galaxy spiral arm (at most background.GALAXY_ARM_DOTS)
+#   glow             per-object glow in ship, laser and planet sprites
+#   bloom            one glow pass over the whole frame instead (bloom.py)
+QUALITY_PRESETS = {
+    'low': {'render_scale': 0.5, 'stars': 0.4, 'particles': 0.4, 'galaxy_arm_dots': 6,
+            'glow': False, 'bloom': False},
+    'medium': {'render_scale': 0.75, 'stars': 0.7, 'particles': 0.7, 'galaxy_arm_dots': 12,
+               'glow': True, 'bloom': False},
+    'high': {'render_scale': 1.0, 'stars': 1.0, 'particles': 1.0, 'galaxy_arm_dots': 18,
+             'glow': True, 'bloom': False},
+    'ultra': {'render_scale': 1.0, 'stars': 1.5, 'particles': 1.25, 'galaxy_arm_dots': 18,
+              'glow': True, 'bloom': True},
+}
+QUALITY = 'medium'        # preset used until one is calibrated or picked with --quality
+AUTO_CALIBRATE = False    # calibrate on the first run, when no preset is saved (the
+                          # window freezes for a few seconds); otherwise only with --calibrate
+CALIBRATION_FRAMES = 90   # frames of the benchmark scene drawn per preset
+CALIBRATION_BUDGET = 0.6  # share of the 1 / FPS frame time that drawing may take
+
+# ---------- Practice mode (rewind) ----------
+REWIND_INTERVAL = 15          # ticks between rewind snapshots
+REWIND_SECONDS = 3            # how far back Backspace jumps
+REWIND_SNAPSHOTS = 120        # snapshots kept (30 s at the interval above)
+SNAPSHOT_SLOT_BYTES = 32_768  # room per snapshot; dense endless stages take ~15 KB
+
+# ---------- Recording ----------
+RECORD_FORMAT = 'png'     # or 'raw': native 32-bit frames in chunk files
+RECORD_RING_FRAMES = 32   # frames buffered for the writers (~1.9 MB each at 800x600)
+RECORD_WORKERS = None     # PNG encoder processes; None: one per core but one
+RECORD_WORKER_NICE = 10   # writers' scheduling niceness, where supported
+RECORD_CHUNK_FRAMES = 300  # frames per raw chunk file
+
+# ---------- Soak test ----------
+SOAK_INTERVAL = 30        # seconds between samples
+SOAK_WARMUP_SAMPLES = 2   # minimum samples left out of the trends while caches fill
+SOAK_TOP_ALLOCATORS = 10  # tracemalloc allocation sites listed per sample
+# Largest growth allowed from the first to the last third of the samples
+SOAK_LIMITS = {
+    'rss_mb': 32,
+    'traced_mb': 16,
+    'frame_ms': 2.0,
+    'entities': 40,     # player lasers, enemies and enemy lasers
+    'particles': 150,   # live explosion effects of all types
+    'sprites': 200,     # sprite cache entries
+    'scaled_sprites': 200,
+    'gc_frozen': 0,     # objects in gc's permanent generation (frozen once at startup)
+}
+
+# ---------- Bloom ----------
+BLOOM_THRESHOLD = 90   # luma (after downsampling) where glow starts
+BLOOM_STRENGTH = 1.5   # glow brightness multiplier
+BLOOM_PASSES = 3       # binomial blur passes at quarter resolution
+
 # ---------- UI ----------
 BUTTON_W = 200
 BUTTON_H = 55
+
+# ---------- Batched environment ----------
+ENV_MAX_ENEMIES = 32         # enemy slots per instance
+ENV_MAX_BULLETS = 16         # player bullet slots per instance
+ENV_MAX_ENEMY_BULLETS = 64   # enemy bullet slots per instance
+
+# ---------- Autopilot (soak.py, env.scripted_actions) ----------
+AUTOPILOT_DODGE_RANGE = 140  # px above the ship within which enemy lasers are dodged
+AUTOPILOT_FIRE_EVERY = 8     # frames between shots
+
+# ---------- Difficulty sweep ----------
+SWEEP_SESSIONS = 256       # simulated sessions per grid point
+SWEEP_MAX_MINUTES = 5      # game time after which a surviving session is cut off
+SWEEP_CHUNK = 128          # sessions per worker task
@@ -0,0 +1,524 @@
+"""Vectorized multi-instance environment for bot training.
+
+Steps K independent Space Blaster games in lockstep. Every entity lives in a
+fixed-size slot array shared by the whole batch, so movement, spawning,
+firing and collisions are a handful of NumPy operations per step regardless
+of K. Enemies come in the game's formations and fly its path tables (see
+``formations.py``). Time is counted in frames (one step == one frame at ``FPS``), which
+keeps runs deterministic for a given seed.
+"""
+
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_SPEED, PLAYER_SPEED_BOOSTED,
+    SPEED_BOOST_THRESHOLD, PLAYER_LIVES, INVINCIBLE_DURATION,
+    BULLET_WIDTH, BULLET_HEIGHT, BULLET_SPEED,
+    ENEMY_WIDTH, ENEMY_HEIGHT,
+    ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT, ENEMY_BULLET_SPEED,
+    STAGE_CONFIGS, STAGE_DURATION,
+    SCORE_PER_KILL, SCORE_PENALTY_ESCAPE,
+    ENV_MAX_ENEMIES, ENV_MAX_BULLETS, ENV_MAX_ENEMY_BULLETS,
+    AUTOPILOT_DODGE_RANGE, AUTOPILOT_FIRE_EVERY,
+)
+from formations import PATTERNS, column_range, path_table, wave_members
+
+# Action bits — combine with | (e.g. ACTION_LEFT | ACTION_FIRE)
+ACTION_NOOP = 0
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_FIRE = 4
+NUM_ACTIONS = 8
+
+PLAYER_Y = SCREEN_HEIGHT - PLAYER_HEIGHT - 10
+OBS_SIZE = 4 + 3 * ENV_MAX_ENEMIES + 3 * ENV_MAX_ENEMY_BULLETS
+
+
+def _first_free(alive):
+    """Return (slot, has_free) for the first dead slot in each row."""
+    free = ~alive
+    slot = free.argmax(axis=1)
+    return slot, free[np.arange(alive.shape[0]), slot]
+
+
+class BatchEnv:
+    """K independent game instances stepped together.
+
+    ``step(actions)`` takes an int array of action bitmasks and returns
+    ``(observations, rewards, dones)``. Finished instances are reset
+    automatically; their last score, stage and length are left in
+    ``final_score``, ``final_stage`` and ``final_frames`` until the next
+    episode ends.
+    """
+
+    def __init__(self, num_envs, seed=None, stage_configs=STAGE_CONFIGS):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_envs)
+
+        # Per-stage tables indexed by (stage - 1)
+        self.num_stages = len(stage_configs)
+        self._stage_spawn = np.array([c['spawn_time'] * FPS / 1000 for c in stage_configs])
+        self._stage_fire = np.array([c['fire_chance'] for c in stage_configs])
+        self._stage_frames = STAGE_DURATION * FPS / 1000
+        self._build_formations(stage_configs)
+
+        k = num_envs
+        # Player & progress
+        self.player_x = np.zeros(k, np.int32)
+        self.lives = np.zeros(k, np.int32)
+        self.invincible = np.zeros(k, np.int32)
+        self.boost = np.zeros(k, bool)
+        self.score = np.zeros(k, np.int64)
+        self.stage = np.ones(k, np.int32)
+        self.stage_frame = np.zeros(k, np.int32)
+        self.spawn_timer = np.zeros(k, np.int32)
+        self.frames = np.zeros(k, np.int64)
+
+        # Entity slots
+        self.enemy_x = np.zeros((k, ENV_MAX_ENEMIES), np.float32)
+        self.enemy_y = np.zeros((k, ENV_MAX_ENEMIES), np.float32)
+        self.enemy_alive = np.zeros((k, ENV_MAX_ENEMIES), bool)
+        self.enemy_table = np.zeros((k, ENV_MAX_ENEMIES), np.int32)   # path table flown
+        self.enemy_column = np.zeros((k, ENV_MAX_ENEMIES), np.int32)  # spawn column
+        self.enemy_flip = np.ones((k, ENV_MAX_ENEMIES), np.int32)     # -1: swerves left
+        self.enemy_start = np.zeros((k, ENV_MAX_ENEMIES), np.int64)   # frame its path starts
+        self.bullet_x = np.zeros((k, ENV_MAX_BULLETS), np.float32)
+        self.bullet_y = np.zeros((k, ENV_MAX_BULLETS), np.float32)
+        self.bullet_alive = np.zeros((k, ENV_MAX_BULLETS), bool)
+        self.enemy_bullet_x = np.zeros((k, ENV_MAX_ENEMY_BULLETS), np.float32)
+        self.enemy_bullet_y = np.zeros((k, ENV_MAX_ENEMY_BULLETS), np.float32)
+        self.enemy_bullet_alive = np.zeros((k, ENV_MAX_ENEMY_BULLETS), bool)
+
+        # Stats of the most recently finished episode per instance
+        self.final_score = np.zeros(k, np.int64)
+        self.final_stage = np.zeros(k, np.int32)
+        self.final_frames = np.zeros(k, np.int64)
+
+        self._obs = np.zeros((k, OBS_SIZE), np.float32)
+        self.reset()
+
+    def _build_formations(self, stage_configs):
+        """Stack every stage's path tables and tabulate the waves of each pattern."""
+        paths = sorted({wave_members(p)[0] for p in PATTERNS})
+        num_paths = len(paths)
+        tables = [path_table(path, c['enemy_speed']) for c in stage_configs for path in paths]
+        # Table (stage - 1) * num_paths + path starts at row _table_start of _paths
+        self._paths = np.concatenate(tables)
+        self._table_start = np.cumsum([0] + [len(t) for t in tables[:-1]])
+        self._table_last = np.array([len(t) - 1 for t in tables])
+
+        n, size = len(PATTERNS), max(len(wave_members(p)[1]) for p in PATTERNS)
+        self._wave_path = np.zeros(n, np.int32)
+        self._wave_size = np.zeros(n, np.int32)
+        self._wave_dx = np.zeros((n, size), np.int32)
+        self._wave_delay = np.zeros((n, size), np.int64)
+        self._wave_dive = np.zeros(n, bool)
+        # Column range per (stage, pattern, flip), flip index 1 for -1
+        self._wave_lo = np.zeros((self.num_stages, n, 2), np.int64)
+        self._wave_hi = np.zeros((self.num_stages, n, 2), np.int64)
+        for i, pattern in enumerate(PATTERNS):
+            path, members = wave_members(pattern)
+            offsets = [dx for dx, _ in members]
+            self._wave_path[i] = paths.index(path)
+            self._wave_size[i] = len(members)
+            self._wave_dx[i, :len(members)] = offsets
+            self._wave_delay[i, :len(members)] = [delay for _, delay in members]
+            self._wave_dive[i] = path == 'dive'
+            for s in range(self.num_stages):
+                table = tables[s * num_paths + paths.index(path)]
+                for f, flip in enumerate((1, -1)):
+                    self._wave_lo[s, i, f], self._wave_hi[s, i, f] = column_range(
+                        table, offsets, flip)
+        self._num_paths = num_paths
+
+        # Cumulative pattern odds per stage, for drawing waves
+        weights = np.array([[c['formations'].get(p, 0) for p in PATTERNS]
+                            for c in stage_configs], float)
+        self._stage_waves = np.cumsum(weights, axis=1) / weights.sum(axis=1, keepdims=True)
+
+    # ---------- Reset ----------
+
+    def reset(self, mask=None):
+        """Reset all instances (or those selected by a bool mask).
+
+        Returns:
+            np.ndarray: Observations, shape (K, OBS_SIZE).
+        """
+        if mask is None:
+            mask = np.ones(self.num_envs, bool)
+        self.player_x[mask] = SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2
+        self.lives[mask] = PLAYER_LIVES
+        self.invincible[mask] = 0
+        self.boost[mask] = False
+        self.score[mask] = 0
+        self.stage[mask] = 1
+        self.stage_frame[mask] = 0
+        self.spawn_timer[mask] = 0
+        self.frames[mask] = 0
+        self.enemy_alive[mask] = False
+        self.bullet_alive[mask] = False
+        self.enemy_bullet_alive[mask] = False
+        return self.observe()
+
+    # ---------- Step ----------
+
+    def step(self, actions):
+        """Advance every instance by one frame.
+
+        Args:
+            actions: int array of shape (K,) holding ACTION_* bitmasks.
+
+        Returns:
+            tuple: (observations, rewards, dones) as NumPy arrays.
+        """
+        actions = np.asarray(actions)
+        rows = self._rows
+        si = self.stage - 1
+        rewards = np.zeros(self.num_envs, np.float32)
+
+        # Player movement
+        speed = np.where(self.boost, PLAYER_SPEED_BOOSTED, PLAYER_SPEED)
+        left = ((actions & ACTION_LEFT) != 0) & (self.player_x > 0)
+        right = ((actions & ACTION_RIGHT) != 0) & (self.player_x < SCREEN_WIDTH - PLAYER_WIDTH)
+        self.player_x -= speed * left
+        self.player_x += speed * right
+        self.boost |= self.score >= SPEED_BOOST_THRESHOLD
+
+        # Firing (handled before the bullet update, as in Game.handle_events)
+        slot, has_free = _first_free(self.bullet_alive)
+        fire = ((actions & ACTION_FIRE) != 0) & has_free
+        fr, fs = rows[fire], slot[fire]
+        self.bullet_x[fr, fs] = self.player_x[fire] + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2
+        self.bullet_y[fr, fs] = PLAYER_Y
+        self.bullet_alive[fr, fs] = True
+
+        # Player bullets
+        self.bullet_y -= BULLET_SPEED
+        self.bullet_alive &= self.bullet_y > 0
+
+        # Enemy spawning
+        self.spawn_timer += 1
+        due = self.spawn_timer > self._stage_spawn[si]
+        if due.any():
+            self._spawn_waves(rows[due])
+
+        # Enemy movement — every ship is looked up in its path table
+        index = np.minimum(np.maximum(self.frames[:, None] + 1 - self.enemy_start, 0),
+                           self._table_last[self.enemy_table])
+        position = self._paths[self._table_start[self.enemy_table] + index]
+        self.enemy_x[:] = self.enemy_column + self.enemy_flip * position[..., 0]
+        self.enemy_y[:] = position[..., 1]
+
+        # Enemy firing — shooters are matched to free bullet slots by rank
+        shoot = (self.enemy_alive & (self.enemy_y > 0)
+                 & (self.enemy_y < SCREEN_HEIGHT - ENEMY_HEIGHT)
+                 & (self.rng.random(self.enemy_alive.shape) < self._stage_fire[si][:, None]))
+        if shoot.any():
+            er, ei = np.nonzero(shoot)
+            rank = (np.cumsum(shoot, axis=1) - 1)[er, ei]
+            free = ~self.enemy_bullet_alive
+            order = np.argsort(~free, axis=1, kind='stable')
+            ok = rank < free.sum(axis=1)[er]
+            er, ei = er[ok], ei[ok]
+            bs = order[er, rank[ok]]
+            self.enemy_bullet_x[er, bs] = (self.enemy_x[er, ei]
+                                           + ENEMY_WIDTH // 2 - ENEMY_BULLET_WIDTH // 2)
+            self.enemy_bullet_y[er, bs] = self.enemy_y[er, ei] + ENEMY_HEIGHT
+            self.enemy_bullet_alive[er, bs] = True
+
+        # Enemy bullet movement
+        self.enemy_bullet_y += ENEMY_BULLET_SPEED
+        self.enemy_bullet_alive &= self.enemy_bullet_y < SCREEN_HEIGHT
+
+        # Player bullets vs enemies — each bullet claims the first enemy it
+        # overlaps; an enemy claimed twice goes to the lowest bullet slot.
+        bx, by = self.bullet_x[:, :, None], self.bullet_y[:, :, None]
+        ex, ey = self.enemy_x[:, None, :], self.enemy_y[:, None, :]
+        overlap = ((bx < ex + ENEMY_WIDTH) & (bx + BULLET_WIDTH > ex)
+                   & (by < ey + ENEMY_HEIGHT) & (by + BULLET_HEIGHT > ey)
+                   & self.bullet_alive[:, :, None] & self.enemy_alive[:, None, :])
+        if overlap.any():
+            claim = np.zeros_like(overlap)
+            hit_any = overlap.any(axis=2)
+            br, bi = np.nonzero(hit_any)
+            claim[br, bi, overlap.argmax(axis=2)[br, bi]] = True
+            winner = claim.argmax(axis=1)
+            won = claim & (np.arange(ENV_MAX_BULLETS)[None, :, None] == winner[:, None, :])
+            self.bullet_alive &= ~won.any(axis=2)
+            killed = won.any(axis=1)
+            self.enemy_alive &= ~killed
+            kills = killed.sum(axis=1)
+            self.score += kills * SCORE_PER_KILL
+            rewards += kills * SCORE_PER_KILL
+
+        # Enemy bullets vs player
+        vulnerable = self.invincible == 0
+        self.invincible[~vulnerable] -= 1
+        px = self.player_x[:, None]
+        hit = (vulnerable[:, None] & self.enemy_bullet_alive
+               & (self.enemy_bullet_x < px + PLAYER_WIDTH)
+               & (self.enemy_bullet_x + ENEMY_BULLET_WIDTH > px)
+               & (self.enemy_bullet_y < PLAYER_Y + PLAYER_HEIGHT)
+               & (self.enemy_bullet_y + ENEMY_BULLET_HEIGHT > PLAYER_Y))
+        was_hit = hit.any(axis=1)
+        hr = rows[was_hit]
+        self.enemy_bullet_alive[hr, hit.argmax(axis=1)[was_hit]] = False
+        self.lives -= was_hit
+        self.invincible[was_hit] = INVINCIBLE_DURATION
+
+        # Escaped enemies — penalty
+        escaped = self.enemy_alive & (self.enemy_y >= SCREEN_HEIGHT)
+        n_escaped = escaped.sum(axis=1)
+        self.enemy_alive &= ~escaped
+        # The score stops at zero, and the reward is what it actually lost
+        score = np.maximum(0, self.score - n_escaped * SCORE_PENALTY_ESCAPE)
+        rewards -= self.score - score
+        self.score = score
+
+        # Stage progression
+        self.stage_frame += 1
+        advance = (self.stage_frame > self._stage_frames) & (self.stage < self.num_stages)
+        self.stage += advance
+        self.stage_frame[advance] = 0
+
+        self.frames += 1
+        dones = self.lives <= 0
+        if dones.any():
+            self.final_score[dones] = self.score[dones]
+            self.final_stage[dones] = self.stage[dones]
+            self.final_frames[dones] = self.frames[dones]
+            self.reset(dones)
+        return self.observe(), rewards, dones
+
+    def _spawn_waves(self, due):
+        """Start a wave of the stage's formations in each instance of ``due``.
+
+        Ships that find no free slot are not spawned. As in the game, each
+        ship of a wave counts as a spawn, so a large wave pushes the next
+        one back.
+        """
+        rng = self.rng
+        si = self.stage[due] - 1
+        pattern = (rng.random(len(due))[:, None] >= self._stage_waves[si]).sum(axis=1)
+        pattern = np.minimum(pattern, len(PATTERNS) - 1)
+        # Divers swerve toward the player's half of the screen
+        flip = np.where(self._wave_dive[pattern]
+                        & (self.player_x[due] + PLAYER_WIDTH // 2 < SCREEN_WIDTH // 2), -1, 1)
+        f = (flip < 0).astype(int)
+        column = rng.integers(self._wave_lo[si, pattern, f], self._wave_hi[si, pattern, f],
+                              endpoint=True)
+
+        # Wave member j goes into the instance's j-th free slot
+        free = ~self.enemy_alive[due]
+        order = np.argsort(~free, axis=1, kind='stable')
+        size = self._wave_size[pattern]
+        member = np.arange(self._wave_dx.shape[1])
+        fits = (member < size[:, None]) & (member < free.sum(axis=1)[:, None])
+        wi, mj = np.nonzero(fits)
+        r, slot, p = due[wi], order[wi, mj], pattern[wi]
+        self.enemy_table[r, slot] = si[wi] * self._num_paths + self._wave_path[p]
+        self.enemy_column[r, slot] = column[wi] + self._wave_dx[p, mj]
+        self.enemy_flip[r, slot] = flip[wi]
+        self.enemy_start[r, slot] = self.frames[r] + self._wave_delay[p, mj]
+        self.enemy_alive[r, slot] = True
+        self.spawn_timer[due] = -np.rint((size - 1) * self._stage_spawn[si])
+
+    # ---------- Observations ----------
+
+    def observe(self):
+        """Return the flat feature observation for every instance.
+
+        Layout per row: player x, lives, invincible flag, stage, then
+        (x, y, alive) for each enemy slot and each enemy bullet slot, with
+        positions normalized to the screen size.
+
+        Returns:
+            np.ndarray: float32 array of shape (K, OBS_SIZE), reused
+            between calls.
+        """
+        obs = self._obs
+        obs[:, 0] = self.player_x / SCREEN_WIDTH
+        obs[:, 1] = self.lives / PLAYER_LIVES
+        obs[:, 2] = self.invincible > 0
+        obs[:, 3] = self.stage / self.num_stages
+        e0 = 4
+        obs[:, e0:e0 + ENV_MAX_ENEMIES] = self.enemy_x / SCREEN_WIDTH
+        e0 += ENV_MAX_ENEMIES
+        obs[:, e0:e0 + ENV_MAX_ENEMIES] = self.enemy_y / SCREEN_HEIGHT
+        e0 += ENV_MAX_ENEMIES
+        obs[:, e0:e0 + ENV_MAX_ENEMIES] = self.enemy_alive
+        e0 += ENV_MAX_ENEMIES
+        m = ENV_MAX_ENEMY_BULLETS
+        obs[:, e0:e0 + m] = self.enemy_bullet_x / SCREEN_WIDTH
+        obs[:, e0 + m:e0 + 2 * m] = self.enemy_bullet_y / SCREEN_HEIGHT
+        obs[:, e0 + 2 * m:e0 + 3 * m] = self.enemy_bullet_alive
+        return obs
+
+
+# ---------- Scripted policy ----------
+
+def scripted_actions(env, frame):
+    """Return the scripted player's actions for every instance of ``env``.
+
+    The rules of ``soak.Autopilot``: dodge the first enemy laser within
+    ``AUTOPILOT_DODGE_RANGE`` above the ship, otherwise steer under the
+    horizontally nearest enemy, and fire every ``AUTOPILOT_FIRE_EVERY``
+    frames (``frame`` counts from the start of the run).
+
+    Returns:
+        np.ndarray: int array of shape (K,) holding ACTION_* bitmasks.
+    """
+    rows = env._rows
+    cx = env.player_x + PLAYER_WIDTH // 2
+    eb_cx = env.enemy_bullet_x + ENEMY_BULLET_WIDTH / 2
+    near = (env.enemy_bullet_alive
+            & (env.enemy_bullet_y > PLAYER_Y - AUTOPILOT_DODGE_RANGE)
+            & (np.abs(eb_cx - cx[:, None]) < PLAYER_WIDTH))
+    threat_x = eb_cx[rows, near.argmax(axis=1)]
+    dodge = np.where(threat_x <= cx, ACTION_RIGHT, ACTION_LEFT)
+
+    dist = np.where(env.enemy_alive, np.abs(env.enemy_x + ENEMY_WIDTH / 2 - cx[:, None]), np.inf)
+    target = dist.argmin(axis=1)
+    target_x = env.enemy_x[rows, target] + ENEMY_WIDTH / 2
+    chase = np.where(~np.isfinite(dist[rows, target]), ACTION_NOOP,
+                     np.where(target_x > cx + 4, ACTION_RIGHT,
+                              np.where(target_x < cx - 4, ACTION_LEFT, ACTION_NOOP)))
+
+    actions = np.where(near.any(axis=1), dodge, chase)
+    if frame % AUTOPILOT_FIRE_EVERY == 0:
+        actions |= ACTION_FIRE
+    return actions
+
+
+# ---------- Process-pool variant ----------
+
+# Seconds between checks that a silent shard worker is still alive
+_POLL_SECONDS = 1.0
+
+
+def _shard_worker(conn, lo, hi, seed, stage_configs, shm_names, num_envs):
+    """Run one shard of a ShardedBatchEnv inside a worker process.
+
+    Each command is answered with ``('ok', None)``, or with ``('error',
+    traceback)`` before the worker quits.
+    """
+    blocks = [shared_memory.SharedMemory(name=n) for n in shm_names]
+    actions, obs, rewards, dones = _shared_views(blocks, num_envs)
+    try:
+        try:
+            env = BatchEnv(hi - lo, seed=seed, stage_configs=stage_configs)
+            while True:
+                cmd = conn.recv()
+                if cmd == 'step':
+                    o, r, d = env.step(actions[lo:hi])
+                elif cmd == 'reset':
+                    o, r, d = env.reset(), 0.0, False
+                else:
+                    break
+                obs[lo:hi] = o
+                rewards[lo:hi] = r
+                dones[lo:hi] = d
+                conn.send(('ok', None))
+        except Exception:
+            conn.send(('error', traceback.format_exc()))
+    finally:
+        del actions, obs, rewards, dones
+        for b in blocks:
+            b.close()
+
+
+def _shared_views(blocks, num_envs):
+    """Map the four shared blocks to (actions, obs, rewards, dones) arrays."""
+    return (np.ndarray((num_envs,), np.int32, buffer=blocks[0].buf),
+            np.ndarray((num_envs, OBS_SIZE), np.float32, buffer=blocks[1].buf),
+            np.ndarray((num_envs,), np.float32, buffer=blocks[2].buf),
+            np.ndarray((num_envs,), bool, buffer=blocks[3].buf))
+
+
+class ShardedBatchEnv:
+    """BatchEnv split across worker processes, one shard per core.
+
+    Actions and results travel through shared memory; the pipes only carry
+    a one-word command and an acknowledgement per step. A worker that
+    fails or dies makes the step raise ``RuntimeError`` (with the worker's
+    traceback when there is one). Use as a context manager or call
+    ``close()`` to stop the workers.
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=None, stage_configs=STAGE_CONFIGS):
+        num_workers = min(num_workers or multiprocessing.cpu_count(), num_envs)
+        self.num_envs = num_envs
+        sizes = [4 * num_envs, 4 * num_envs * OBS_SIZE, 4 * num_envs, num_envs]
+        self._blocks = [shared_memory.SharedMemory(create=True, size=s) for s in sizes]
+        self._actions, self._obs, self._rewards, self._dones = _shared_views(
+            self._blocks, num_envs)
+
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._conns = []
+        self._procs = []
+        for i in range(num_workers):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_shard_worker,
+                args=(child, bounds[i], bounds[i + 1], seeds[i], stage_configs,
+                      [b.name for b in self._blocks], num_envs),
+                daemon=True)
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def _broadcast(self, cmd):
+        for i, conn in enumerate(self._conns):
+            try:
+                conn.send(cmd)
+            except OSError:
+                raise RuntimeError(f'shard worker {i} has died') from None
+        for i, (conn, proc) in enumerate(zip(self._conns, self._procs)):
+            # A worker that dies without answering would block recv forever
+            while not conn.poll(_POLL_SECONDS):
+                if not proc.is_alive():
+                    raise RuntimeError(f'shard worker {i} died (exit code {proc.exitcode})')
+            try:
+                status, detail = conn.recv()
+            except EOFError:
+                raise RuntimeError(f'shard worker {i} died') from None
+            if status == 'error':
+                raise RuntimeError(f'shard worker {i} failed:\n{detail}')
+
+    def reset(self):
+        """Reset every instance and return the observations."""
+        self._broadcast('reset')
+        return self._obs
+
+    def step(self, actions):
+        """Step all shards in parallel; same contract as BatchEnv.step."""
+        self._actions[:] = actions
+        self._broadcast('step')
+        return self._obs, self._rewards, self._dones
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        for conn in self._conns:
+            try:
+                conn.send('close')
+            except OSError:  # the worker has died
+                pass
+        for proc in self._procs:
+            proc.join()
+        del self._actions, self._obs, self._rewards, self._dones
+        for b in self._blocks:
+            b.close()
+            b.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
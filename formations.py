@@ -0,0 +1,295 @@
+"""Enemy formations for Space Blaster: waves flying precomputed paths.
+
+A wave is one of the ``PATTERNS``, picked by the stage's ``formations``
+weights:
+
+- ``single``: one ship falling straight down.
+- ``sine``: a column of ships weaving side to side.
+- ``v``: a V of ships falling straight down, the leader ahead.
+- ``dive``: a ship that cruises in, hovers, then dives at the player's side
+  of the screen.
+
+Each path is computed once per stage speed into a table of positions per
+frame (``path_table``). The trig happens while the table is built, never
+per enemy. Ships following the same table are moved together: their frame
+indices become one array lookup, so moving a ship costs the same whatever
+its path looks like. A ship's position is its wave's spawn column plus
+the table's offset, mirrored for divers that swerve left. ``env.BatchEnv``
+flies the same tables, so bots and the difficulty sweep face the same waves.
+
+The tables need numpy. Without it every wave is a ``single`` ship.
+"""
+
+import functools
+import math
+import random
+
+import pygame
+
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT,
+    FORMATION_SINE_SHIPS, FORMATION_SINE_LAG, FORMATION_SINE_AMPLITUDE, FORMATION_SINE_WAVELENGTH,
+    FORMATION_V_SHIPS, FORMATION_V_SPACING, FORMATION_V_LAG,
+    FORMATION_DIVE_HOLD_Y, FORMATION_DIVE_CRUISE, FORMATION_DIVE_PAUSE, FORMATION_DIVE_SPEED,
+    FORMATION_DIVE_SWERVE,
+)
+
+PATTERNS = ('single', 'sine', 'v', 'dive')
+
+
+def pick(weights):
+    """Return a pattern name drawn from a stage's ``formations`` weights."""
+    return random.choices(list(weights), list(weights.values()))[0]
+
+
+# ---------- Path tables ----------
+
+def wave_members(pattern):
+    """Return the path a pattern's ships follow and their ``(dx, delay)`` in the wave.
+
+    ``dx`` is a ship's offset from the wave's spawn column and ``delay`` the
+    frames it starts after the first one.
+    """
+    if pattern == 'sine':
+        return 'sine', [(0, i * FORMATION_SINE_LAG) for i in range(FORMATION_SINE_SHIPS)]
+    if pattern == 'v':
+        lead = FORMATION_V_SHIPS // 2
+        return 'straight', [((i - lead) * FORMATION_V_SPACING, abs(i - lead) * FORMATION_V_LAG)
+                            for i in range(FORMATION_V_SHIPS)]
+    if pattern == 'dive':
+        return 'dive', [(0, 0)]
+    return 'straight', [(0, 0)]
+
+
+def column_range(table, offsets, flip=1):
+    """Return the spawn columns that keep a wave on screen over its whole path.
+
+    ``table`` is the wave's path table, ``offsets`` its ships' ``dx`` and
+    ``flip`` -1 for a wave mirrored to swerve left.
+
+    Returns:
+        tuple: The lowest and highest column, both inclusive.
+    """
+    dx = flip * table[:, 0]
+    return (-int(dx.min()) - min(offsets),
+            SCREEN_WIDTH - ENEMY_WIDTH - int(dx.max()) - max(offsets))
+
+
+@functools.lru_cache(maxsize=64)
+def path_table(path, speed):
+    """Return a path flown at ``speed`` px per frame as a table of positions.
+
+    Row ``t`` holds the ship's ``(dx, y)`` on its ``t``-th frame: the
+    offset from its spawn column and its top edge. The first row is just
+    above the screen and the last is the first one below it. Tables are
+    shared: treat them as read-only.
+
+    Returns:
+        numpy.ndarray: An int32 array of shape ``(frames, 2)``.
+    """
+    import numpy as np
+
+    if path == 'dive':
+        cruise = speed * FORMATION_DIVE_CRUISE
+        dive = speed * FORMATION_DIVE_SPEED
+        vy = np.concatenate((
+            np.full(math.ceil((FORMATION_DIVE_HOLD_Y + ENEMY_HEIGHT) / cruise), cruise),
+            np.zeros(FORMATION_DIVE_PAUSE),
+            np.full(math.ceil((SCREEN_HEIGHT - FORMATION_DIVE_HOLD_Y) / dive), dive)))
+        y = np.concatenate(([0.0], np.cumsum(vy))) - ENEMY_HEIGHT
+        # Swerve sideways ever faster as the dive goes on
+        progress = np.clip((y - FORMATION_DIVE_HOLD_Y) / (SCREEN_HEIGHT - FORMATION_DIVE_HOLD_Y),
+                           0, 1)
+        dx = FORMATION_DIVE_SWERVE * progress ** 2
+    else:
+        t = np.arange(math.ceil((SCREEN_HEIGHT + ENEMY_HEIGHT) / speed) + 1)
+        y = t * speed - ENEMY_HEIGHT
+        if path == 'sine':
+            dx = FORMATION_SINE_AMPLITUDE * np.sin(2 * np.pi * (y + ENEMY_HEIGHT)
+                                                   / FORMATION_SINE_WAVELENGTH)
+        else:
+            dx = np.zeros_like(y)
+    table = np.rint(np.stack((dx, y), axis=1)).astype(np.int32)
+    table.flags.writeable = False
+    return table
+
+
+# ---------- Formations ----------
+
+class _Group:
+    """The ships flying one path table: their rects, columns, mirrors and start frames."""
+
+    def __init__(self, np, table):
+        self.table = table
+        self.rects = []
+        self.x = np.empty(0, np.int32)
+        self.flip = np.empty(0, np.int32)
+        self.start = np.empty(0, np.int64)
+
+
+class Formations:
+    """Spawns waves and moves every ship along its path, one lookup per table.
+
+    The ship rects are shared with ``Game.enemies``, which stays the list
+    that collisions and drawing use. Ships the game removes (shot down or
+    escaped) are dropped here on the next ``update``.
+    """
+
+    def __init__(self):
+        try:
+            import numpy as np
+        except ImportError:
+            print('Note: numpy not found — enemies fly straight down, without formations.')
+            np = None
+        self._np = np
+        self._groups = {}   # (path, speed) -> _Group
+        self._plain = []    # [rect, speed] per ship without numpy
+        self._tracked = 0
+        self.frame = 0
+
+    def __len__(self):
+        return self._tracked
+
+    def clear(self):
+        """Forget every ship."""
+        self._groups.clear()
+        self._plain.clear()
+        self._tracked = 0
+
+    def spawn(self, pattern, speed, target_x=None, advance=0):
+        """Start a wave of ``pattern`` at ``speed`` px per frame.
+
+        Divers swerve toward ``target_x`` (default: a random side).
+        ``advance`` starts the wave that many frames into its path.
+
+        Returns:
+            list: The wave's new ship rects, to add to the enemy list.
+        """
+        np = self._np
+        if np is None:
+            rect = pygame.Rect(random.randint(0, SCREEN_WIDTH - ENEMY_WIDTH),
+                               round(advance * speed) - ENEMY_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT)
+            self._plain.append([rect, speed])
+            self._tracked += 1
+            return [rect]
+
+        path, members = wave_members(pattern)
+        key = (path, speed)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group(np, path_table(path, speed))
+        offsets = [offset for offset, _ in members]
+        flip = 1
+        if path == 'dive':
+            if target_x is None:
+                flip = random.choice((-1, 1))
+            else:
+                flip = 1 if target_x >= SCREEN_WIDTH // 2 else -1
+        column = random.randint(*column_range(group.table, offsets, flip))
+
+        last = len(group.table) - 1
+        rects = []
+        for offset, delay in members:
+            row_dx, row_y = group.table[min(max(advance - delay, 0), last)].tolist()
+            rects.append(pygame.Rect(column + offset + flip * row_dx, row_y,
+                                     ENEMY_WIDTH, ENEMY_HEIGHT))
+        group.rects.extend(rects)
+        group.x = np.append(group.x, [column + offset for offset in offsets])
+        group.flip = np.append(group.flip, [flip] * len(members))
+        group.start = np.append(group.start,
+                                [self.frame + delay - advance for _, delay in members])
+        self._tracked += len(members)
+        return rects
+
+    def get_state(self, enemies):
+        """Return where ``enemies`` are in their formations, for a snapshot.
+
+        Returns:
+            tuple: ``(frame, tables, ships)``: the frame counter, the
+            ``(path, speed)`` of each table in use (path ``'plain'`` for
+            ships moved without numpy), and per enemy its
+            ``(table, column, flip, start)``, with table -1 for enemies
+            that fly no table.
+        """
+        tables, where = [], {}
+        for (path, speed), group in self._groups.items():
+            table = len(tables)
+            tables.append((path, speed))
+            for rect, column, flip, start in zip(group.rects, group.x.tolist(),
+                                                 group.flip.tolist(), group.start.tolist()):
+                where[id(rect)] = (table, column, flip, start)
+        for rect, speed in self._plain:
+            if ('plain', speed) not in tables:
+                tables.append(('plain', speed))
+            where[id(rect)] = (tables.index(('plain', speed)), 0, 1, 0)
+        untracked = (-1, 0, 1, 0)
+        return self.frame, tables, [where.get(id(rect), untracked) for rect in enemies]
+
+    def set_state(self, enemies, frame, tables, ships):
+        """Put ``enemies`` back into their formations (``get_state``'s result)."""
+        self.clear()
+        self.frame = frame
+        np = self._np
+        members = {}
+        for rect, (table, column, flip, start) in zip(enemies, ships):
+            if table < 0:
+                continue
+            path, speed = tables[table]
+            if path == 'plain' or np is None:
+                self._plain.append([rect, speed])
+            else:
+                members.setdefault((path, speed), []).append((rect, column, flip, start))
+        self._tracked = len(self._plain)
+        for key in tables:  # keep the tables' order
+            ships = members.get(key)
+            if not ships:
+                continue
+            group = self._groups[key] = _Group(np, path_table(*key))
+            rects, columns, flips, starts = zip(*ships)
+            group.rects = list(rects)
+            group.x = np.array(columns, np.int32)
+            group.flip = np.array(flips, np.int32)
+            group.start = np.array(starts, np.int64)
+            self._tracked += len(rects)
+
+    def update(self, enemies):
+        """Advance every ship one frame; ``enemies`` is the game's live enemy list."""
+        self.frame += 1
+        if self._tracked != len(enemies):
+            self._prune(enemies)
+        for rect, speed in self._plain:
+            rect.y += speed
+        for key, group in list(self._groups.items()):
+            self._move(group)
+            if not group.rects:
+                del self._groups[key]
+
+    def _move(self, group):
+        # Ships still waiting for their turn in the wave sit above the screen
+        # on the first row; those past the last row have left the screen
+        np = self._np
+        last = len(group.table) - 1
+        index = np.clip(self.frame - group.start, 0, last)
+        position = group.table[index]
+        position[:, 0] *= group.flip
+        position[:, 0] += group.x
+        for rect, topleft in zip(group.rects, position.tolist()):
+            rect.topleft = topleft
+        done = index == last
+        if done.any():
+            self._keep(group, ~done)
+
+    def _keep(self, group, keep):
+        self._tracked -= len(group.rects) - int(keep.sum())
+        group.rects = [rect for rect, k in zip(group.rects, keep.tolist()) if k]
+        group.x = group.x[keep]
+        group.flip = group.flip[keep]
+        group.start = group.start[keep]
+
+    def _prune(self, enemies):
+        alive = set(map(id, enemies))
+        self._plain = [ship for ship in self._plain if id(ship[0]) in alive]
+        self._tracked = len(self._plain)
+        for group in self._groups.values():
+            self._tracked += len(group.rects)
+            self._keep(group, self._np.array([id(rect) in alive for rect in group.rects], bool))
@@ -1,73 +1,137 @@
 """Game class — holds all state and runs the main loop for Space Blaster."""
 
+import gc
 import sys
 import random
+import threading
+import time
 
 import pygame
 
+import sprites
 from config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TITLE, DEFAULT_BG_COLOR,
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, MENU_FPS, IDLE_FPS, SHAKE_MAX, TITLE, DEFAULT_BG_COLOR,
+    RENDER_BACKEND, VSYNC, RECORD_FORMAT, QUALITY, QUALITY_PRESETS, CALIBRATION_FRAMES,
     PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_SPEED, PLAYER_SPEED_BOOSTED,
     SPEED_BOOST_THRESHOLD, PLAYER_LIVES, INVINCIBLE_DURATION,
     BULLET_WIDTH, BULLET_HEIGHT, BULLET_SPEED,
     ENEMY_WIDTH, ENEMY_HEIGHT,
     ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT, ENEMY_BULLET_SPEED,
-    STAGE_CONFIGS, STAGE_DURATION,
+    STAGE_CONFIGS, STAGE_DURATION, ENDLESS,
     SCORE_PER_KILL, SCORE_PENALTY_ESCAPE,
     ENEMY_EXPLOSION_COLORS, PLAYER_EXPLOSION_COLORS,
     GALAXY_MIN_DELAY, GALAXY_MAX_DELAY,
     CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX,
 )
-from sound import init_sounds
-from score import load_high_scores, save_high_score
+from sound import SoundBank, VoiceManager
+from music import MusicStreamer
+from startup import StartupTimer
+from pacing import FramePacer
+from scheduler import Scheduler, ticks
+from recorder import start_recording
+from snapshot import SnapshotRing
+from gpu import open_display, OffscreenDisplay
+from quality import calibrate
+from settings import save_settings
+from score import load_high_scores, save_high_score, flush_high_scores
 from particles import ParticleSystem
+from formations import Formations, pick
+from prefetch import StagePrefetcher
+from stages import stage_config, is_last_stage
 from background import (
     create_star_layers, update_and_draw_stars,
-    spawn_galaxy, draw_galaxy,
-    spawn_celestial, draw_celestial,
+    spawn_galaxy, submit_galaxy,
+    spawn_celestial, submit_celestial,
 )
 from renderer import (
-    draw_player_ship, draw_enemy_ship,
-    draw_laser, draw_enemy_laser,
+    submit_player_ship, submit_enemy_ships,
+    submit_lasers, submit_enemy_lasers,
 )
+from renderqueue import RenderQueue, LAYER_BLOOM
 from screens import (
     Fonts, BUTTON_RECT, GAME_OVER_BUTTON_RECT, PAUSE_CONTINUE_RECT, PAUSE_QUIT_RECT,
-    draw_title_screen, draw_hud, draw_stage_effects,
-    draw_pause_screen, draw_game_over_screen,
+    draw_title_screen, submit_title_ship, submit_hud, submit_stage_effects,
+    draw_pause_backdrop, draw_pause_buttons,
+    draw_game_over_backdrop, draw_game_over_buttons,
 )
 
 
-class Game:
-    """Main game class holding all mutable state."""
+def _init_pygame_subsystems():
+    """Initialize only the pygame subsystems the game uses.
 
-    def __init__(self):
+    Video (with events) and fonts start here; the timer is needed for
+    ``pygame.time.get_ticks``. Audio is opened later on a background thread.
+    """
+    pygame.display.init()
+    pygame.font.init()
+    try:
+        from pygame._sdl2 import sdl2
+        sdl2.init_subsystem(sdl2.INIT_TIMER)
+    except (ImportError, AttributeError):
         pygame.init()
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
 
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(TITLE)
-        self.clock = pygame.time.Clock()
 
-        # Sound effects
-        self.laser_sound, self.explosion_sound, self.hit_sound, self.sounds_available = init_sounds()
+class Game:
+    """Main game class holding all mutable state."""
 
-        # Fonts
+    def __init__(self, startup=None, renderer=RENDER_BACKEND, quality=QUALITY,
+                 render_scale=None, bloom=None, calibrate=False, endless=ENDLESS,
+                 vsync=VSYNC, pacing_report=False, record=None, practice=False):
+        self.startup = startup or StartupTimer()
+        self.endless = endless
+        # Practice mode: Backspace rewinds, and runs stay off the leaderboard
+        self.practice = practice
+        self.rewind = SnapshotRing() if practice else None
+        _init_pygame_subsystems()
+        self.startup.mark('pygame subsystems')
+
+        # Window and display backend; everything drawn in software goes to screen
+        self.display = open_display(renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), TITLE, vsync)
+        self.screen = self.display.surface
+        self.pacer = FramePacer(report=pacing_report)
+        self.startup.mark('display')
+
+        # Gameplay recording (F9 toggles); ``record`` names a format to start with
+        self.recorder = None
+        self.record_format = record or RECORD_FORMAT
+        if record:
+            self.toggle_recording()
+
+        # Audio: silent placeholders until the background loader installs
+        # the real mixer-backed voices and music
+        self.sounds = SoundBank()
+        self.voices = VoiceManager(self.sounds)
+        self.music = MusicStreamer()
+        self._audio_ready = None
+        threading.Thread(target=self._load_audio, name='audio-init', daemon=True).start()
+
+        # Fonts (loaded on first use)
         self.fonts = Fonts()
 
         # Particle system
         self.particles = ParticleSystem()
 
+        # Builds each stage's sprites while the one before it is played
+        self.prefetcher = StagePrefetcher(self.fonts, endless)
+
+        # Simulation clock: spawns, cooldowns and stage events run on its
+        # ticks, and it stops while the game is paused
+        self.scheduler = Scheduler()
+
         # Background
-        self.star_layers = create_star_layers()
         self.galaxy = None
-        self.galaxy_cooldown = random.randint(GALAXY_MIN_DELAY, GALAXY_MAX_DELAY)
+        self.galaxy_timer = self.scheduler.after(
+            random.randint(GALAXY_MIN_DELAY, GALAXY_MAX_DELAY), self._spawn_galaxy)
 
-        # Celestial
+        # Celestial (scheduled once a run starts)
         self.celestial_obj = None
-        self.celestial_cooldown = random.randint(CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX)
+        self.celestial_timer = self.scheduler.timer(self._spawn_celestial)
+        self.scheduler.every(1, self._move_background)
+        self.startup.mark('background')
 
         # High scores
         self.high_scores = load_high_scores()
+        self.startup.mark('high scores')
 
         # Game state
         self.state = 'TITLE'
@@ -77,35 +141,231 @@ class Game:
         self.player_x = SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2
         self.player_y = SCREEN_HEIGHT - PLAYER_HEIGHT - 10
         self.player_lives = PLAYER_LIVES
-        self.player_invincible = 0
+        self.invincible = self.scheduler.timer()  # counts down after a hit
         self.speed_boost_active = False
+        # Scripted input instead of the keyboard (see soak.py): called each
+        # frame with the game, returns (dx, fire) with dx -1, 0 or 1
+        self.autopilot = None
 
         # Score & stage
         self.score = 0
         self.stage = 1
-        self.stage_start_time = 0
-        self.stage_flash = 0
-        self.stage_announce = 0
+        self.stage_timer = self.scheduler.timer(self._next_stage)
+        self.run_start_tick = 0
+        self.stage_flash = self.scheduler.timer()
+        self.stage_announce = self.scheduler.timer()
 
         # Entities
         self.bullets = []
         self.enemies = []
         self.enemy_bullets = []
+        self.formations = Formations()  # moves the ships in self.enemies
 
-        # Screen shake
-        self.shake_intensity = 0
+        # Screen shake: the intensity is the countdown's remaining ticks
+        self.shake = self.scheduler.timer()
+
+        # World draw commands; the viewport covers shaken positions
+        self.render_queue = RenderQueue(
+            pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT).inflate(SHAKE_MAX * 2, SHAKE_MAX * 2))
+
+        # Static menus: snapshot of everything but the buttons, and the
+        # button hover state the screen was last drawn with
+        self.menu_frame = None
+        self.menu_hover = None
+
+        # Graphics quality: a preset, with any knobs set explicitly overriding it
+        self.quality_overrides = {key: value for key, value in
+                                  (('render_scale', render_scale), ('bloom', bloom))
+                                  if value is not None}
+        self.apply_quality(quality)
+        self.calibrate_pending = calibrate
+        self.startup.mark('quality')
 
         # Dynamic settings (applied from stage config)
         self.enemy_speed = STAGE_CONFIGS[0]['enemy_speed']
         self.enemy_spawn_time = STAGE_CONFIGS[0]['spawn_time']
         self.enemy_fire_chance = STAGE_CONFIGS[0]['fire_chance']
-        self.enemy_timer = 0
+        self.spawn_timer = self.scheduler.timer(self._spawn_wave)
+
+        # Exempt the objects built at startup (caches, fonts, stars, audio
+        # placeholders) from garbage collection: busy frames allocate
+        # thousands of objects, and the collections they trigger would
+        # otherwise keep rescanning them. This is process-wide and done once
+        # per Game; unfreezing first keeps a second Game in the same process
+        # from stacking its leftovers on top
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+    # ---------- Graphics quality ----------
+
+    def apply_quality(self, name):
+        """Set up rendering for a preset from ``QUALITY_PRESETS``.
+
+        Recreates the starfield; knobs passed to the constructor win over
+        the preset's.
+        """
+        preset = dict(QUALITY_PRESETS[name], **self.quality_overrides)
+        self.quality = name
+
+        # World surface: background and gameplay are drawn at render_scale,
+        # then scaled up to the screen under the full-resolution HUD and menus
+        render_scale = preset['render_scale']
+        if render_scale != 1 and self.display.name != 'software':
+            if 'render_scale' in self.quality_overrides:  # asked for, not the preset's
+                print('Note: render scale needs the software renderer — drawing at full size.')
+            render_scale = 1
+        self.render_scale = render_scale
+        if render_scale == 1:
+            self.world = self.screen
+            self.hud_queue = self.render_queue
+        else:
+            self.world = pygame.Surface((round(SCREEN_WIDTH * render_scale),
+                                         round(SCREEN_HEIGHT * render_scale)), 0, self.screen)
+            # A scaled world needs the HUD in a queue of its own
+            self.hud_queue = RenderQueue(self.screen.get_rect())
+
+        self.bloom = self._create_bloom() if preset['bloom'] else None
+        sprites.set_glow(preset['glow'] and self.bloom is None)
+        self.prefetcher.reset()
+        self.particles.density = preset['particles']
+        self.star_layers = create_star_layers(preset['stars'])
+        self.galaxy_arm_dots = preset['galaxy_arm_dots']
+        self.menu_frame = None
+
+    def calibrate_quality(self):
+        """Pick, apply and save the richest preset this machine draws in time.
+
+        The benchmark scene is drawn off screen; the window keeps showing
+        its last frame meanwhile.
+
+        Returns:
+            str: The chosen preset.
+        """
+        print('Calibrating graphics quality...')
+        display, state, stage = self.display, self.state, self.stage
+        rng_state = random.getstate()
+        self.display = OffscreenDisplay(self.screen.get_size())
+        self.screen = self.display.surface
+        try:
+            name, results = calibrate(self._benchmark_quality)
+        finally:
+            self.display = display
+            self.screen = display.surface
+            self.state, self.stage = state, stage
+            random.setstate(rng_state)
+            self._clear_entities()
+            self.celestial_obj = None
+            self.galaxy = None
+            self.galaxy_timer.start(random.randint(GALAXY_MIN_DELAY, GALAXY_MAX_DELAY))
+            self.shake.cancel()
+        self.apply_quality(name)
+        save_settings({'quality': name})
+        detail = ', '.join(f'{preset} {ms:.1f} ms' for preset, ms in results.items())
+        print(f'Graphics quality: {name} ({detail})')
+        return name
+
+    def _benchmark_quality(self, name, frames=CALIBRATION_FRAMES):
+        """Draw the calibration scene under a preset.
+
+        The scene is the last stage's backdrop with a full wave of enemies,
+        lasers in flight and an explosion every 10 frames.
+
+        Returns:
+            list of float: Each frame's draw time in seconds.
+        """
+        self.apply_quality(name)
+        random.seed(0)
+        self._clear_entities()
+        self.state = 'PLAYING'
+        self.stage = len(STAGE_CONFIGS)
+        self.celestial_obj = spawn_celestial(self.get_stage_config()['celestial'])
+        self.celestial_obj['y'] = SCREEN_HEIGHT / 3
+        self.galaxy = spawn_galaxy(self.galaxy_arm_dots)
+        self.galaxy['y'] = SCREEN_HEIGHT / 4
+        for i in range(12):
+            self.enemies.append(pygame.Rect(40 + i * 62, 60 + (i % 3) * 50,
+                                            ENEMY_WIDTH, ENEMY_HEIGHT))
+        for i in range(10):
+            self.bullets.append(pygame.Rect(80 + i * 70, 300 + (i % 4) * 40,
+                                            BULLET_WIDTH, BULLET_HEIGHT))
+            self.enemy_bullets.append(pygame.Rect(60 + i * 75, 220 + (i % 3) * 60,
+                                                  ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT))
+        times = []
+        for frame in range(frames):
+            if frame % 10 == 0:
+                enemy = self.enemies[frame // 10 % len(self.enemies)]
+                self.particles.spawn(enemy.centerx, enemy.centery, ENEMY_EXPLOSION_COLORS,
+                                     count=30, speed_range=(1.5, 6), lifetime=32)
+                self.shake.start(6)
+            self.scheduler.advance()
+            start = time.perf_counter()
+            self.draw()
+            times.append(time.perf_counter() - start)
+        return times
+
+    def _create_bloom(self):
+        """Return the bloom pass, or None where it cannot run.
+
+        Bloom reads back the frame, so it needs the software display.
+        """
+        if self.display.name != 'software':
+            print('Note: bloom needs the software renderer — using per-object glow.')
+            return None
+        try:
+            from bloom import Bloom
+            return Bloom(self.world.get_size())
+        except ImportError:
+            print('Note: numpy not found — using per-object glow instead of bloom.')
+            return None
+
+    # ---------- Recording ----------
+
+    def toggle_recording(self):
+        """Start recording presented frames, or finish the running recording."""
+        if self.recorder is None:
+            self.recorder = start_recording(self.display.frame(), self.record_format)
+            if self.recorder is not None:
+                print(f'Recording to {self.recorder.out_dir} (F9 to stop)')
+        else:
+            recorder, self.recorder = self.recorder, None
+            recorder.report(recorder.close())
+
+    # ---------- Practice ----------
+
+    def rewind_time(self):
+        """Jump back ``REWIND_SECONDS`` in practice mode, even from the game-over screen."""
+        if self.rewind is not None:
+            self.rewind.rewind(self)
+
+    # ---------- Audio ----------
+
+    def _load_audio(self):
+        """Open the mixer and load all effects (runs on a background thread)."""
+        started = time.perf_counter()
+        try:
+            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        except pygame.error as exc:
+            print(f'Note: audio unavailable ({exc}) — running without sound.')
+            return
+        self.sounds.preload()
+        self._audio_ready = (VoiceManager(self.sounds), MusicStreamer())
+        self.startup.mark_background('audio (mixer + sounds)', started)
+
+    def _install_audio(self):
+        """Swap in the loaded audio objects on the game thread."""
+        self.voices, self.music = self._audio_ready
+        self._audio_ready = None
+        if self.state in ('PLAYING', 'PAUSED'):
+            self.music.play(self.get_stage_config()['music'])
+            if self.state == 'PAUSED':
+                self.music.pause()
 
     # ---------- Helpers ----------
 
     def get_stage_config(self):
         """Return the config dict for the current stage."""
-        return STAGE_CONFIGS[min(self.stage - 1, len(STAGE_CONFIGS) - 1)]
+        return stage_config(self.stage, self.endless)
 
     def apply_stage_config(self):
         """Apply the current stage's difficulty settings."""
@@ -113,39 +373,81 @@ class Game:
         self.enemy_speed = cfg['enemy_speed']
         self.enemy_spawn_time = cfg['spawn_time']
         self.enemy_fire_chance = cfg['fire_chance']
+        period = ticks(self.enemy_spawn_time)
+        if self.spawn_timer.active:
+            # A faster stage brings the pending spawn forward
+            self.spawn_timer.start(min(self.spawn_timer.remaining, period), period)
+        else:
+            self.spawn_timer.period = period
+
+    def _clear_entities(self):
+        """Remove all bullets, enemies and explosions."""
+        self.bullets.clear()
+        self.enemies.clear()
+        self.enemy_bullets.clear()
+        self.formations.clear()
+        self.particles.clear()
 
     def reset(self):
         """Reset all game state for a new round."""
         self.player_x = SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2
         self.player_lives = PLAYER_LIVES
-        self.player_invincible = 0
+        self.invincible.cancel()
         self.speed_boost_active = False
         self.score = 0
         self.stage = 1
-        self.stage_flash = 0
-        self.stage_announce = 0
-        self.shake_intensity = 0
+        self.stage_flash.cancel()
+        self.stage_announce.cancel()
+        self.shake.cancel()
         self.celestial_obj = None
-        self.celestial_cooldown = random.randint(CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX)
+        self.celestial_timer.start(random.randint(CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX))
         self.apply_stage_config()
-        self.bullets.clear()
-        self.enemies.clear()
-        self.enemy_bullets.clear()
-        self.particles.clear()
-        self.stage_start_time = pygame.time.get_ticks()
-        self.enemy_timer = pygame.time.get_ticks()
+        self.prefetcher.stage_started(self.stage)
+        self._clear_entities()
+        if self.rewind is not None:
+            self.rewind.clear()
+        self.run_start_tick = self.scheduler.now
+        stage_ticks = ticks(STAGE_DURATION)
+        self.stage_timer.start(stage_ticks, stage_ticks)
+        self.spawn_timer.start(self.spawn_timer.period, self.spawn_timer.period)
+        self.scheduler.resume()
         self.state = 'PLAYING'
+        self.music.play(self.get_stage_config()['music'])
+
+    def fire(self):
+        """Fire a laser from the player's ship."""
+        bx = self.player_x + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2
+        self.bullets.append(pygame.Rect(bx, self.player_y, BULLET_WIDTH, BULLET_HEIGHT))
+        self.voices.play('laser', bx)
+
+    def _end_run(self):
+        """Stop the run's spawns and stage changes, and record it in the leaderboard."""
+        self.spawn_timer.cancel()
+        self.stage_timer.cancel()
+        if self.practice:
+            return
+        duration = round(self.scheduler.seconds(self.run_start_tick) * 1000)
+        self.high_scores = save_high_score(self.score, stage=self.stage, duration=duration)
 
     # ---------- Event handling ----------
 
     def handle_events(self):
         """Process all pygame events."""
         mouse_pos = pygame.mouse.get_pos()
+        if self._audio_ready is not None:
+            self._install_audio()
 
         for event in pygame.event.get():
+            if event.type == pygame.WINDOWEXPOSED:
+                self.menu_hover = None  # window content was lost: redraw the menu
+
             if event.type == pygame.QUIT:
                 if self.state in ('PLAYING', 'PAUSED'):
-                    save_high_score(self.score)
+                    self._end_run()
+                flush_high_scores()
+                if self.recorder is not None:
+                    self.toggle_recording()
+                self.pacer.report()
                 pygame.quit()
                 sys.exit()
 
@@ -159,8 +461,13 @@ class Game:
                 elif self.state == 'PAUSED':
                     if PAUSE_CONTINUE_RECT.collidepoint(mouse_pos):
                         self.state = 'PLAYING'
+                        self.scheduler.resume()
+                        self.music.resume()
                     elif PAUSE_QUIT_RECT.collidepoint(mouse_pos):
-                        self.high_scores = save_high_score(self.score)
+                        self._end_run()
+                        self.scheduler.resume()
+                        self.music.resume()
+                        self.music.stop()
                         self.state = 'TITLE'
                         self.bullets.clear()
                         self.enemies.clear()
@@ -168,35 +475,96 @@ class Game:
                         self.particles.clear()
 
             if event.type == pygame.KEYDOWN:
-                if self.state == 'PLAYING':
+                if event.key == pygame.K_F9:
+                    self.toggle_recording()
+                elif event.key == pygame.K_BACKSPACE and self.state in ('PLAYING', 'GAME_OVER'):
+                    self.rewind_time()
+                elif self.state == 'PLAYING':
                     if event.key == pygame.K_ESCAPE:
                         self.state = 'PAUSED'
+                        self.scheduler.pause()
+                        self.music.pause()
                     elif event.key == pygame.K_SPACE:
-                        bx = self.player_x + PLAYER_WIDTH // 2 - BULLET_WIDTH // 2
-                        by = self.player_y
-                        self.bullets.append(pygame.Rect(bx, by, BULLET_WIDTH, BULLET_HEIGHT))
-                        if self.sounds_available:
-                            self.laser_sound.play()
+                        self.fire()
                 elif self.state == 'PAUSED':
                     if event.key == pygame.K_ESCAPE:
                         self.state = 'PLAYING'
+                        self.scheduler.resume()
+                        self.music.resume()
                 elif self.state == 'GAME_OVER':
                     if event.key == pygame.K_r:
                         self.reset()
 
+    # ---------- Scheduled events ----------
+
+    def _spawn_wave(self):
+        """Spawn a wave of enemies (every ``enemy_spawn_time`` while a run lasts)."""
+        wave = self.formations.spawn(pick(self.get_stage_config()['formations']),
+                                     self.enemy_speed, self.player_x + PLAYER_WIDTH // 2)
+        self.enemies.extend(wave)
+        # Each ship of a formation counts as a spawn, so a large wave
+        # pushes the next one back
+        self.spawn_timer.postpone((len(wave) - 1) * self.spawn_timer.period)
+
+    def _next_stage(self):
+        """Move on to the next stage (every ``STAGE_DURATION`` until the last one)."""
+        self.stage += 1
+        if is_last_stage(self.stage, self.endless):
+            self.stage_timer.cancel()
+        self.stage_flash.start(12)
+        self.stage_announce.start(150)
+        self.apply_stage_config()
+        self.prefetcher.stage_started(self.stage)
+        self.music.play(self.get_stage_config()['music'])
+
+    def _spawn_galaxy(self):
+        """Send a galaxy drifting across the background."""
+        self.galaxy = spawn_galaxy(self.galaxy_arm_dots)
+
+    def _spawn_celestial(self):
+        """Send the stage's celestial body drifting across the background."""
+        self.celestial_obj = spawn_celestial(self.get_stage_config()['celestial'])
+
+    def _move_background(self):
+        """Drift the galaxy and celestial body; schedule the next once one has passed."""
+        if self.galaxy is not None:
+            self.galaxy['y'] += self.galaxy['speed']
+            self.galaxy['angle'] += 0.002
+            if self.galaxy['y'] > SCREEN_HEIGHT + self.galaxy['radius'] * 2:
+                self.galaxy = None
+                self.galaxy_timer.start(random.randint(GALAXY_MIN_DELAY, GALAXY_MAX_DELAY))
+        if self.celestial_obj is not None:
+            self.celestial_obj['y'] += self.celestial_obj['speed']
+            if self.celestial_obj['y'] > SCREEN_HEIGHT + 150:
+                self.celestial_obj = None
+                self.celestial_timer.start(
+                    random.randint(CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX))
+
     # ---------- Update ----------
 
     def update(self):
-        """Update game logic (only when PLAYING)."""
+        """Advance the simulation clock, then the game logic (only when PLAYING).
+
+        The title screen runs at ``MENU_FPS``, so its frames advance the
+        clock by several ticks.
+        """
+        self.scheduler.advance(FPS // MENU_FPS if self.state == 'TITLE' else 1)
         if self.state != 'PLAYING':
             return
 
-        # Player movement
+        # Player movement, from the keyboard or the autopilot
         current_speed = PLAYER_SPEED_BOOSTED if self.speed_boost_active else PLAYER_SPEED
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and self.player_x > 0:
+        if self.autopilot is not None:
+            dx, fire = self.autopilot(self)
+            left, right = dx < 0, dx > 0
+            if fire:
+                self.fire()
+        else:
+            keys = pygame.key.get_pressed()
+            left, right = keys[pygame.K_LEFT], keys[pygame.K_RIGHT]
+        if left and self.player_x > 0:
             self.player_x -= current_speed
-        if keys[pygame.K_RIGHT] and self.player_x < SCREEN_WIDTH - PLAYER_WIDTH:
+        if right and self.player_x < SCREEN_WIDTH - PLAYER_WIDTH:
             self.player_x += current_speed
 
         # Speed boost check
@@ -208,16 +576,8 @@ class Game:
             bullet.y -= BULLET_SPEED
         self.bullets = [b for b in self.bullets if b.y > 0]
 
-        # Enemy spawning
-        current_time = pygame.time.get_ticks()
-        if current_time - self.enemy_timer > self.enemy_spawn_time:
-            ex = random.randint(0, SCREEN_WIDTH - ENEMY_WIDTH)
-            self.enemies.append(pygame.Rect(ex, -ENEMY_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT))
-            self.enemy_timer = current_time
-
-        # Enemy movement
-        for enemy in self.enemies:
-            enemy.y += self.enemy_speed
+        # Enemy movement (spawning is scheduled: _spawn_wave)
+        self.formations.update(self.enemies)
 
         # Enemy firing
         for enemy in self.enemies:
@@ -233,47 +593,45 @@ class Game:
             eb.y += ENEMY_BULLET_SPEED
         self.enemy_bullets = [eb for eb in self.enemy_bullets if eb.y < SCREEN_HEIGHT]
 
-        # Player bullets vs enemies
-        for bullet in self.bullets[:]:
-            for enemy in self.enemies[:]:
-                if bullet.colliderect(enemy):
-                    ecx = enemy.x + ENEMY_WIDTH // 2
-                    ecy = enemy.y + ENEMY_HEIGHT // 2
-                    self.particles.spawn(ecx, ecy, ENEMY_EXPLOSION_COLORS,
-                                         count=30, speed_range=(1.5, 6), lifetime=32)
-                    self.shake_intensity = 6
-                    self.bullets.remove(bullet)
-                    self.enemies.remove(enemy)
-                    self.score += SCORE_PER_KILL
-                    if self.sounds_available:
-                        self.explosion_sound.play()
-                    break
+        # Player bullets vs enemies (each bullet hits the first enemy it overlaps)
+        surviving = []
+        for bullet in self.bullets:
+            hit = bullet.collidelist(self.enemies)
+            if hit < 0:
+                surviving.append(bullet)
+                continue
+            enemy = self.enemies.pop(hit)
+            ecx = enemy.x + ENEMY_WIDTH // 2
+            ecy = enemy.y + ENEMY_HEIGHT // 2
+            self.particles.spawn(ecx, ecy, ENEMY_EXPLOSION_COLORS,
+                                 count=30, speed_range=(1.5, 6), lifetime=32)
+            self.shake.start(6)
+            self.score += SCORE_PER_KILL
+            self.voices.play('explosion', ecx)
+        self.bullets = surviving
 
         # Enemy bullets vs player
-        if self.player_invincible > 0:
-            self.player_invincible -= 1
-        else:
+        if not self.invincible.active:
             player_rect = pygame.Rect(self.player_x, self.player_y,
                                       PLAYER_WIDTH, PLAYER_HEIGHT)
-            for eb in self.enemy_bullets[:]:
-                if eb.colliderect(player_rect):
-                    self.enemy_bullets.remove(eb)
-                    self.player_lives -= 1
-                    self.player_invincible = INVINCIBLE_DURATION
-                    if self.sounds_available:
-                        self.hit_sound.play()
-                    pcx = self.player_x + PLAYER_WIDTH // 2
-                    pcy = self.player_y + PLAYER_HEIGHT // 2
+            hit = player_rect.collidelist(self.enemy_bullets)
+            if hit >= 0:
+                del self.enemy_bullets[hit]
+                self.player_lives -= 1
+                self.invincible.start(INVINCIBLE_DURATION)
+                self.voices.play('hit', self.player_x + PLAYER_WIDTH // 2)
+                pcx = self.player_x + PLAYER_WIDTH // 2
+                pcy = self.player_y + PLAYER_HEIGHT // 2
+                self.particles.spawn(pcx, pcy, PLAYER_EXPLOSION_COLORS,
+                                     count=18, speed_range=(1, 4), lifetime=22)
+                self.shake.start(10)
+                if self.player_lives <= 0:
                     self.particles.spawn(pcx, pcy, PLAYER_EXPLOSION_COLORS,
-                                         count=18, speed_range=(1, 4), lifetime=22)
-                    self.shake_intensity = 10
-                    if self.player_lives <= 0:
-                        self.particles.spawn(pcx, pcy, PLAYER_EXPLOSION_COLORS,
-                                             count=55, speed_range=(2, 8), lifetime=45)
-                        self.shake_intensity = 18
-                        self.high_scores = save_high_score(self.score)
-                        self.state = 'GAME_OVER'
-                    break
+                                         count=55, speed_range=(2, 8), lifetime=45)
+                    self.shake.start(SHAKE_MAX)
+                    self._end_run()
+                    self.music.stop()
+                    self.state = 'GAME_OVER'
 
         # Escaped enemies — penalty
         surviving = []
@@ -284,141 +642,197 @@ class Game:
                 surviving.append(enemy)
         self.enemies = surviving
 
-        # Stage progression
-        if (current_time - self.stage_start_time > STAGE_DURATION
-                and self.stage < len(STAGE_CONFIGS)):
-            self.stage += 1
-            self.stage_start_time = current_time
-            self.stage_flash = 12
-            self.stage_announce = 150
-            self.apply_stage_config()
-
-        if self.stage_flash > 0:
-            self.stage_flash -= 1
-        if self.stage_announce > 0:
-            self.stage_announce -= 1
+        if self.rewind is not None:
+            self.rewind.record(self)
 
     # ---------- Draw ----------
 
+    def menu_is_static(self):
+        """True in menus where nothing animates: paused, or game over once settled."""
+        if self.state == 'PAUSED':
+            return True
+        return (self.state == 'GAME_OVER' and not self.particles.active
+                and not self.shake.active)
+
     def draw(self):
         """Render the current frame with optional screen shake."""
         mouse_pos = pygame.mouse.get_pos()
+        if self.menu_is_static():
+            self._draw_static_menu(mouse_pos)
+            return
+        self.menu_frame = None
 
         # Compute shake offset
         shake_x, shake_y = 0, 0
-        if self.shake_intensity > 0:
-            shake_x = random.randint(-self.shake_intensity, self.shake_intensity)
-            shake_y = random.randint(-self.shake_intensity, self.shake_intensity)
-            self.shake_intensity = max(0, self.shake_intensity - 1)
-
-        # Background
-        bg = self.get_stage_config()['bg'] if self.state in ('PLAYING', 'PAUSED') else DEFAULT_BG_COLOR
-        self.screen.fill(bg)
+        intensity = self.shake.remaining
+        if intensity:
+            shake_x = random.randint(-intensity, intensity)
+            shake_y = random.randint(-intensity, intensity)
 
-        # Stars
-        update_and_draw_stars(self.screen, self.star_layers)
-
-        # Galaxy
-        if self.galaxy is not None:
-            self.galaxy['y'] += self.galaxy['speed']
-            self.galaxy['angle'] += 0.002
-            draw_galaxy(self.screen, self.galaxy)
-            if self.galaxy['y'] > SCREEN_HEIGHT + self.galaxy['radius'] * 2:
-                self.galaxy = None
-                self.galaxy_cooldown = random.randint(GALAXY_MIN_DELAY, GALAXY_MAX_DELAY)
-        else:
-            self.galaxy_cooldown -= 1
-            if self.galaxy_cooldown <= 0:
-                self.galaxy = spawn_galaxy()
-
-        # Celestial bodies (during gameplay)
-        if self.state in ('PLAYING', 'PAUSED'):
-            if self.celestial_obj is not None:
-                if self.state == 'PLAYING':
-                    self.celestial_obj['y'] += self.celestial_obj['speed']
-                draw_celestial(self.screen, self.celestial_obj)
-                if self.celestial_obj['y'] > SCREEN_HEIGHT + 150:
-                    self.celestial_obj = None
-                    self.celestial_cooldown = random.randint(
-                        CELESTIAL_COOLDOWN_MIN, CELESTIAL_COOLDOWN_MAX)
-            else:
-                if self.state == 'PLAYING':
-                    self.celestial_cooldown -= 1
-                    if self.celestial_cooldown <= 0:
-                        self.celestial_obj = spawn_celestial(
-                            self.get_stage_config()['celestial'])
+        # The title screen runs at MENU_FPS; keep its animations at full speed
+        step = FPS // MENU_FPS if self.state == 'TITLE' else 1
+        self._draw_background(step)
 
         # Advance title animation counter
-        self.title_frame += 1
+        self.title_frame += step
 
         # State-specific drawing — gameplay uses shake offset
         if self.state == 'TITLE':
+            submit_title_ship(self.hud_queue, self.title_frame, PLAYER_WIDTH, PLAYER_HEIGHT)
+            self._flush_frame()
             draw_title_screen(self.screen, self.fonts, self.high_scores,
-                              mouse_pos, self.title_frame, PLAYER_WIDTH, PLAYER_HEIGHT)
+                              mouse_pos, self.title_frame)
 
         elif self.state == 'PLAYING':
-            # Render gameplay to buffer for shake effect
-            if shake_x != 0 or shake_y != 0:
-                buf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                self._draw_gameplay_to(buf, mouse_pos)
-                self.screen.blit(buf, (shake_x, shake_y))
-            else:
-                self._draw_gameplay_to(self.screen, mouse_pos)
-            draw_hud(self.screen, self.fonts, self.score, self.stage, self.player_lives,
-                     self.speed_boost_active)
-            draw_stage_effects(self.screen, self.fonts, self.stage,
-                               self.stage_flash, self.stage_announce)
-
-        elif self.state == 'PAUSED':
-            self._draw_gameplay_to(self.screen, mouse_pos)
-            draw_hud(self.screen, self.fonts, self.score, self.stage, self.player_lives,
-                     self.speed_boost_active)
-            draw_pause_screen(self.screen, self.fonts, self.score, self.stage, mouse_pos)
+            self._submit_gameplay()
+            self._submit_hud()
+            submit_stage_effects(self.hud_queue, self.fonts, self.stage,
+                                 self.stage_flash.remaining, self.stage_announce.remaining)
+            self._flush_frame((shake_x, shake_y))
 
         elif self.state == 'GAME_OVER':
-            # Still apply shake to explosion aftermath
-            if shake_x != 0 or shake_y != 0:
-                buf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                self.particles.update_and_draw(buf)
-                self.screen.blit(buf, (shake_x, shake_y))
+            # Still apply shake to explosion aftermath. Drawn in software: the
+            # backdrop's dimmer has to be composited over the particles
+            self.particles.update_and_submit(self.render_queue)
+            self._submit_bloom()
+            self._flush_frame((shake_x, shake_y), software=True)
+            draw_game_over_backdrop(self.screen, self.fonts, self.score, self.stage,
+                                    self.high_scores)
+            draw_game_over_buttons(self.screen, self.fonts, mouse_pos)
+
+        self._present()
+
+    def _present(self):
+        """Show the finished frame, recording it first if a recording is running."""
+        if self.recorder is not None:
+            self.recorder.capture(self.display.frame())
+        self.display.present()
+
+    def _flush_frame(self, offset=(0, 0), software=False):
+        """Draw the queued world and HUD, shaking the world by ``offset``.
+
+        A scaled world is drawn into ``world`` and scaled up to the screen
+        before the HUD. ``software`` draws onto ``screen`` even with the
+        texture backend, for frames that are composited further in software.
+        """
+        if self.world is not self.screen:
+            self.render_queue.flush(self.world, offset, self.render_scale)
+            pygame.transform.scale(self.world, self.screen.get_size(), self.screen)
+            self.hud_queue.flush(self.screen)
+        elif software:
+            self.render_queue.flush(self.screen, offset)
+        else:
+            self.display.flush(self.render_queue, offset)
+
+    def _draw_background(self, step=1):
+        """Fill the stage color, draw stars, and queue the galaxy and celestial body."""
+        # Background
+        bg = self.get_stage_config()['bg'] if self.state in ('PLAYING', 'PAUSED') else DEFAULT_BG_COLOR
+        self.world.fill(bg)
+
+        # Stars
+        update_and_draw_stars(self.world, self.star_layers, step, self.render_scale)
+
+        # Galaxy and celestial body (during gameplay); they move on the
+        # scheduler's ticks (_move_background)
+        if self.galaxy is not None:
+            submit_galaxy(self.render_queue, self.galaxy)
+        if self.celestial_obj is not None and self.state in ('PLAYING', 'PAUSED'):
+            submit_celestial(self.render_queue, self.celestial_obj)
+
+    def _draw_static_menu(self, mouse_pos):
+        """Draw a static menu from its snapshot, only when a button's hover changes."""
+        if self.state == 'PAUSED':
+            buttons = (PAUSE_CONTINUE_RECT, PAUSE_QUIT_RECT)
+        else:
+            buttons = (GAME_OVER_BUTTON_RECT,)
+        hover = tuple(rect.collidepoint(mouse_pos) for rect in buttons)
+        if self.menu_frame is None:
+            # Compose the frozen scene and menu text once
+            self._draw_background()
+            if self.state == 'PAUSED':
+                self._submit_gameplay()
+                self._submit_hud()
+            self._flush_frame(software=True)
+            if self.state == 'PAUSED':
+                draw_pause_backdrop(self.screen, self.fonts)
             else:
-                self.particles.update_and_draw(self.screen)
-            draw_game_over_screen(self.screen, self.fonts, self.score, self.stage,
-                                  self.high_scores, mouse_pos)
+                draw_game_over_backdrop(self.screen, self.fonts, self.score, self.stage,
+                                        self.high_scores)
+            self.menu_frame = self.screen.copy()
+        elif hover == self.menu_hover:
+            return
+        else:
+            self.screen.blit(self.menu_frame, (0, 0))
+        self.menu_hover = hover
 
-        pygame.display.flip()
+        if self.state == 'PAUSED':
+            draw_pause_buttons(self.screen, self.fonts, mouse_pos)
+        else:
+            draw_game_over_buttons(self.screen, self.fonts, mouse_pos)
+        self._present()
 
-    def _draw_gameplay_to(self, target, mouse_pos):
-        """Draw player, enemies, bullets, and explosions to a target surface."""
+    def _submit_gameplay(self):
+        """Queue player, enemies, bullets, and explosions for drawing.
+
+        The queue culls off-screen objects; its flush applies the screen shake.
+        """
         cfg = self.get_stage_config()
+        queue = self.render_queue
 
         # Player (blink when invincible)
-        if self.player_invincible == 0 or (self.player_invincible // 4) % 2 == 0:
-            draw_player_ship(target, self.player_x, self.player_y,
-                             PLAYER_WIDTH, PLAYER_HEIGHT)
+        invincible = self.invincible.remaining
+        if invincible == 0 or (invincible // 4) % 2 == 0:
+            submit_player_ship(queue, self.player_x, self.player_y,
+                               PLAYER_WIDTH, PLAYER_HEIGHT)
 
         # Player lasers
-        for bullet in self.bullets:
-            draw_laser(target, bullet)
+        submit_lasers(queue, self.bullets)
 
         # Enemy lasers
-        for eb in self.enemy_bullets:
-            draw_enemy_laser(target, eb)
+        submit_enemy_lasers(queue, self.enemy_bullets)
 
         # Enemies
-        for enemy in self.enemies:
-            draw_enemy_ship(target, enemy.x, enemy.y, ENEMY_WIDTH, ENEMY_HEIGHT,
-                            cfg['enemy_body'], cfg['enemy_wing'])
+        submit_enemy_ships(queue, [(enemy.x, enemy.y) for enemy in self.enemies],
+                           ENEMY_WIDTH, ENEMY_HEIGHT, cfg['enemy_body'], cfg['enemy_wing'])
 
         # Explosions
-        self.particles.update_and_draw(target)
+        self.particles.update_and_submit(queue)
+        self._submit_bloom()
+
+    def _submit_bloom(self):
+        """Queue the bloom pass over everything below the HUD, if enabled."""
+        if self.bloom is not None:
+            self.render_queue.call(LAYER_BLOOM, self.bloom.apply)
+
+    def _submit_hud(self):
+        """Queue the HUD (on a screen layer, so it never shakes)."""
+        submit_hud(self.hud_queue, self.fonts, self.score, self.stage, self.player_lives,
+                   self.speed_boost_active)
 
     # ---------- Main loop ----------
 
     def run(self):
         """Run the game loop."""
+        first_frame = True
         while True:
             self.handle_events()
             self.update()
+            self.music.update()
             self.draw()
-            self.clock.tick(FPS)
+            if first_frame:
+                self.startup.mark('first frame')
+                self.startup.report()
+                first_frame = False
+                if self.calibrate_pending:
+                    self.calibrate_pending = False
+                    self.calibrate_quality()
+                self.prefetcher.request(1)
+            if self.menu_is_static():
+                # Sleep until input arrives, waking at IDLE_FPS otherwise
+                event = pygame.event.wait(1000 // IDLE_FPS)
+                if event.type != pygame.NOEVENT:
+                    pygame.event.post(event)
+                self.pacer.tick(FPS, record=False)
+            else:
+                self.pacer.tick(MENU_FPS if self.state == 'TITLE' else FPS)
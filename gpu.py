@@ -0,0 +1,226 @@
+"""Display backends for Space Blaster: software surface or GPU textures.
+
+``SoftwareDisplay`` draws everything into the surface returned by
+``pygame.display.set_mode``, as the game always has. ``TextureDisplay``
+opens the window through ``pygame._sdl2.video`` instead. Sprites queued
+on a ``RenderQueue`` are uploaded once as textures and drawn as renderer
+copies with blend modes, so on an accelerated renderer their cost stops
+growing with particle and glow counts. Whatever is still drawn in
+software (starfield, text, menus) goes onto ``surface``, which is
+uploaded as a full-screen layer each time the queue is flushed and again
+on ``present``. After a flush that layer starts out transparent, so only
+straight-alpha drawing belongs there; a dimmer blitted with a surface
+alpha would come out opaque. SDL's software renderer is supported as
+well, which is how the backend runs headless.
+
+Both backends share one interface: ``surface``, ``vsync``,
+``flush(queue, offset)``, ``frame()`` and ``present()``.
+``OffscreenDisplay`` implements it without a window.
+"""
+
+import weakref
+
+import pygame
+
+from sprites import BLEND, unpremultiplied
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:  # pygame built without the SDL2 video module
+    Renderer = None
+
+BACKENDS = ('software', 'gpu')
+
+# SDL blend modes and factors (SDL_blendmode.h)
+_BLENDMODE_BLEND = 1
+_FACTOR_ONE = 2
+_FACTOR_ONE_MINUS_SRC_ALPHA = 6
+_OPERATION_ADD = 1
+
+
+def open_display(backend, size, title, vsync=False):
+    """Open the game window with the named backend.
+
+    Falls back to ``SoftwareDisplay`` when the GPU backend is unavailable.
+    With ``vsync``, presenting waits for the display's refresh if the
+    platform supports it; the display's ``vsync`` says whether it does.
+
+    Returns:
+        SoftwareDisplay or TextureDisplay
+    """
+    if backend == 'gpu':
+        try:
+            return TextureDisplay(size, title, vsync)
+        except RuntimeError as exc:  # includes pygame.error and SDL errors
+            print(f'GPU renderer unavailable ({exc}); using software rendering')
+    return SoftwareDisplay(size, title, vsync)
+
+
+class SoftwareDisplay:
+    """Draws straight into the window surface.
+
+    SDL only offers vsync for a window surface through its renderer, so
+    with ``vsync`` the window is opened with ``pygame.SCALED``.
+    """
+
+    name = 'software'
+    vsync = False
+
+    def __init__(self, size, title, vsync=False):
+        if vsync:
+            try:
+                self.surface = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync = True
+            except pygame.error as exc:
+                print(f'Note: vsync unavailable ({exc}) — frames are paced by timer only')
+        if not self.vsync:
+            self.surface = pygame.display.set_mode(size)
+        pygame.display.set_caption(title)
+
+    def flush(self, queue, offset=(0, 0)):
+        """Draw a render queue onto the window surface."""
+        return queue.flush(self.surface, offset)
+
+    def frame(self):
+        """Return a surface holding the finished frame (for recording)."""
+        return self.surface
+
+    def present(self):
+        """Show the finished frame."""
+        pygame.display.flip()
+
+
+class OffscreenDisplay(SoftwareDisplay):
+    """Draws into a surface of its own and never shows it (for benchmarks)."""
+
+    def __init__(self, size):
+        self.surface = pygame.Surface(size)
+
+    def present(self):
+        """Finish the frame without showing it."""
+
+
+class TextureDisplay:
+    """Draws queued sprites as textures through an SDL renderer.
+
+    Raises ``RuntimeError`` (or a subclass, from SDL) if
+    ``pygame._sdl2.video`` is missing or no renderer can be created.
+    """
+
+    name = 'gpu'
+
+    def __init__(self, size, title, vsync=False):
+        if Renderer is None:
+            raise RuntimeError('pygame._sdl2.video is not available')
+        self.window = Window(title, size)
+        self.renderer = Renderer(self.window, accelerated=-1, vsync=vsync)
+        self.vsync = vsync
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        # Software-drawn layer; scratch surface for queued draw calls
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self._scratch = pygame.Surface(size, pygame.SRCALPHA)
+        # Streaming textures for the layers and draw calls of one frame. Each
+        # is used once per frame: updating a texture the renderer still has
+        # queued copies of would force SDL to flush its batch early.
+        self._streams = []
+        self._streams_used = 0
+        self._textures = weakref.WeakKeyDictionary()
+        self._premultiplied = self._premultiplied_blend_mode()
+
+    def _premultiplied_blend_mode(self):
+        """Return SDL's premultiplied-alpha blend mode, or None if unsupported.
+
+        SDL's software renderer only supports the predefined modes; there
+        premultiplied sprites are converted back to straight alpha on upload.
+        """
+        mode = Renderer.compose_custom_blend_mode(
+            (_FACTOR_ONE, _FACTOR_ONE_MINUS_SRC_ALPHA, _OPERATION_ADD),
+            (_FACTOR_ONE, _FACTOR_ONE_MINUS_SRC_ALPHA, _OPERATION_ADD))
+        probe = Texture(self.renderer, (1, 1))
+        try:
+            probe.blend_mode = mode
+        except RuntimeError:  # pygame._sdl2's error type
+            return None
+        return mode
+
+    def _texture(self, surf, flags):
+        """Return the texture for a sprite surface, uploading it on first use."""
+        texture = self._textures.get(surf)
+        if texture is None:
+            if flags == BLEND and self._premultiplied is None:
+                texture = Texture.from_surface(self.renderer, unpremultiplied(surf))
+                texture.blend_mode = _BLENDMODE_BLEND
+            else:
+                texture = Texture.from_surface(self.renderer, surf)
+                texture.blend_mode = self._premultiplied if flags == BLEND else _BLENDMODE_BLEND
+            self._textures[surf] = texture
+        return texture
+
+    def _stream(self):
+        """Return the next unused full-screen streaming texture of this frame."""
+        if self._streams_used == len(self._streams):
+            texture = Texture(self.renderer, self.surface.get_size(), streaming=True)
+            texture.blend_mode = _BLENDMODE_BLEND
+            self._streams.append(texture)
+        self._streams_used += 1
+        return self._streams[self._streams_used - 1]
+
+    def _draw_layer(self):
+        """Upload the software-drawn layer, draw it and start a fresh one."""
+        layer = self._stream()
+        layer.update(self.surface)
+        layer.draw()
+        self.surface.fill((0, 0, 0, 0))
+
+    def _draw_call(self, fn, args, offset):
+        """Run a queued draw call on the scratch surface and draw the result."""
+        scratch = self._scratch
+        rect = fn(scratch, (*offset, 1), *args)
+        if rect is None:
+            rect = scratch.get_rect()
+        rect = rect.clip(scratch.get_rect())
+        if rect.w and rect.h:
+            texture = self._stream()
+            texture.update(scratch.subsurface(rect), rect)
+            texture.draw(srcrect=rect, dstrect=rect)
+            scratch.fill((0, 0, 0, 0), rect)
+
+    def flush(self, queue, offset=(0, 0)):
+        """Draw the software layer so far, then the queue as texture copies.
+
+        Returns:
+            dict: The queue's ``stats`` for this flush.
+        """
+        self._draw_layer()
+        texture = self._texture
+        for run, args, (dx, dy) in queue.drain(offset):
+            if args is not None:
+                self._draw_call(run, args, (dx, dy))
+                continue
+            # Runs are grouped by texture, which lets SDL batch the copies
+            for src, (x, y), _, flags in run:
+                tex = texture(src, flags)
+                if flags != BLEND:
+                    # Straight-alpha surfaces may carry a surface alpha that changes
+                    alpha = src.get_alpha()
+                    tex.alpha = 255 if alpha is None else alpha
+                tex.draw(dstrect=(x + dx, y + dy))
+        return queue.stats
+
+    def frame(self):
+        """Draw the remaining software layer and read the finished frame back.
+
+        Returns:
+            pygame.Surface: A new surface; reading back is a GPU sync point.
+        """
+        self._draw_layer()
+        return self.renderer.to_surface()
+
+    def present(self):
+        """Draw the remaining software layer and show the frame."""
+        self._draw_layer()
+        self.renderer.present()
+        self.renderer.clear()
+        self._streams_used = 0
+
@@ -1,7 +1,71 @@
 #!/usr/bin/env python3
-"""Entry point for Space Blaster."""
+"""Entry point for Space Blaster.
 
-from game import Game
+Usage:
+    python main.py [--quality NAME] [--calibrate] [--endless] [--practice]
+                   [--renderer NAME] [--render-scale X] [--bloom] [--vsync]
+                   [--record FORMAT] [--startup-report] [--pacing-report]
+
+Without ``--quality`` the preset saved by the last ``--calibrate`` is used,
+or ``QUALITY`` from config.py if there is none.
+"""
+
+import argparse
 
 if __name__ == '__main__':
-    Game().run()
+    from startup import StartupTimer
+    # Started before the heavy imports and enabled once the flags are parsed
+    startup = StartupTimer()
+    from config import (
+        RENDER_BACKEND, QUALITY, QUALITY_PRESETS, AUTO_CALIBRATE, ENDLESS, VSYNC,
+    )
+    from gpu import BACKENDS
+    from recorder import FORMATS
+    from quality import saved_quality
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quality', choices=QUALITY_PRESETS, help='graphics preset')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='benchmark the presets and save the best one that keeps the '
+                             'frame rate')
+    parser.add_argument('--endless', action='store_true',
+                        help='keep going past the last stage, ever faster')
+    parser.add_argument('--practice', action='store_true',
+                        help='Backspace rewinds a few seconds; runs are not saved to the '
+                             'leaderboard')
+    parser.add_argument('--renderer', choices=BACKENDS, default=RENDER_BACKEND,
+                        help="'gpu' draws sprites as textures through SDL's renderer")
+    parser.add_argument('--render-scale', type=float, metavar='X',
+                        help='draw the world at X (0.25-1) of the window size and scale it up; '
+                             'HUD and menus stay sharp')
+    parser.add_argument('--bloom', action='store_true',
+                        help='glow bright objects with a bloom pass instead of per-sprite glow '
+                             '(software renderer)')
+    parser.add_argument('--vsync', action='store_true',
+                        help="wait for the display's refresh when showing a frame")
+    parser.add_argument('--record', choices=FORMATS, metavar='FORMAT',
+                        help=f'record every presented frame from the start, as '
+                             f'{" or ".join(FORMATS)} frames (F9 toggles recording anytime)')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print a per-phase timing breakdown once the title screen is up')
+    parser.add_argument('--pacing-report', action='store_true',
+                        help='print frame pacing statistics (jitter, missed deadlines) on exit')
+    args = parser.parse_args()
+    if args.render_scale is not None and not 0.25 <= args.render_scale <= 1:
+        parser.error('--render-scale must be a number from 0.25 to 1')
+    startup.enabled = args.startup_report
+
+    quality, calibrate = args.quality, args.calibrate
+    if quality is None:
+        quality = saved_quality()
+        if quality is None:
+            quality = QUALITY
+            calibrate = calibrate or AUTO_CALIBRATE
+    from game import Game
+    startup.mark('import modules')
+    Game(startup=startup, renderer=args.renderer, quality=quality,
+         render_scale=args.render_scale, bloom=True if args.bloom else None,
+         calibrate=calibrate, endless=ENDLESS or args.endless, vsync=VSYNC or args.vsync,
+         pacing_report=args.pacing_report, record=args.record,
+         practice=args.practice).run()
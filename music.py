@@ -0,0 +1,154 @@
+"""Streaming procedural stage music for Space Blaster.
+
+A worker thread synthesizes the soundtrack in short NumPy chunks (bass,
+arpeggio lead, kick and hi-hat, layered by intensity) and hands them to the
+main thread through a small bounded queue; ``update()`` feeds them into a
+dedicated ``pygame.mixer.Channel`` queue. Memory stays at a few chunks and a
+stage change is a single attribute swap on the game thread.
+"""
+
+import queue
+import threading
+
+import pygame
+
+from config import (
+    SAMPLE_RATE, MUSIC_CHANNEL, MUSIC_CHUNK_SECONDS, MUSIC_QUEUE_CHUNKS, MUSIC_VOLUME,
+)
+
+# Semitone offsets: chord roots per bar, and the arpeggio over each chord
+PROGRESSION = (0, 0, 5, 3)
+ARPEGGIO = (0, 3, 7, 10, 12, 10, 7, 3)
+
+
+def render_chunk(np, start, n, music, rng):
+    """Synthesize ``n`` stereo samples starting at sample ``start``.
+
+    Time is derived from the absolute sample index, so consecutive chunks
+    join without phase jumps.
+
+    Returns:
+        np.ndarray: int16 array of shape (n, 2).
+    """
+    tempo, root, intensity = music['tempo'], music['root'], music['intensity']
+    t = (start + np.arange(n)) / SAMPLE_RATE
+    step_len = 60.0 / tempo / 4  # sixteenth notes
+    step = (t // step_len).astype(np.int64)
+    step_t = t - step * step_len
+    beat_t = t - (step // 4) * 4 * step_len
+
+    chord = root * 2.0 ** (np.take(PROGRESSION, (step // 16) % len(PROGRESSION)) / 12)
+
+    # Bass: triangle on the chord root, re-struck every beat
+    bass = (2 / np.pi) * np.arcsin(np.sin(2 * np.pi * chord * t)) * np.exp(-beat_t * 5)
+    # Lead: square-wave arpeggio two octaves up, one note per sixteenth
+    lead_f = chord * 4 * 2.0 ** (np.take(ARPEGGIO, step % len(ARPEGGIO)) / 12)
+    lead = np.sign(np.sin(2 * np.pi * lead_f * t)) * np.exp(-step_t * 14)
+
+    left = 0.35 * bass + 0.12 * intensity * lead
+    right = 0.35 * bass + 0.08 * intensity * lead
+    if intensity >= 0.4:
+        # Kick: pitch-dropping sine on every beat
+        phase = 2 * np.pi * (50 * beat_t + (100 / 30) * (1 - np.exp(-beat_t * 30)))
+        kick = 0.5 * np.sin(phase) * np.exp(-beat_t * 12)
+        left += kick
+        right += kick
+    if intensity >= 0.6:
+        # Hi-hat: short noise bursts on the off-beat sixteenths
+        hat = 0.12 * intensity * rng.uniform(-1, 1, n) * np.exp(-step_t * 60) * (step % 2)
+        left += 0.6 * hat
+        right += hat
+
+    out = np.empty((n, 2), np.int16)
+    out[:, 0] = np.clip(left, -1.0, 1.0) * 32767
+    out[:, 1] = np.clip(right, -1.0, 1.0) * 32767
+    return out
+
+
+class MusicStreamer:
+    """Per-stage soundtrack synthesized on a worker thread and streamed in chunks.
+
+    Call ``play(music)`` with a stage's ``'music'`` config to start or
+    switch tracks, and ``update()`` once per frame to keep the channel fed.
+    """
+
+    def __init__(self):
+        try:
+            import numpy  # noqa: F401
+            self.available = pygame.mixer.get_init() is not None
+        except ImportError:
+            self.available = False
+        self._queue = queue.Queue(maxsize=MUSIC_QUEUE_CHUNKS)
+        self._state = (0, None)  # (generation, music params or None when stopped)
+        self._wake = threading.Event()
+        self._thread = None
+        self._channel = None
+        if self.available:
+            if pygame.mixer.get_num_channels() <= MUSIC_CHANNEL:
+                pygame.mixer.set_num_channels(MUSIC_CHANNEL + 1)
+            pygame.mixer.set_reserved(MUSIC_CHANNEL + 1)
+            self._channel = pygame.mixer.Channel(MUSIC_CHANNEL)
+
+    def play(self, music):
+        """Start (or switch to) the track for the given stage music params."""
+        if not self.available or music == self._state[1]:
+            return
+        self._state = (self._state[0] + 1, music)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='music', daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def stop(self, fade_ms=600):
+        """Fade out and stop synthesizing."""
+        if not self.available:
+            return
+        self._state = (self._state[0] + 1, None)
+        self._channel.fadeout(fade_ms)
+
+    def pause(self):
+        if self.available:
+            self._channel.pause()
+
+    def resume(self):
+        if self.available:
+            self._channel.unpause()
+
+    def update(self):
+        """Queue the next chunk on the music channel if it has room (game thread)."""
+        if not self.available or self._state[1] is None or self._channel.get_queue():
+            return
+        gen = self._state[0]
+        while True:
+            try:
+                chunk_gen, sound = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if chunk_gen == gen:
+                self._channel.queue(sound)
+                return
+            # Chunk from a previous stage: drop it and try the next one
+
+    def _run(self):
+        import numpy as np
+
+        rng = np.random.default_rng()
+        n = int(SAMPLE_RATE * MUSIC_CHUNK_SECONDS)
+        gen, pos = None, 0
+        while True:
+            state_gen, music = self._state
+            if music is None:
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+            if state_gen != gen:
+                gen, pos = state_gen, 0  # new track starts from the top
+            sound = pygame.sndarray.make_sound(render_chunk(np, pos, n, music, rng))
+            sound.set_volume(MUSIC_VOLUME)
+            pos += n
+            while self._state[0] == gen:
+                try:
+                    self._queue.put((gen, sound), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
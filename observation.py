@@ -0,0 +1,118 @@
+"""Low-resolution occupancy observations for bots and analytics.
+
+Rasterizes entity rectangles straight into a reusable NumPy buffer — no
+pygame surfaces involved, so it works headless and costs microseconds per
+frame.
+"""
+
+import math
+
+import numpy as np
+
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT,
+    PLAYER_WIDTH, PLAYER_HEIGHT,
+    BULLET_WIDTH, BULLET_HEIGHT,
+    ENEMY_WIDTH, ENEMY_HEIGHT,
+    ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT,
+)
+from env import PLAYER_Y
+
+# Channel order
+CH_PLAYER = 0
+CH_ENEMIES = 1
+CH_BULLETS = 2
+CH_ENEMY_BULLETS = 3
+NUM_CHANNELS = 4
+
+
+class ObservationRenderer:
+    """Occupancy grid renderer with one uint8 channel per entity class.
+
+    Cells covered by an entity are set to 255. ``render`` returns the same
+    buffer every call, shape (NUM_CHANNELS, height, width); copy it if you
+    need to keep a frame.
+    """
+
+    def __init__(self, width=84, height=84):
+        self.width = width
+        self.height = height
+        self.sx = width / SCREEN_WIDTH
+        self.sy = height / SCREEN_HEIGHT
+        self.buffer = np.zeros((NUM_CHANNELS, height, width), np.uint8)
+        self._batch = None
+
+    def _fill(self, channel, x, y, w, h):
+        """Mark the cells overlapped by one screen-space rectangle."""
+        x0 = max(0, x * self.width // SCREEN_WIDTH)
+        y0 = max(0, y * self.height // SCREEN_HEIGHT)
+        x1 = min(self.width, -(-(x + w) * self.width // SCREEN_WIDTH))
+        y1 = min(self.height, -(-(y + h) * self.height // SCREEN_HEIGHT))
+        if x0 < x1 and y0 < y1:
+            channel[y0:y1, x0:x1] = 255
+
+    def render(self, game):
+        """Rasterize the current entity state of a ``Game``.
+
+        Returns:
+            np.ndarray: The shared occupancy buffer.
+        """
+        buf = self.buffer
+        buf.fill(0)
+        self._fill(buf[CH_PLAYER], game.player_x, game.player_y, PLAYER_WIDTH, PLAYER_HEIGHT)
+        fill, ch = self._fill, buf[CH_ENEMIES]
+        for r in game.enemies:
+            fill(ch, r.x, r.y, r.w, r.h)
+        ch = buf[CH_BULLETS]
+        for r in game.bullets:
+            fill(ch, r.x, r.y, r.w, r.h)
+        ch = buf[CH_ENEMY_BULLETS]
+        for r in game.enemy_bullets:
+            fill(ch, r.x, r.y, r.w, r.h)
+        return buf
+
+    # ---------- Batched ----------
+
+    def _fill_batch(self, out, xs, ys, alive, w, h):
+        """Mark cells for slot arrays xs/ys of shape (K, N) into out (K, H, W).
+
+        Only live slots are touched: each rectangle spans at most a few
+        cells, so the loop runs over cell offsets and scatters all
+        rectangles at once per offset.
+        """
+        k, n = np.nonzero(alive)
+        x, y = xs[k, n], ys[k, n]
+        x0 = np.maximum(0, x * self.width // SCREEN_WIDTH).astype(np.intp)
+        y0 = np.maximum(0, y * self.height // SCREEN_HEIGHT).astype(np.intp)
+        x1 = np.minimum(self.width, -(-(x + w) * self.width // SCREEN_WIDTH)).astype(np.intp)
+        y1 = np.minimum(self.height, -(-(y + h) * self.height // SCREEN_HEIGHT)).astype(np.intp)
+        for dy in range(math.ceil(h * self.sy) + 1):
+            rows = y0 + dy
+            in_y = rows < y1
+            for dx in range(math.ceil(w * self.sx) + 1):
+                cols = x0 + dx
+                sel = in_y & (cols < x1)
+                out[k[sel], rows[sel], cols[sel]] = 255
+
+    def render_batch(self, env):
+        """Rasterize every instance of an ``env.BatchEnv``.
+
+        Returns:
+            np.ndarray: uint8 buffer of shape (K, NUM_CHANNELS, height, width),
+            reused between calls.
+        """
+        k = env.num_envs
+        if self._batch is None or self._batch.shape[0] != k:
+            self._batch = np.zeros((k, NUM_CHANNELS, self.height, self.width), np.uint8)
+        out = self._batch
+        out.fill(0)
+        px = env.player_x[:, None].astype(np.float32)
+        self._fill_batch(out[:, CH_PLAYER], px, np.full_like(px, PLAYER_Y),
+                         np.ones_like(px, bool), PLAYER_WIDTH, PLAYER_HEIGHT)
+        self._fill_batch(out[:, CH_ENEMIES], env.enemy_x, env.enemy_y, env.enemy_alive,
+                         ENEMY_WIDTH, ENEMY_HEIGHT)
+        self._fill_batch(out[:, CH_BULLETS], env.bullet_x, env.bullet_y, env.bullet_alive,
+                         BULLET_WIDTH, BULLET_HEIGHT)
+        self._fill_batch(out[:, CH_ENEMY_BULLETS], env.enemy_bullet_x, env.enemy_bullet_y,
+                         env.enemy_bullet_alive, ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT)
+        return out
@@ -0,0 +1,146 @@
+"""Frame pacing for Space Blaster: precise deadlines and jitter statistics.
+
+``pygame.time.Clock.tick`` sleeps with the operating system's timer
+granularity, so frames are delivered unevenly even when the work fits in
+the frame budget. ``FramePacer`` keeps a ``perf_counter_ns`` deadline per
+frame. It sleeps until just before the deadline and spin-waits for the
+last fraction of a millisecond.
+
+Each recorded frame goes into two measurements. These separate pacing
+problems from workload problems:
+
+- jitter: how far the frame-to-frame interval strayed from the target
+  period. It is kept as a histogram. High jitter with few missed
+  deadlines points at pacing (late wake-ups).
+- missed deadlines: the frame's work ran past its deadline, so there was
+  nothing left to wait for. That is a workload problem.
+
+With vsync (see ``gpu.open_display``) ``present`` already waits for the
+display, and the pacer mostly finds its deadline passed. It still holds
+the game to ``FPS`` on displays with faster refresh rates.
+"""
+
+import time
+
+from config import PACING_SPIN_MS
+
+# Upper edges (ms) of the jitter histogram buckets; the last bucket is open
+JITTER_BUCKETS = (0.25, 0.5, 1, 2, 4, 8)
+
+
+class FramePacer:
+    """Waits for each frame's deadline and records how evenly frames arrive.
+
+    ``report`` enables the printed summary (``main.py --pacing-report``);
+    the statistics are recorded either way.
+    """
+
+    def __init__(self, spin_ms=PACING_SPIN_MS, report=False):
+        self.spin_ns = int(spin_ms * 1e6)
+        self.report_enabled = report
+        self._deadline = None
+        self._period = None
+        self._last = None
+        self._hold = False
+        self.frames = 0
+        self.missed = 0
+        self.histogram = [0] * (len(JITTER_BUCKETS) + 1)
+        self.wake_error_ns = 0  # total time woken past the deadline (pacing error)
+        self.work_ns = 0        # total time between a frame's start and its wait
+        self.jitter_ns = 0
+        self.worst_jitter_ns = 0
+
+    def tick(self, fps, record=True):
+        """Wait for the end of the frame at ``fps`` frames per second.
+
+        Pass ``record=False`` for frames that should stay out of the
+        statistics, e.g. after an idle wait for input. The next frame's
+        interval is not recorded either, since it starts from that wait.
+
+        Returns:
+            float: Milliseconds since the previous call, like ``Clock.tick``.
+        """
+        period = 1_000_000_000 // fps
+        now = time.perf_counter_ns()
+        if self._deadline is None or period != self._period:
+            # First frame or new frame rate: start a fresh schedule
+            self._period = period
+            self._deadline = now + period
+            self._hold = True
+        deadline = self._deadline
+        work = now - self._last if self._last is not None else 0
+        late = now >= deadline
+        if not late:
+            remaining = deadline - now
+            if remaining > self.spin_ns:
+                time.sleep((remaining - self.spin_ns) / 1e9)
+            while time.perf_counter_ns() < deadline:
+                pass
+            now = time.perf_counter_ns()
+
+        interval = now - self._last if self._last is not None else period
+        if record and not self._hold:
+            self._record(interval, period, work, late, now - deadline)
+        self._hold = not record
+        self._last = now
+        # A missed deadline restarts the schedule from now rather than
+        # rushing the next frames to catch up
+        self._deadline = (now if late else deadline) + period
+        return interval / 1e6
+
+    def _record(self, interval, period, work, late, wake_error):
+        jitter = abs(interval - period)
+        ms = jitter / 1e6
+        for i, edge in enumerate(JITTER_BUCKETS):
+            if ms < edge:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+        self.frames += 1
+        self.work_ns += work
+        self.jitter_ns += jitter
+        self.worst_jitter_ns = max(self.worst_jitter_ns, jitter)
+        if late:
+            self.missed += 1
+        else:
+            self.wake_error_ns += wake_error
+
+    def stats(self):
+        """Return the pacing statistics recorded so far.
+
+        Returns:
+            dict: ``frames``, ``missed`` (deadlines the work overran),
+            ``mean_work_ms``, ``mean_wake_error_ms`` (over frames that
+            waited), ``mean_jitter_ms``, ``worst_jitter_ms`` and
+            ``histogram``, a list of ``(label, count)`` pairs of
+            frame-interval jitter.
+        """
+        waited = self.frames - self.missed
+        labels = [f'<{edge}ms' for edge in JITTER_BUCKETS] + [f'>={JITTER_BUCKETS[-1]}ms']
+        return {
+            'frames': self.frames,
+            'missed': self.missed,
+            'mean_work_ms': self.work_ns / self.frames / 1e6 if self.frames else 0.0,
+            'mean_wake_error_ms': self.wake_error_ns / waited / 1e6 if waited else 0.0,
+            'mean_jitter_ms': self.jitter_ns / self.frames / 1e6 if self.frames else 0.0,
+            'worst_jitter_ms': self.worst_jitter_ns / 1e6,
+            'histogram': list(zip(labels, self.histogram)),
+        }
+
+    def report(self):
+        """Print the pacing summary, if enabled."""
+        if not self.report_enabled:
+            return
+        s = self.stats()
+        if not s['frames']:
+            print('Frame pacing: no frames recorded')
+            return
+        print(f'Frame pacing: {s["frames"]} frames, {s["missed"]} missed deadlines '
+              f'({s["missed"] / s["frames"]:.1%}), mean work {s["mean_work_ms"]:.2f} ms')
+        print(f'  jitter {s["mean_jitter_ms"]:.3f} ms mean, {s["worst_jitter_ms"]:.2f} ms worst; '
+              f'wake-up error {s["mean_wake_error_ms"]:.3f} ms mean')
+        print('  jitter  ' + '  '.join(f'{label} {count}' for label, count in s['histogram']))
+        if s['missed'] > s['frames'] // 100:
+            print('  Note: frames often overran their deadline — the workload, not pacing, '
+                  'is the problem')
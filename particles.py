@@ -1,7 +1,12 @@
 """Enhanced explosion particle system for Space Blaster.
 
 Features multiple particle types: circular particles, spark trails,
-debris chunks, smoke puffs, and expanding shockwave rings.
+debris chunks, smoke puffs, and expanding shockwave rings. Circular
+particles, spark tips and smoke puffs are drawn from cached sprites with
+their fade quantized to ``SPRITE_FADE_STEPS`` alpha levels; rotating debris
+and shockwave rings vary continuously and are still drawn per frame.
+Effects are submitted to a ``RenderQueue``, which culls the ones that have
+flown off screen.
 """
 
 import math
@@ -9,11 +14,84 @@ import random
 
 import pygame
 
+import sprites
+from sprites import BLEND
+from renderqueue import (
+    RenderQueue, LAYER_SMOKE, LAYER_SHOCKWAVES, LAYER_PARTICLES, LAYER_DEBRIS, LAYER_SPARKS,
+)
+
+SMOKE_ALPHA = 60  # smoke puff alpha at full life
+
+
+# ---------- Sprites ----------
+
+def _build_particle(color, sz, level):
+    alpha = sprites.fade_alpha(level)
+    r, g, b = color
+    ps = pygame.Surface((sz * 2, sz * 2), pygame.SRCALPHA)
+    pygame.draw.circle(ps, (r, g, b, alpha), (sz, sz), sz)
+    # Bright core
+    if sz > 1:
+        pygame.draw.circle(ps, (min(255, r + 100), min(255, g + 100),
+                                min(255, b + 100), alpha // 2),
+                           (sz, sz), max(1, sz // 2))
+    return ps.premul_alpha()
+
+
+def _build_spark_tip(radius, level):
+    ts = pygame.Surface((4, 4), pygame.SRCALPHA)
+    pygame.draw.circle(ts, (255, 255, 255, sprites.fade_alpha(level)), (2, 2), radius)
+    return ts.premul_alpha()
+
+
+def _build_smoke(sz, level):
+    ss = pygame.Surface((sz * 2, sz * 2), pygame.SRCALPHA)
+    pygame.draw.circle(ss, (80, 80, 80, sprites.fade_alpha(level, SMOKE_ALPHA)), (sz, sz), sz)
+    return ss.premul_alpha()
+
+
+def particle_sprite(color, sz, level):
+    """Return the cached particle blob of a color, radius and fade level."""
+    return sprites.get(('particle', color, sz, level), _build_particle, color, sz, level)
+
+
+def spark_tip_sprite(radius, level):
+    """Return the cached bright spark tip of a radius and fade level."""
+    return sprites.get(('spark_tip', radius, level), _build_spark_tip, radius, level)
+
+
+def smoke_sprite(sz, level):
+    """Return the cached smoke puff of a radius and fade level."""
+    return sprites.get(('smoke', sz, level), _build_smoke, sz, level)
+
+
+def _draw_spark_lines(surface, transform, lines):
+    """Draw the spark trail segments queued for one frame.
+
+    Returns:
+        pygame.Rect: The area drawn.
+    """
+    dx, dy, scale = transform
+    dirty = [pygame.draw.line(surface, color, ((x1 + dx) * scale, (y1 + dy) * scale),
+                              ((x2 + dx) * scale, (y2 + dy) * scale), max(1, int(width * scale)))
+             for color, x1, y1, x2, y2, width in lines]
+    if not dirty:
+        return pygame.Rect(0, 0, 0, 0)
+    return dirty[0].unionall(dirty[1:])
+
+
+# ---------- Particle system ----------
+
 
 class ParticleSystem:
-    """Manages explosions with multiple visual effect types."""
+    """Manages explosions with multiple visual effect types.
 
-    def __init__(self):
+    ``density`` scales how many particles, sparks, debris and smoke puffs
+    each explosion spawns.
+    """
+
+    def __init__(self, density=1.0):
+        self.density = density
         self._particles = []
         self._shockwaves = []
         self._sparks = []
@@ -22,6 +100,8 @@ class ParticleSystem:
 
     def spawn(self, cx, cy, color_palette, count=20, speed_range=(1, 5), lifetime=30):
         """Create a dramatic explosion burst with multiple effect layers."""
+        count = max(1, round(count * self.density))
+
         # Core circular particles
         for _ in range(count):
             angle = random.uniform(0, math.pi * 2)
@@ -99,16 +179,39 @@ class ParticleSystem:
             'color': random.choice(color_palette),
         })
 
+    @property
+    def active(self):
+        """True while any effect is still on screen."""
+        return bool(self._particles or self._shockwaves or self._sparks
+                    or self._debris or self._smoke)
+
+    def counts(self):
+        """Return the number of live effects of each type.
+
+        Returns:
+            dict: Counts by type name.
+        """
+        return {'particles': len(self._particles), 'shockwaves': len(self._shockwaves),
+                'sparks': len(self._sparks), 'debris': len(self._debris),
+                'smoke': len(self._smoke)}
+
     def update_and_draw(self, surface):
         """Update and draw all particle types."""
-        self._update_smoke(surface)
-        self._update_shockwaves(surface)
-        self._update_particles(surface)
-        self._update_debris(surface)
-        self._update_sparks(surface)
+        queue = RenderQueue(surface.get_rect())
+        self.update_and_submit(queue)
+        queue.flush(surface)
+
+    def update_and_submit(self, queue):
+        """Update all particle types and queue them for drawing."""
+        self._update_smoke(queue)
+        self._update_shockwaves(queue)
+        self._update_particles(queue)
+        self._update_debris(queue)
+        self._update_sparks(queue)
 
-    def _update_particles(self, surface):
+    def _update_particles(self, queue):
         alive = []
+        items = []
         for p in self._particles:
             p['x'] += p['vx']
             p['y'] += p['vy']
@@ -118,22 +221,20 @@ class ParticleSystem:
             if p['life'] <= 0:
                 continue
             frac = p['life'] / p['max_life']
-            alpha = int(255 * frac)
             sz = max(1, int(p['size'] * frac))
-            r, g, b = p['color']
-            ps = pygame.Surface((sz * 2, sz * 2), pygame.SRCALPHA)
-            pygame.draw.circle(ps, (r, g, b, alpha), (sz, sz), sz)
-            # Bright core
-            if sz > 1:
-                pygame.draw.circle(ps, (min(255, r + 100), min(255, g + 100),
-                                        min(255, b + 100), alpha // 2),
-                                   (sz, sz), max(1, sz // 2))
-            surface.blit(ps, (int(p['x']) - sz, int(p['y']) - sz))
+            items.append((particle_sprite(p['color'], sz, sprites.fade_level(frac)),
+                          (int(p['x']) - sz, int(p['y']) - sz), None, BLEND))
             alive.append(p)
         self._particles = alive
+        queue.blits(LAYER_PARTICLES, items)
 
-    def _update_sparks(self, surface):
+    def _update_sparks(self, queue):
         alive = []
+        lines = []
+        items = []
+        if self._sparks:
+            # Queued first so the trails go under the tips; filled in below
+            queue.call(LAYER_SPARKS, _draw_spark_lines, lines)
         for s in self._sparks:
             s['prev_x'] = s['x']
             s['prev_y'] = s['y']
@@ -145,20 +246,18 @@ class ParticleSystem:
             if s['life'] <= 0:
                 continue
             frac = s['life'] / s['max_life']
-            alpha = int(255 * frac)
             r, g, b = s['color']
-            # Draw a short line from previous to current position
-            pygame.draw.line(surface, (r, g, b, 200),
-                             (int(s['prev_x']), int(s['prev_y'])),
-                             (int(s['x']), int(s['y'])), max(1, int(2 * frac)))
+            # A short line from previous to current position
+            lines.append(((r, g, b), int(s['prev_x']), int(s['prev_y']),
+                          int(s['x']), int(s['y']), max(1, int(2 * frac))))
             # Bright tip
-            ts = pygame.Surface((4, 4), pygame.SRCALPHA)
-            pygame.draw.circle(ts, (255, 255, 255, alpha), (2, 2), max(1, int(2 * frac)))
-            surface.blit(ts, (int(s['x']) - 2, int(s['y']) - 2))
+            items.append((spark_tip_sprite(max(1, int(2 * frac)), sprites.fade_level(frac)),
+                          (int(s['x']) - 2, int(s['y']) - 2), None, BLEND))
             alive.append(s)
         self._sparks = alive
+        queue.blits(LAYER_SPARKS, items)
 
-    def _update_debris(self, surface):
+    def _update_debris(self, queue):
         alive = []
         for d in self._debris:
             d['x'] += d['vx']
@@ -172,6 +271,10 @@ class ParticleSystem:
             alpha = int(200 * frac)
             sz = max(2, int(d['size'] * (0.5 + 0.5 * frac)))
             r, g, b = d['color']
+            x, y = int(d['x']) - sz * 3 // 2, int(d['y']) - sz * 3 // 2
+            alive.append(d)
+            if not queue.visible((x, y, sz * 3, sz * 3)):
+                continue
 
             # Rotating square
             ds = pygame.Surface((sz * 3, sz * 3), pygame.SRCALPHA)
@@ -187,12 +290,12 @@ class ParticleSystem:
             # Edge highlight
             pygame.draw.polygon(ds, (min(255, r + 40), min(255, g + 40),
                                      min(255, b + 40), alpha // 2), corners, width=1)
-            surface.blit(ds, (int(d['x']) - sz * 3 // 2, int(d['y']) - sz * 3 // 2))
-            alive.append(d)
+            queue.blit(LAYER_DEBRIS, ds, (x, y), special_flags=0)
         self._debris = alive
 
-    def _update_smoke(self, surface):
+    def _update_smoke(self, queue):
         alive = []
+        items = []
         for s in self._smoke:
             s['x'] += s['vx']
             s['y'] += s['vy']
@@ -202,15 +305,14 @@ class ParticleSystem:
             if s['life'] <= 0:
                 continue
             frac = s['life'] / s['max_life']
-            alpha = int(60 * frac)
             sz = int(s['size'])
-            ss = pygame.Surface((sz * 2, sz * 2), pygame.SRCALPHA)
-            pygame.draw.circle(ss, (80, 80, 80, alpha), (sz, sz), sz)
-            surface.blit(ss, (int(s['x']) - sz, int(s['y']) - sz))
+            items.append((smoke_sprite(sz, sprites.fade_level(frac)),
+                          (int(s['x']) - sz, int(s['y']) - sz), None, BLEND))
             alive.append(s)
         self._smoke = alive
+        queue.blits(LAYER_SMOKE, items)
 
-    def _update_shockwaves(self, surface):
+    def _update_shockwaves(self, queue):
         alive = []
         for w in self._shockwaves:
             w['life'] -= 1
@@ -222,9 +324,11 @@ class ParticleSystem:
             r, g, b = w['color']
             alpha = int(120 * frac)
             rad = int(w['radius'])
-            if rad > 2:
+            alive.append(w)
+            center = rad + 2
+            x, y = int(w['x']) - center, int(w['y']) - center
+            if rad > 2 and queue.visible((x, y, center * 2, center * 2)):
                 ws = pygame.Surface((rad * 2 + 4, rad * 2 + 4), pygame.SRCALPHA)
-                center = rad + 2
                 # Outer ring
                 pygame.draw.circle(ws, (r, g, b, alpha), (center, center), rad, width=2)
                 # Inner bright ring
@@ -232,8 +336,7 @@ class ParticleSystem:
                     pygame.draw.circle(ws, (min(255, r + 80), min(255, g + 80),
                                             min(255, b + 80), alpha // 2),
                                        (center, center), max(1, rad - 3), width=1)
-                surface.blit(ws, (int(w['x']) - center, int(w['y']) - center))
-            alive.append(w)
+                queue.blit(LAYER_SHOCKWAVES, ws, (x, y), special_flags=0)
         self._shockwaves = alive
 
     def clear(self):
@@ -0,0 +1,125 @@
+"""Background building of the next stage's sprites for Space Blaster.
+
+A new stage brings a new enemy palette, celestial body and announcement,
+and their sprites would otherwise be rendered (or read from the asset
+pack) on the first frame that draws them, mid-gameplay. As soon as a stage
+starts, ``StagePrefetcher`` builds the next stage's sprites into the
+sprite cache on a worker thread. Requests wait in a bounded queue; when it
+is full, the request is dropped and that stage's sprites are built on
+demand as before.
+
+``stats`` records whether each stage's sprites were ready by the time the
+stage started. Once a stage starts, only it and the next one are kept
+track of, and older stages' announcements leave the sprite cache, so
+endless play does not grow either.
+"""
+
+import queue
+import threading
+import time
+
+from config import PREFETCH_QUEUE_SIZE, ENEMY_WIDTH, ENEMY_HEIGHT
+from stages import stage_config, is_last_stage
+
+
+def build_stage_sprites(stage, fonts, endless=False):
+    """Render every sprite that ``stage`` introduces into the sprite cache.
+
+    Uses the current glow setting, like the sprites drawn in the frame.
+    """
+    import renderer
+    import background
+    from screens import prefetch_announcement
+
+    cfg = stage_config(stage, endless)
+    renderer.enemy_sprite(ENEMY_WIDTH, ENEMY_HEIGHT, cfg['enemy_body'], cfg['enemy_wing'])
+    lo, hi = background.CELESTIAL_TYPES[cfg['celestial']]['radius']
+    for r in range(lo, hi + 1):
+        background.celestial_sprite(cfg['celestial'], r)
+    prefetch_announcement(fonts.large, stage)
+
+
+class StagePrefetcher:
+    """Builds stage sprites ahead of time on a daemon worker thread.
+
+    ``fonts`` is the game's ``screens.Fonts``; ``endless`` says whether
+    stages go on past the configured ones. The worker starts with the
+    first request.
+    """
+
+    def __init__(self, fonts, endless=False, maxsize=PREFETCH_QUEUE_SIZE):
+        self.fonts = fonts
+        self.endless = endless
+        self._jobs = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._requested = set()
+        self._built = set()
+        # ready: stage started with its sprites built; late: still queued
+        # or building; missed: never requested or dropped from a full queue
+        self.stats = {'ready': 0, 'late': 0, 'missed': 0, 'dropped': 0, 'build_ms': 0.0}
+
+    def request(self, stage):
+        """Queue ``stage``'s sprites to be built, unless they already are.
+
+        Returns:
+            bool: False if the queue was full and the request was dropped.
+        """
+        with self._lock:
+            if stage in self._requested:
+                return True
+            try:
+                self._jobs.put_nowait(stage)
+            except queue.Full:
+                self.stats['dropped'] += 1
+                return False
+            self._requested.add(stage)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='stage-prefetch', daemon=True)
+            self._thread.start()
+        return True
+
+    def is_ready(self, stage):
+        """Return True if ``stage``'s sprites have been built."""
+        with self._lock:
+            return stage in self._built
+
+    def stage_started(self, stage):
+        """Record whether ``stage``'s sprites were ready, and prefetch the next stage.
+
+        Stages other than ``stage`` and the next are forgotten, along with
+        their cached announcements.
+        """
+        from screens import forget_announcements
+
+        keep = {stage, stage + 1}
+        with self._lock:
+            if stage in self._built:
+                self.stats['ready'] += 1
+            elif stage in self._requested:
+                self.stats['late'] += 1
+            else:
+                self.stats['missed'] += 1
+            self._requested &= keep
+            self._built &= keep
+        forget_announcements(keep)
+        if not is_last_stage(stage, self.endless):
+            self.request(stage + 1)
+
+    def reset(self):
+        """Forget what was built, e.g. after the glow setting changes.
+
+        Stages already queued are still built, and counted as ready.
+        """
+        with self._lock:
+            self._requested.difference_update(self._built)
+            self._built.clear()
+
+    def _run(self):
+        while True:
+            stage = self._jobs.get()
+            started = time.perf_counter()
+            build_stage_sprites(stage, self.fonts, self.endless)
+            with self._lock:
+                self._built.add(stage)
+                self.stats['build_ms'] += (time.perf_counter() - started) * 1000
@@ -0,0 +1,43 @@
+"""Graphics quality presets for Space Blaster and their calibration.
+
+The presets live in ``config.QUALITY_PRESETS``. Calibration draws a busy
+benchmark scene off screen under each preset, richest first, and picks
+the first one whose frames fit the drawing budget at ``FPS``. The choice
+is saved with the other settings, so a machine is only calibrated once.
+It runs on request (``main.py --calibrate``); until then the game starts
+on ``config.QUALITY``, the middle preset.
+"""
+
+from config import QUALITY_PRESETS, FPS, CALIBRATION_BUDGET
+from settings import load_settings
+
+QUALITY_LEVELS = tuple(QUALITY_PRESETS)  # cheapest first
+
+
+def saved_quality():
+    """Return the saved quality preset, or None if there is no valid one."""
+    name = load_settings().get('quality')
+    return name if name in QUALITY_PRESETS else None
+
+
+def calibrate(measure, fps=FPS, budget=CALIBRATION_BUDGET):
+    """Pick the richest preset whose benchmark frames fit the budget.
+
+    ``measure(name)`` draws the benchmark scene under a preset and returns
+    each frame's draw time in seconds. A preset fits when 90% of its frames
+    take at most ``budget / fps``; the rest of the frame is left for game
+    logic and presenting. Falls back to the cheapest preset.
+
+    Returns:
+        tuple: (preset name, {preset name: 90th percentile frame time in ms})
+            for the presets that were measured.
+    """
+    limit = budget / fps
+    results = {}
+    for name in reversed(QUALITY_LEVELS):
+        times = sorted(measure(name))
+        p90 = times[min(len(times) - 1, len(times) * 9 // 10)]
+        results[name] = p90 * 1000
+        if p90 <= limit:
+            return name, results
+    return QUALITY_LEVELS[0], results
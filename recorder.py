@@ -0,0 +1,281 @@
+"""Gameplay recording for Space Blaster (F9 or ``main.py --record``).
+
+``FrameRecorder.capture`` copies each presented frame into a preallocated
+ring of frame buffers in shared memory (``surfarray``, about 0.2 ms per
+800x600 frame). That copy is all it does on the game loop. The buffered
+frames are written out as either:
+
+- ``png``: a PNG sequence, encoded by a pool of worker processes.
+- ``raw``: the screen's native 32-bit pixels, row-major, in chunk files
+  of ``RECORD_CHUNK_FRAMES``, written in frame order by one writer
+  process. Jobs go to it over a pipe and it counts the ones done in
+  shared memory, so no helper thread runs in the game's process.
+
+The writers are processes rather than threads: a writer thread would
+share the GIL with the game, and one descheduled while holding it stalls
+the next capture for milliseconds.
+
+When every ring slot is still waiting to be written, the frame is dropped
+and counted rather than stalling the game. The writers run at a lower
+priority where the OS allows it, so on a busy CPU they fall behind (and
+drop frames) instead of slowing the game down.
+
+Each recording goes into a directory of its own, with a ``meta.json``
+describing the frames: size, pixel masks, frame rate and the dropped
+frame numbers. A frame whose write fails is counted and left out, and
+the recording goes on.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+
+import pygame
+
+from config import (
+    FPS, RECORD_DIR, RECORD_FORMAT, RECORD_RING_FRAMES, RECORD_WORKERS, RECORD_WORKER_NICE,
+    RECORD_CHUNK_FRAMES,
+)
+
+FORMATS = ('png', 'raw')
+
+
+# ---------- Writer processes ----------
+
+_worker = {}
+
+
+def _lower_priority():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), RECORD_WORKER_NICE)
+    except (AttributeError, OSError):  # not Linux, or not permitted
+        pass
+
+
+def _ring_view(shm, shape):
+    import numpy as np
+
+    return np.ndarray(shape, np.uint32, buffer=shm.buf)
+
+
+def _init_png_worker(shm_name, shape, masks, out_dir):
+    """Attach a PNG worker process to the recorder's ring."""
+    _lower_priority()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(shm=shm, ring=_ring_view(shm, shape), out_dir=out_dir,
+                   surface=pygame.Surface((shape[2], shape[1]), 0, 32, masks))
+
+
+def _encode_png(frame, slot):
+    """Save ring slot ``slot`` as frame number ``frame`` (in a worker process)."""
+    surface = _worker['surface']
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[...] = _worker['ring'][slot].T
+    del pixels  # unlock the surface for saving
+    pygame.image.save(surface, os.path.join(_worker['out_dir'], f'frame_{frame:06d}.png'))
+
+
+def _raw_writer(conn, shm_name, shape, out_dir, progress):
+    """Write the frames sent down ``conn`` into raw chunk files (the writer process).
+
+    Each job is a ``(frame, slot)``. ``progress`` counts the jobs done and
+    how many of them failed; a failed write costs one frame, not the
+    recording.
+    """
+    # Frame n of the recording, dropped or not, is frame n % RECORD_CHUNK_FRAMES
+    # of chunk n // RECORD_CHUNK_FRAMES; dropped frames are left as zeros
+    _lower_priority()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = _ring_view(shm, shape)
+    f, chunk = None, None
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                return
+            frame, slot = job
+            try:
+                number = frame // RECORD_CHUNK_FRAMES
+                if number != chunk:
+                    if f is not None:
+                        f.close()
+                        f = None
+                    f = open(os.path.join(out_dir, f'chunk_{number:04d}.raw'), 'wb')
+                    chunk = number
+                f.seek(frame % RECORD_CHUNK_FRAMES * ring[slot].nbytes)
+                f.write(ring[slot])
+            except OSError:
+                progress[1] += 1
+            progress[0] += 1
+    finally:
+        if f is not None:
+            f.close()
+        del ring
+        shm.close()
+
+
+# ---------- Recorder ----------
+
+class FrameRecorder:
+    """Records frames of ``size`` with ``masks`` (a 32-bit surface's) to ``out_dir``.
+
+    PNG frames are encoded by ``workers`` processes (by default one per
+    core but one, which is left for the game); raw chunks are written in
+    frame order by a single process. Call ``close()`` to finish. Raises
+    ``ImportError`` without numpy.
+    """
+
+    def __init__(self, out_dir, size, masks, fmt=RECORD_FORMAT,
+                 ring_frames=RECORD_RING_FRAMES, workers=RECORD_WORKERS):
+        import numpy as np
+
+        if fmt not in FORMATS:
+            raise ValueError(f'unknown recording format {fmt!r}')
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.size = size
+        self.masks = masks
+        self.fmt = fmt
+        self._np = np
+        shape = (ring_frames, size[1], size[0])
+        self._shm = shared_memory.SharedMemory(create=True, size=4 * np.prod(shape).item())
+        self._ring = _ring_view(self._shm, shape)
+        self._free = queue.SimpleQueue()
+        for slot in range(ring_frames):
+            self._free.put(slot)
+        self._lock = threading.Lock()
+        self.frames = 0           # frames offered to capture, including dropped ones
+        self.dropped_frames = []  # their numbers
+        self.stats = {'captured': 0, 'written': 0, 'dropped': 0, 'failed': 0,
+                      'capture_ms': 0.0, 'max_capture_ms': 0.0}
+        self._capture_times = array('f')  # ms per captured frame
+        if fmt == 'png':
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                workers or max(1, multiprocessing.cpu_count() - 1),
+                initializer=_init_png_worker, initargs=(self._shm.name, shape, masks, out_dir))
+            self._writer = None
+        else:
+            self._pool = None
+            child, self._conn = multiprocessing.Pipe(duplex=False)
+            self._progress = multiprocessing.RawArray('q', 2)  # jobs done, failed
+            self._pending = collections.deque()  # slots sent to the writer, in order
+            self._reclaimed = 0
+            self._writer = multiprocessing.Process(
+                target=_raw_writer,
+                args=(child, self._shm.name, shape, out_dir, self._progress),
+                name='recorder', daemon=True)
+            self._writer.start()
+            child.close()
+
+    def capture(self, surface):
+        """Copy the finished frame on ``surface`` into the ring.
+
+        Never waits for the writers.
+
+        Returns:
+            bool: False if the ring was full and the frame was dropped.
+        """
+        started = time.perf_counter()
+        frame = self.frames
+        self.frames += 1
+        if self._writer is not None:
+            self._reclaim()
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped_frames.append(frame)
+            self.stats['dropped'] += 1
+            return False
+        # Both sides are row-major 32-bit pixels, so this is a plain memory copy
+        self._np.copyto(self._ring[slot].T, pygame.surfarray.pixels2d(surface))
+        if self._pool is not None:
+            future = self._pool.submit(_encode_png, frame, slot)
+            future.add_done_callback(functools.partial(self._written, slot))
+        else:
+            self._conn.send((frame, slot))
+            self._pending.append(slot)
+        took = (time.perf_counter() - started) * 1000
+        self._capture_times.append(took)
+        self.stats['captured'] += 1
+        self.stats['capture_ms'] += took
+        self.stats['max_capture_ms'] = max(self.stats['max_capture_ms'], took)
+        return True
+
+    def close(self):
+        """Write the remaining frames and ``meta.json``, then stop the writers.
+
+        Returns:
+            dict: ``stats``, with the mean and 99th percentile capture times added.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        else:
+            self._conn.send(None)
+            self._writer.join()
+            self._conn.close()
+            self._reclaim()
+        del self._ring
+        self._shm.close()
+        self._shm.unlink()
+        meta = {'format': self.fmt, 'width': self.size[0], 'height': self.size[1],
+                'masks': list(self.masks), 'fps': FPS, 'frames': self.frames,
+                'chunk_frames': RECORD_CHUNK_FRAMES, 'dropped': self.dropped_frames}
+        with open(os.path.join(self.out_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        captured = self.stats['captured']
+        if not captured:
+            return dict(self.stats, mean_capture_ms=0.0, p99_capture_ms=0.0)
+        return dict(self.stats, mean_capture_ms=self.stats['capture_ms'] / captured,
+                    p99_capture_ms=float(self._np.percentile(self._capture_times, 99)))
+
+    def report(self, stats):
+        """Print a one-line summary of the finished recording (``close``'s stats)."""
+        failed = f', {stats["failed"]} failed' if stats['failed'] else ''
+        print(f'Recording: {self.frames} frames to {self.out_dir} ({self.fmt}), '
+              f'{stats["written"]} written, {stats["dropped"]} dropped{failed}; capture '
+              f'{stats["mean_capture_ms"]:.2f} ms mean, {stats["p99_capture_ms"]:.2f} ms p99, '
+              f'{stats["max_capture_ms"]:.2f} ms max')
+
+    def _written(self, slot, future):
+        """Return ``slot`` to the ring once its PNG is written (or failed)."""
+        self._free.put(slot)
+        with self._lock:
+            if future.exception() is not None:
+                self.stats['failed'] += 1
+            else:
+                self.stats['written'] += 1
+
+    def _reclaim(self):
+        """Return the slots of the frames the raw writer is done with to the ring."""
+        done, failed = self._progress  # exact once the writer has stopped
+        while self._reclaimed < done:
+            self._free.put(self._pending.popleft())
+            self._reclaimed += 1
+        self.stats['written'] = done - failed
+        self.stats['failed'] = failed
+
+
+def start_recording(surface, fmt=RECORD_FORMAT, base_dir=RECORD_DIR):
+    """Start a recorder for frames like ``surface`` in a new timestamped directory.
+
+    Returns:
+        FrameRecorder or None: None if numpy is not installed.
+    """
+    out_dir = stamp = os.path.join(base_dir, time.strftime('%Y%m%d-%H%M%S'))
+    n = 1
+    while os.path.exists(out_dir):
+        n += 1
+        out_dir = f'{stamp}-{n}'
+    try:
+        return FrameRecorder(out_dir, surface.get_size(), surface.get_masks(), fmt)
+    except ImportError:
+        print('Note: numpy not found — recording is unavailable.')
+        return None
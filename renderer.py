@@ -1,24 +1,58 @@
 """Ship and projectile rendering functions for Space Blaster.
 
-Enhanced with multi-layered detail, panel lines, animated effects.
+Enhanced with multi-layered detail, panel lines, animated effects. The
+static parts of each ship and laser are rendered once into cached sprites
+(see ``sprites.py``); only the animated bits are drawn every frame. The
+``submit_*`` functions queue a frame's drawing on a ``RenderQueue``; the
+``draw_*`` functions draw one object immediately.
 """
 
-import math
 import random
 
 import pygame
 
+import sprites
+from sprites import BLEND
+from renderqueue import (
+    RenderQueue, LAYER_PLAYER, LAYER_LASERS, LAYER_ENEMY_LASERS, LAYER_ENEMIES, LAYER_HUD,
+)
+
+# Laser spark colors (player, enemy)
+LASER_SPARK_COLOR = (100, 255, 130)
+ENEMY_LASER_SPARK_COLOR = (255, 120, 50)
+SPARK_ALPHA_RANGE = (80, 200)
+LASER_SPARK_LIMIT = 300  # lasers of each kind per frame that get trail sparks
+
+# Random (spark, dx, dy) picks that trail sparks take in turn from a random
+# start each frame: cheaper than drawing three random numbers per spark
+_spark_jitter = [(random.randrange(SPARK_ALPHA_RANGE[1] - SPARK_ALPHA_RANGE[0] + 1),
+                  random.randrange(7), random.randrange(9))
+                 for _ in range(8 * LASER_SPARK_LIMIT)]
+
+
+def _ship_pad(w):
+    """Horizontal sprite margin that fits the swept wings and weapon pods."""
+    return int(w * 0.4) + 2
+
+
+def _draw_now(surface, submit, *args):
+    """Draw through a one-off queue, for callers outside the frame's queue."""
+    queue = RenderQueue(surface.get_rect())
+    submit(queue, *args)
+    queue.flush(surface)
+
 
 # ---------- Player Ship ----------
 
-def draw_player_ship(surface, x, y, w, h):
-    """Draw a highly detailed player spaceship with layered panels and glow effects."""
+def _draw_player_hull(surface, x, y, w, h, glow=True):
+    """Draw the static part of the player ship (everything but the flames)."""
     cx = x + w / 2
 
     # --- Shield glow (subtle aura) ---
-    shield_s = pygame.Surface((w + 30, h + 30), pygame.SRCALPHA)
-    pygame.draw.ellipse(shield_s, (40, 120, 255, 15), (0, 5, w + 30, h + 20))
-    surface.blit(shield_s, (x - 15, y - 10))
+    if glow:
+        shield_s = pygame.Surface((w + 30, h + 30), pygame.SRCALPHA)
+        pygame.draw.ellipse(shield_s, (40, 120, 255, 15), (0, 5, w + 30, h + 20))
+        sprites.layer(surface, shield_s, (x - 15, y - 10))
 
     # --- Wing struts (behind body) ---
     # Left strut
@@ -135,39 +169,84 @@ def draw_player_ship(surface, x, y, w, h):
         pygame.draw.polygon(surface, (60, 70, 90), nozzle)
         pygame.draw.polygon(surface, (100, 110, 130), nozzle, width=1)
 
-    # --- Engine exhaust flames ---
-    flame_flicker = random.uniform(0.8, 1.0)
+
+def _build_player_hull(w, h, glow):
+    pad = _ship_pad(w)
+    surf = sprites.canvas(w + pad * 2, h + 30)
+    _draw_player_hull(surf, pad, 10, w, h, glow)
+    return surf
+
+
+def _build_player_halo(w):
+    g_s = pygame.Surface((w, 14), pygame.SRCALPHA)
+    pygame.draw.ellipse(g_s, (80, 160, 255, 40), (w // 4, 0, w // 2, 14))
+    return g_s.premul_alpha()
+
+
+def player_sprite(w, h):
+    """Return the cached player hull, drawn at ``(x - _ship_pad(w), y - 10)``."""
+    return sprites.get(('player', w, h, sprites.glow), _build_player_hull, w, h, sprites.glow)
+
+
+def player_halo_sprite(w):
+    """Return the cached engine glow halo, drawn over the flames at ``(x, y + h - 3)``."""
+    return sprites.get(('player_halo', w), _build_player_halo, w)
+
+
+def _draw_flames(surface, transform, x, y, w, h, flicker):
+    """Draw the engine exhaust flames (queued as a draw call).
+
+    Returns:
+        pygame.Rect: The area drawn.
+    """
+    dx, dy, scale = transform
+
+    def at(points):
+        return [((px + dx) * scale, (py + dy) * scale) for px, py in points]
+
+    cx = x + w / 2
+    dirty = []
     for nx in [cx - w * 0.12, cx + w * 0.12]:
-        fh = int(14 * flame_flicker)
+        fh = int(14 * flicker)
         # Outer flame
-        pygame.draw.polygon(surface, (255, 100, 20), [
-            (nx - 5, y + h), (nx, y + h + fh), (nx + 5, y + h)])
+        dirty.append(pygame.draw.polygon(surface, (255, 100, 20), at([
+            (nx - 5, y + h), (nx, y + h + fh), (nx + 5, y + h)])))
         # Inner flame
         fh2 = int(fh * 0.55)
-        pygame.draw.polygon(surface, (255, 220, 100), [
-            (nx - 2, y + h), (nx, y + h + fh2), (nx + 2, y + h)])
+        pygame.draw.polygon(surface, (255, 220, 100), at([
+            (nx - 2, y + h), (nx, y + h + fh2), (nx + 2, y + h)]))
         # Core white
-        pygame.draw.polygon(surface, (255, 255, 230), [
-            (nx - 1, y + h), (nx, y + h + fh2 * 0.5), (nx + 1, y + h)])
+        pygame.draw.polygon(surface, (255, 255, 230), at([
+            (nx - 1, y + h), (nx, y + h + fh2 * 0.5), (nx + 1, y + h)]))
+    return dirty[0].unionall(dirty[1:])
 
-    # Engine glow halo
-    g_s = pygame.Surface((w, 14), pygame.SRCALPHA)
-    pygame.draw.ellipse(g_s, (80, 160, 255, 40), (w // 4, 0, w // 2, 14))
-    surface.blit(g_s, (x, y + h - 3))
+
+def submit_player_ship(queue, x, y, w, h, layer=LAYER_PLAYER):
+    """Queue the player ship: hull, flickering engine flames and glow halo."""
+    queue.blit(layer, player_sprite(w, h), (x - _ship_pad(w), y - 10))
+    queue.call(layer, _draw_flames, x, y, w, h, random.uniform(0.8, 1.0))
+    if sprites.glow:
+        queue.blit(layer, player_halo_sprite(w), (x, y + h - 3))
+
+
+def draw_player_ship(surface, x, y, w, h):
+    """Draw a highly detailed player spaceship with layered panels and glow effects."""
+    _draw_now(surface, submit_player_ship, x, y, w, h)
 
 
 # ---------- Enemy Ship ----------
 
-def draw_enemy_ship(surface, x, y, w, h, body_color, wing_color):
-    """Draw a highly detailed enemy ship with aggressive silhouette and glow."""
+def _draw_enemy_hull(surface, x, y, w, h, body_color, wing_color, glow=True):
+    """Draw an enemy ship with aggressive silhouette and glow."""
     bcr, bcg, bcb = body_color
     wcr, wcg, wcb = wing_color
     cx = x + w / 2
 
     # Threat glow underneath
-    g_s = pygame.Surface((w + 20, h + 10), pygame.SRCALPHA)
-    pygame.draw.ellipse(g_s, (bcr, bcg, bcb, 18), (0, 0, w + 20, h + 10))
-    surface.blit(g_s, (x - 10, y))
+    if glow:
+        g_s = pygame.Surface((w + 20, h + 10), pygame.SRCALPHA)
+        pygame.draw.ellipse(g_s, (bcr, bcg, bcb, 18), (0, 0, w + 20, h + 10))
+        sprites.layer(surface, g_s, (x - 10, y))
 
     # --- Weapon pods on wings ---
     for px in [x - w * 0.25, x + w + w * 0.15]:
@@ -253,9 +332,10 @@ def draw_enemy_ship(surface, x, y, w, h, body_color, wing_color):
     eye_cy = int(y + h * 0.28)
 
     # Eye glow halo
-    eg = pygame.Surface((28, 28), pygame.SRCALPHA)
-    pygame.draw.circle(eg, (255, 180, 40, 35), (14, 14), 14)
-    surface.blit(eg, (int(cx - 14), eye_cy - 14))
+    if glow:
+        eg = pygame.Surface((28, 28), pygame.SRCALPHA)
+        pygame.draw.circle(eg, (255, 180, 40, 35), (14, 14), 14)
+        sprites.layer(surface, eg, (int(cx - 14), eye_cy - 14))
 
     # Eye diamond
     cockpit = [
@@ -277,21 +357,53 @@ def draw_enemy_ship(surface, x, y, w, h, body_color, wing_color):
     pygame.draw.circle(surface, (255, 200, 60), (int(cx), int(y - 4)), 1)
 
 
+def _build_enemy_ship(w, h, body_color, wing_color, glow):
+    pad = _ship_pad(w)
+    surf = sprites.canvas(w + pad * 2, h + 16)
+    _draw_enemy_hull(surf, pad, 6, w, h, body_color, wing_color, glow)
+    return surf
+
+
+def enemy_sprite(w, h, body_color, wing_color):
+    """Return the cached enemy ship, drawn at ``(x - _ship_pad(w), y - 6)``."""
+    return sprites.get(('enemy', w, h, tuple(body_color), tuple(wing_color), sprites.glow),
+                       _build_enemy_ship, w, h, body_color, wing_color, sprites.glow)
+
+
+def submit_enemy_ships(queue, positions, w, h, body_color, wing_color, layer=LAYER_ENEMIES):
+    """Queue enemy ships at the given ``(x, y)`` positions.
+
+    Hundreds can be on screen in endless mode, so they are blitted from the
+    sprite's RLE copy.
+    """
+    ship, flags = sprites.rle(enemy_sprite(w, h, body_color, wing_color))
+    pad = _ship_pad(w)
+    queue.blits(layer, [(ship, (x - pad, y - 6), None, flags) for x, y in positions])
+
+
+def draw_enemy_ship(surface, x, y, w, h, body_color, wing_color):
+    """Draw a highly detailed enemy ship with aggressive silhouette and glow."""
+    _draw_now(surface, submit_enemy_ships, [(x, y)], w, h, body_color, wing_color)
+
+
 # ---------- Lasers ----------
 
-def draw_laser(surface, rect):
-    """Draw a vibrant player laser with animated glow and particle trail."""
-    x, y, w, h = rect.x, rect.y, rect.w, rect.h
+LASER_PAD = 10         # sprite margin around the laser rect (x and top)
+ENEMY_LASER_TOP = 14   # enemy lasers trail their tail above the rect
+
+
+def _draw_laser_beam(surface, x, y, w, h, glow=True):
+    """Draw the static part of a player laser: glow, core, tip and tail."""
     cx = x + w // 2
 
     # Wide outer glow
-    for i in range(3):
+    for i in range(3 if glow else 0):
         gw = w + 14 - i * 4
         gh = h + 12 - i * 3
         gs = pygame.Surface((gw, gh), pygame.SRCALPHA)
         alpha = 20 + i * 15
         pygame.draw.ellipse(gs, (60, 255, 100, alpha), (0, 0, gw, gh))
-        surface.blit(gs, (cx - gw // 2, y - 6 + i * 2))
+        sprites.layer(surface, gs, (cx - gw // 2, y - 6 + i * 2))
 
     # Core beam with gradient
     core_w = max(3, w)
@@ -313,34 +425,25 @@ def draw_laser(surface, rect):
     pygame.draw.circle(surface, (255, 255, 255), (cx, y - 3), 3)
     pygame.draw.circle(surface, (200, 255, 220), (cx, y - 3), 5)
 
-    # Particle trail sparks
-    for _ in range(2):
-        sx = cx + random.randint(-3, 3)
-        sy = y + h + random.randint(-2, 6)
-        spark_s = pygame.Surface((4, 4), pygame.SRCALPHA)
-        pygame.draw.circle(spark_s, (100, 255, 130, random.randint(80, 200)), (2, 2), 2)
-        surface.blit(spark_s, (sx - 2, sy - 2))
-
     # Fading tail
     tail_s = pygame.Surface((w + 8, 14), pygame.SRCALPHA)
     pygame.draw.polygon(tail_s, (60, 255, 100, 40),
                         [(0, 0), (w + 8, 0), ((w + 8) // 2, 14)])
-    surface.blit(tail_s, (cx - (w + 8) // 2, y + h - 2))
+    sprites.layer(surface, tail_s, (cx - (w + 8) // 2, y + h - 2))
 
 
-def draw_enemy_laser(surface, rect):
-    """Draw a menacing enemy laser with red-orange glow and sparks."""
-    x, y, w, h = rect.x, rect.y, rect.w, rect.h
+def _draw_enemy_laser_beam(surface, x, y, w, h, glow=True):
+    """Draw the static part of an enemy laser: glow, core, tip and tail."""
     cx = x + w // 2
 
     # Wide outer glow
-    for i in range(3):
+    for i in range(3 if glow else 0):
         gw = w + 14 - i * 4
         gh = h + 12 - i * 3
         gs = pygame.Surface((gw, gh), pygame.SRCALPHA)
         alpha = 20 + i * 15
         pygame.draw.ellipse(gs, (255, 50, 30, alpha), (0, 0, gw, gh))
-        surface.blit(gs, (cx - gw // 2, y - 6 + i * 2))
+        sprites.layer(surface, gs, (cx - gw // 2, y - 6 + i * 2))
 
     # Core beam with gradient
     core_w = max(3, w)
@@ -362,46 +465,138 @@ def draw_enemy_laser(surface, rect):
     pygame.draw.circle(surface, (255, 255, 200), (cx, y + h + 3), 3)
     pygame.draw.circle(surface, (255, 200, 120), (cx, y + h + 3), 5)
 
-    # Particle sparks trailing up
-    for _ in range(2):
-        sx = cx + random.randint(-3, 3)
-        sy = y + random.randint(-6, 2)
-        spark_s = pygame.Surface((4, 4), pygame.SRCALPHA)
-        pygame.draw.circle(spark_s, (255, 120, 50, random.randint(80, 200)), (2, 2), 2)
-        surface.blit(spark_s, (sx - 2, sy - 2))
-
     # Fading tail (top)
     tail_s = pygame.Surface((w + 8, 14), pygame.SRCALPHA)
     pygame.draw.polygon(tail_s, (255, 60, 30, 40),
                         [((w + 8) // 2, 0), (0, 14), (w + 8, 14)])
-    surface.blit(tail_s, (cx - (w + 8) // 2, y - 12))
+    sprites.layer(surface, tail_s, (cx - (w + 8) // 2, y - 12))
+
+
+def _build_laser(w, h, enemy, glow):
+    if enemy:
+        surf = sprites.canvas(w + LASER_PAD * 2, h + ENEMY_LASER_TOP + 14)
+        _draw_enemy_laser_beam(surf, LASER_PAD, ENEMY_LASER_TOP, w, h, glow)
+    else:
+        surf = sprites.canvas(w + LASER_PAD * 2, h + LASER_PAD + 14)
+        _draw_laser_beam(surf, LASER_PAD, LASER_PAD, w, h, glow)
+    return surf
+
+
+def _build_spark(color, alpha):
+    spark_s = pygame.Surface((4, 4), pygame.SRCALPHA)
+    pygame.draw.circle(spark_s, (*color, alpha), (2, 2), 2)
+    return spark_s.premul_alpha()
+
+
+def laser_sprite(w, h, enemy=False):
+    """Return the cached beam of a player (or enemy) laser of the given size."""
+    return sprites.get(('laser', w, h, enemy, sprites.glow), _build_laser, w, h, enemy,
+                       sprites.glow)
+
+
+def spark_sprite(color, alpha):
+    """Return the cached 4x4 trail spark of the given color and alpha."""
+    return sprites.get(('spark', color, alpha), _build_spark, color, alpha)
+
+
+def _spark_sprites(color):
+    """Return the trail sparks of ``color`` at every alpha in ``SPARK_ALPHA_RANGE``."""
+    lo, hi = SPARK_ALPHA_RANGE
+    return [spark_sprite(color, alpha) for alpha in range(lo, hi + 1)]
+
+
+def _submit_beams(queue, layer, rects, enemy, top, spark_color):
+    """Queue laser beams drawn ``top`` px above their rects, with two trail sparks each.
+
+    Sparks trail below player lasers and above enemy lasers, behind the
+    first ``LASER_SPARK_LIMIT`` only. Thousands of lasers can be on screen
+    in endless mode, so beams are drawn from trimmed copies of their
+    sprites and the loops avoid per-item function calls.
+    """
+    beams = {}
+    for size in {rect.size for rect in rects}:
+        beam, (dx, dy) = sprites.trimmed(laser_sprite(*size, enemy))
+        beams[size] = (beam, dx - LASER_PAD, dy - top)
+    if len(beams) == 1:
+        (beam, ox, oy), = beams.values()
+        items = [(beam, (x + ox, y + oy), None, BLEND) for x, y, _, _ in rects]
+    else:
+        items = [(beam, (x + ox, y + oy), None, BLEND)
+                 for x, y, w, h in rects for beam, ox, oy in (beams[w, h],)]
+
+    sparks = _spark_sprites(spark_color)
+    trails = [(x + w // 2 - 5, y - 8 if enemy else y + h - 4)
+              for x, y, w, h in rects[:LASER_SPARK_LIMIT]]
+    start = random.randrange(len(_spark_jitter) - 2 * len(trails) + 1)
+    items += [(sparks[i], (sx + dx, sy + dy), None, BLEND)
+              for (sx, sy), (i, dx, dy) in zip(trails + trails, _spark_jitter[start:])]
+    queue.blits(layer, items)
+
+
+def submit_lasers(queue, rects, layer=LAYER_LASERS):
+    """Queue player lasers and their trail sparks."""
+    _submit_beams(queue, layer, rects, False, LASER_PAD, LASER_SPARK_COLOR)
+
+
+def submit_enemy_lasers(queue, rects, layer=LAYER_ENEMY_LASERS):
+    """Queue enemy lasers and the sparks trailing up from them."""
+    _submit_beams(queue, layer, rects, True, ENEMY_LASER_TOP, ENEMY_LASER_SPARK_COLOR)
+
+
+def draw_laser(surface, rect):
+    """Draw a vibrant player laser with animated glow and particle trail."""
+    _draw_now(surface, submit_lasers, [rect])
+
+
+def draw_enemy_laser(surface, rect):
+    """Draw a menacing enemy laser with red-orange glow and sparks."""
+    _draw_now(surface, submit_enemy_lasers, [rect])
 
 
 # ---------- HUD Hearts ----------
 
-def draw_hearts(surface, lives):
-    """Draw pixel-art heart icons with shadow and highlights."""
+def _build_heart():
+    """Render one heart with its drop shadow; the heart's (hx, hy) is (1, 0)."""
+    surf = sprites.canvas(27, 24)
+    hx, hy = 1, 0
+
+    # Shadow
+    sh = pygame.Surface((24, 22), pygame.SRCALPHA)
+    pygame.draw.circle(sh, (0, 0, 0, 70), (7, 7), 7)
+    pygame.draw.circle(sh, (0, 0, 0, 70), (17, 7), 7)
+    pygame.draw.polygon(sh, (0, 0, 0, 70), [(0, 10), (24, 10), (12, 22)])
+    sprites.layer(surf, sh, (hx + 2, hy + 2))
+
+    # Heart body
+    pygame.draw.circle(surf, (230, 35, 55), (hx + 6, hy + 6), 6)
+    pygame.draw.circle(surf, (230, 35, 55), (hx + 16, hy + 6), 6)
+    pygame.draw.polygon(surf, (230, 35, 55),
+                        [(hx - 1, hy + 9), (hx + 23, hy + 9), (hx + 11, hy + 21)])
+
+    # Darker bottom shade
+    pygame.draw.polygon(surf, (180, 25, 40),
+                        [(hx + 2, hy + 14), (hx + 20, hy + 14), (hx + 11, hy + 21)])
+
+    # Highlight shine
+    pygame.draw.circle(surf, (255, 140, 160), (hx + 4, hy + 4), 2)
+    pygame.draw.circle(surf, (255, 200, 210), (hx + 4, hy + 3), 1)
+    return surf
+
+
+def heart_sprite():
+    """Return the cached HUD heart, drawn at ``(hx - 1, hy)``."""
+    return sprites.get(('heart',), _build_heart)
+
+
+def submit_hearts(queue, lives, layer=LAYER_HUD):
+    """Queue one heart icon per remaining life."""
+    heart = heart_sprite()
     for i in range(lives):
         hx = 15 + i * 32
         hy = 12
+        queue.blit(layer, heart, (hx - 1, hy))
+
 
-        # Shadow
-        sh = pygame.Surface((24, 22), pygame.SRCALPHA)
-        pygame.draw.circle(sh, (0, 0, 0, 70), (7, 7), 7)
-        pygame.draw.circle(sh, (0, 0, 0, 70), (17, 7), 7)
-        pygame.draw.polygon(sh, (0, 0, 0, 70), [(0, 10), (24, 10), (12, 22)])
-        surface.blit(sh, (hx + 2, hy + 2))
-
-        # Heart body
-        pygame.draw.circle(surface, (230, 35, 55), (hx + 6, hy + 6), 6)
-        pygame.draw.circle(surface, (230, 35, 55), (hx + 16, hy + 6), 6)
-        pygame.draw.polygon(surface, (230, 35, 55),
-                            [(hx - 1, hy + 9), (hx + 23, hy + 9), (hx + 11, hy + 21)])
-
-        # Darker bottom shade
-        pygame.draw.polygon(surface, (180, 25, 40),
-                            [(hx + 2, hy + 14), (hx + 20, hy + 14), (hx + 11, hy + 21)])
-
-        # Highlight shine
-        pygame.draw.circle(surface, (255, 140, 160), (hx + 4, hy + 4), 2)
-        pygame.draw.circle(surface, (255, 200, 210), (hx + 4, hy + 3), 1)
+def draw_hearts(surface, lives):
+    """Draw pixel-art heart icons with shadow and highlights."""
+    _draw_now(surface, submit_hearts, lives)
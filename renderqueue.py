@@ -0,0 +1,214 @@
+"""Per-frame render command queue for Space Blaster.
+
+Draw code submits sprite blits and immediate-mode draw calls instead of
+drawing straight to the screen. Blits that fall outside the viewport are
+culled as they are submitted. ``flush`` draws the layers back to front,
+submitting each run of blits with a single ``Surface.blits`` call. For
+the texture backend, ``drain`` also groups a layer's blits of the same
+texture together (UI layers keep submission order); a software flush
+skips that sort, as one ``Surface.blits`` call takes the run either way.
+Draw calls
+(``pygame.draw`` work such as engine flames) split a layer into runs so
+they keep their place in the draw order. A flush can also scale the whole
+frame down, for rendering the world into a smaller surface.
+
+Queueing a blit costs about as much Python time as doing it, so code that
+draws many sprites builds ``Surface.blits`` items itself and hands them
+over in bulk with ``RenderQueue.blits``.
+"""
+
+import pygame
+
+from sprites import BLEND, is_rle
+
+# ---------- Layers (back to front) ----------
+LAYER_GALAXY = -2
+LAYER_BACKGROUND = -1
+LAYER_PLAYER = 0
+LAYER_LASERS = 1
+LAYER_ENEMY_LASERS = 2
+LAYER_ENEMIES = 3
+LAYER_SMOKE = 4
+LAYER_SHOCKWAVES = 5
+LAYER_PARTICLES = 6
+LAYER_DEBRIS = 7
+LAYER_SPARKS = 8
+LAYER_BLOOM = 9  # post-process over everything drawn so far (see bloom.py)
+LAYER_HUD = 10
+LAYER_OVERLAY = 11  # stage flash and announcement
+
+# Layers drawn in screen space, without the flush offset (screen shake)
+SCREEN_LAYERS = frozenset((LAYER_GALAXY, LAYER_BACKGROUND, LAYER_BLOOM, LAYER_HUD,
+                           LAYER_OVERLAY))
+# Layers whose blits overlap by design (a galaxy's glow under its arms,
+# text over its shadow), drawn in submission order
+ORDERED_LAYERS = frozenset((LAYER_GALAXY, LAYER_HUD, LAYER_OVERLAY))
+
+
+def _texture(item):
+    return id(item[0])
+
+
+class RenderQueue:
+    """Collects one frame's draw commands and submits them in batches.
+
+    ``viewport`` is the area commands may become visible in, in the
+    coordinates they are submitted in; make it larger than the screen to
+    cover screen shake. ``stats`` counts the work of the last flush.
+    Submissions are always in screen coordinates, whatever the flush scale.
+    A display backend other than a Surface consumes the queue with
+    ``drain`` (see ``gpu.py``).
+    """
+
+    def __init__(self, viewport):
+        self.viewport = pygame.Rect(viewport)
+        self._bounds = (self.viewport.left, self.viewport.top,
+                        self.viewport.right, self.viewport.bottom)
+        # layer -> runs; a run is a list of Surface.blits items or a draw call
+        self._layers = {}
+        self._open = {}  # layer -> its last run, while that run takes blits
+        self._culled = 0
+        # Scaled copies of sprites, for flushes with a scale other than 1
+        self._scale = 1
+        self._scaled = {}
+        self.stats = {'sprites': 0, 'culled': 0, 'batches': 0, 'calls': 0}
+
+    def _run(self, layer):
+        run = self._open.get(layer)
+        if run is None:
+            run = self._open[layer] = []
+            self._layers.setdefault(layer, []).append(run)
+        return run
+
+    def visible(self, rect):
+        """True if ``rect`` overlaps the viewport.
+
+        Lets callers skip building a one-off surface that would be culled.
+        """
+        return self.viewport.colliderect(rect)
+
+    def blit(self, layer, source, pos, special_flags=BLEND):
+        """Queue a blit of ``source`` at ``pos``, unless it is outside the viewport.
+
+        ``special_flags`` defaults to premultiplied blending, for sprites
+        from ``sprites.py``; pass 0 for straight-alpha surfaces.
+        """
+        x, y = pos
+        left, top, right, bottom = self._bounds
+        w, h = source.get_size()
+        if x >= right or y >= bottom or x + w <= left or y + h <= top:
+            self._culled += 1
+            return
+        self._run(layer).append((source, pos, None, special_flags))
+
+    def blits(self, layer, items):
+        """Queue ``(source, pos, None, special_flags)`` items, culling those outside the viewport.
+
+        Items are culled against the largest of their sources, which can
+        keep a few items just outside the viewport (the blit clips them)
+        but saves looking up every item's size.
+        """
+        sources = {item[0] for item in items}
+        if not sources:
+            return
+        left, top, right, bottom = self._bounds
+        left -= max(src.get_width() for src in sources)
+        top -= max(src.get_height() for src in sources)
+        visible = [item for item in items
+                   if left < item[1][0] < right and top < item[1][1] < bottom]
+        self._culled += len(items) - len(visible)
+        if visible:
+            self._run(layer).extend(visible)
+
+    def call(self, layer, fn, *args):
+        """Queue ``fn(surface, transform, *args)``, run in order within its layer.
+
+        ``transform`` is ``(dx, dy, scale)``: the function must draw a point
+        ``(x, y)`` at ``((x + dx) * scale, (y + dy) * scale)``, and sizes
+        times ``scale``. It may return the Rect it drew into, which lets
+        the texture backend upload only that area.
+        """
+        self._layers.setdefault(layer, []).append((fn, args))
+        self._open.pop(layer, None)
+
+    def clear(self):
+        """Drop all queued commands."""
+        self._layers.clear()
+        self._open.clear()
+        self._culled = 0
+
+    def drain(self, offset=(0, 0), grouped=True):
+        """Yield the queued runs in draw order, then clear the queue.
+
+        Each run is ``(items, None, layer_offset)`` for a list of
+        ``Surface.blits`` items, sorted so that blits of one texture are
+        adjacent if ``grouped`` (except on ``ORDERED_LAYERS``), or
+        ``(fn, args, layer_offset)`` for a draw call.
+        ``layer_offset`` is ``offset``, or ``(0, 0)`` on ``SCREEN_LAYERS``.
+        Updates ``stats``.
+        """
+        batches = calls = sprites = 0
+        for layer in sorted(self._layers):
+            layer_offset = (0, 0) if layer in SCREEN_LAYERS else offset
+            ordered = not grouped or layer in ORDERED_LAYERS
+            for run in self._layers[layer]:
+                if isinstance(run, tuple):
+                    calls += 1
+                    yield run[0], run[1], layer_offset
+                else:
+                    sprites += len(run)
+                    batches += 1
+                    # Stable sort: submission order is kept within each texture
+                    yield run if ordered else sorted(run, key=_texture), None, layer_offset
+        self.stats = {'sprites': sprites + self._culled, 'culled': self._culled,
+                      'batches': batches, 'calls': calls}
+        self.clear()
+
+    def scaled_sprites(self):
+        """Return the number of scaled sprite copies kept for the current scale."""
+        return len(self._scaled)
+
+    def _scale_source(self, src, flags):
+        """Scale a source by the current scale, keeping the copy if it is a sprite.
+
+        Sprites (premultiplied, or their ``sprites.rle`` copies) live for
+        the whole game; other straight-alpha surfaces are typically drawn
+        for one frame and scaled each time.
+        """
+        w, h = src.get_size()
+        size = (max(1, round(w * self._scale)), max(1, round(h * self._scale)))
+        scaled = pygame.transform.smoothscale(src, size)
+        if flags == BLEND or is_rle(src):
+            self._scaled[src] = scaled
+        return scaled
+
+    def flush(self, surface, offset=(0, 0), scale=1):
+        """Draw every queued command onto ``surface`` shifted by ``offset``, then clear.
+
+        With a ``scale`` other than 1, positions and sprites are scaled to
+        match: the frame comes out ``scale`` times the submitted size.
+        Scaled copies of the sprites are kept until the scale changes.
+
+        Returns:
+            dict: The ``stats`` of this flush.
+        """
+        if scale != self._scale:
+            self._scale = scale
+            self._scaled.clear()
+        cached, scale_source = self._scaled.get, self._scale_source
+        for run, args, (dx, dy) in self.drain(offset, grouped=False):
+            if args is not None:
+                run(surface, (dx, dy, scale), *args)
+                continue
+            if scale != 1:
+                # Look each source up once, as a run is mostly thousands of blits
+                # of a few; blits truncates the float positions like int() would
+                scaled = {src: cached(src) or scale_source(src, flags)
+                          for src, flags in {item[0]: item[3] for item in run}.items()}
+                ox, oy = dx * scale, dy * scale
+                run = [(scaled[src], (x * scale + ox, y * scale + oy), area, flags)
+                       for src, (x, y), area, flags in run]
+            elif dx or dy:
+                run = [(src, (x + dx, y + dy), area, flags) for src, (x, y), area, flags in run]
+            surface.blits(run, doreturn=False)
+        return self.stats
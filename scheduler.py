@@ -0,0 +1,153 @@
+"""Simulation-tick scheduler for Space Blaster: one-shot and repeating events.
+
+Game timing runs on simulation ticks, one per updated frame (``FPS`` per
+second of play) rather than on the wall clock. A slow frame or a headless
+run that goes flat out sees the same spawns, stage changes and cooldowns,
+tick for tick.
+
+Every timer is a ``Timer`` handle:
+
+- with a callback, it is an event, queued in a heap by the tick it is due;
+- without one, it is a countdown that nothing polls: its ``remaining``
+  ticks are worked out from the clock when asked.
+
+``Scheduler.advance`` only looks at the events that are due, so a tick
+costs O(due events) however many are pending. Periods and delays may be
+fractions of a tick: an event due several times within one tick fires
+that many times. Pausing stops the clock, so every event and countdown
+keeps its remaining time until ``resume``.
+"""
+
+import heapq
+import itertools
+
+from config import FPS
+
+
+def ticks(ms):
+    """Return the number of simulation ticks in ``ms`` milliseconds (a float)."""
+    return ms * FPS / 1000
+
+
+class Timer:
+    """A one-shot or repeating event, or a countdown (``Scheduler.timer``)."""
+
+    __slots__ = ('due', 'period', 'callback', '_scheduler', '_entry')
+
+    def __init__(self, scheduler, callback=None):
+        self._scheduler = scheduler
+        self.callback = callback
+        self.due = None      # tick the timer runs out at; None when idle
+        self.period = None   # ticks between repeats; None for one-shots
+        self._entry = None   # its current heap entry, if queued
+
+    @property
+    def active(self):
+        """True until the timer runs out (repeating events stay active)."""
+        return self.due is not None and (self.period is not None
+                                         or self.due > self._scheduler.now)
+
+    @property
+    def remaining(self):
+        """Ticks until the timer runs out, or 0 if it is idle."""
+        if self.due is None:
+            return 0
+        return max(0, self.due - self._scheduler.now)
+
+    def start(self, delay, period=None):
+        """(Re)arm the timer to run out ``delay`` ticks from now.
+
+        ``period`` makes an event repeat every ``period`` ticks after that.
+        """
+        if period is not None and period <= 0:
+            raise ValueError('a repeating timer needs a positive period')
+        self.period = period
+        self._arm(self._scheduler.now + delay)
+        return self
+
+    def postpone(self, delay):
+        """Move the pending run-out ``delay`` ticks later (e.g. from its callback)."""
+        if self.due is not None:
+            self._arm(self.due + delay)
+
+    def cancel(self):
+        """Stop the timer; a queued event is dropped when it comes up."""
+        self.due = None
+        self.period = None
+        self._entry = None
+
+    def _arm(self, due):
+        self.due = due
+        if self.callback is not None:
+            self._entry = self._scheduler._push(self, due)
+
+
+class Scheduler:
+    """The simulation clock and its queue of events."""
+
+    def __init__(self):
+        self.now = 0        # ticks advanced so far, not counting paused time
+        self.paused = False
+        self._queue = []    # heap of [due, sequence, timer]
+        self._sequence = itertools.count()  # keeps same-tick events in order
+
+    def timer(self, callback=None):
+        """Return an idle timer; arm it with ``Timer.start``."""
+        return Timer(self, callback)
+
+    def after(self, delay, callback):
+        """Call ``callback()`` once, ``delay`` ticks from now.
+
+        Returns:
+            Timer: Its handle.
+        """
+        return Timer(self, callback).start(delay)
+
+    def every(self, period, callback, delay=None):
+        """Call ``callback()`` every ``period`` ticks, first after ``delay`` (default ``period``).
+
+        Returns:
+            Timer: Its handle.
+        """
+        return Timer(self, callback).start(period if delay is None else delay, period)
+
+    def pause(self):
+        """Stop the clock: ``advance`` does nothing until ``resume``."""
+        self.paused = True
+
+    def resume(self):
+        """Restart the clock."""
+        self.paused = False
+
+    def advance(self, count=1):
+        """Advance the clock by ``count`` ticks, firing the events that come due.
+
+        Returns:
+            int: Callbacks run.
+        """
+        if self.paused:
+            return 0
+        fired = 0
+        queue = self._queue
+        for _ in range(count):
+            self.now += 1
+            while queue and queue[0][0] <= self.now:
+                entry = heapq.heappop(queue)
+                timer = entry[2]
+                if timer._entry is not entry:
+                    continue  # cancelled or re-armed since it was queued
+                timer._entry = None
+                if timer.period is not None:
+                    timer._arm(timer.due + timer.period)
+                timer.callback()
+                fired += 1
+        return fired
+
+    def seconds(self, since=0):
+        """Return the simulated seconds from tick ``since`` to now."""
+        return (self.now - since) / FPS
+
+    def _push(self, timer, due):
+        entry = [due, next(self._sequence), timer]
+        heapq.heappush(self._queue, entry)
+        return entry
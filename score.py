@@ -1,33 +1,371 @@
-"""High-score persistence for Space Blaster."""
+"""High-score persistence for Space Blaster.
 
+Every finished run is appended to a JSONL history log (score, stage reached,
+duration, timestamp and player tag). A compact index file holds the top
+``LEADERBOARD_INDEX_SIZE`` records overall and per stage, maintained
+incrementally with min-heaps, and remembers how far into the log it is up to
+date — so startup reads the index plus at most a short log tail, never the
+full history.
+
+The store is kept in memory after the first load. Saving updates that copy
+immediately and hands the record to a background writer thread, which
+appends it to the log and refreshes the index atomically under an
+inter-process lock. Rapid saves are coalesced into one write, and pending
+saves are flushed at interpreter exit.
+"""
+
+import atexit
+import contextlib
+import heapq
+import itertools
 import json
 import os
+import tempfile
+import threading
+import time
+import traceback
 
-from config import MAX_HIGH_SCORES
+from config import MAX_HIGH_SCORES, LEADERBOARD_INDEX_SIZE
 
-# Score file lives next to this module
-SCORE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'highscores.json')
+# Score files live next to this module
+_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORE_LOG = os.path.join(_DIR, 'scores.jsonl')
+SCORE_INDEX = os.path.join(_DIR, 'scores.idx.json')
+LOCK_FILE = SCORE_LOG + '.lock'
+# Top-5 list written by older versions; imported into the log once
+SCORE_FILE = os.path.join(_DIR, 'highscores.json')
 
+INDEX_VERSION = 1
+DEFAULT_TAG = os.environ.get('SPACE_BLASTER_PLAYER', '')
 
-def load_high_scores():
-    """Load high scores from JSON file. Returns a sorted list of ints."""
+SAVE_COALESCE_DELAY = 0.05   # seconds the writer waits for follow-up saves
+LOCK_TIMEOUT = 5.0           # seconds to wait for another instance's write
+LOCK_STALE_AFTER = 10.0      # lock files older than this are left over from a crash
+
+_index = None
+_pending = []
+_writing = False
+_flushing = False
+_writer = None
+_cond = threading.Condition()
+
+
+# ---------- Top-N index ----------
+
+class _TopIndex:
+    """Top-N records overall and per stage, each kept as a bounded min-heap."""
+
+    _tiebreak = itertools.count()
+
+    def __init__(self, size=LEADERBOARD_INDEX_SIZE, log_size=0):
+        self.size = size
+        self.log_size = log_size  # bytes of the log already folded in
+        self.overall = []
+        self.stages = {}
+
+    def add(self, rec):
+        """Fold one record into the overall and per-stage heaps."""
+        # Equal scores rank by age: the earlier run stays ahead
+        item = (rec['score'], -(rec.get('time') or 0), next(self._tiebreak), rec)
+        self._push(self.overall, item)
+        if rec.get('stage') is not None:
+            self._push(self.stages.setdefault(rec['stage'], []), item)
+
+    def _push(self, heap, item):
+        if len(heap) < self.size:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def top(self, n, stage=None):
+        heap = self.overall if stage is None else self.stages.get(stage, [])
+        return [item[-1] for item in heapq.nlargest(n, heap)]
+
+    def replay(self, path):
+        """Fold in complete log lines past ``log_size``."""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(self.log_size)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # partial append from a writer that is still going
+                    self.log_size += len(line)
+                    try:
+                        self.add(json.loads(line))
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        pass
+        except FileNotFoundError:
+            pass
+
+    def to_json(self):
+        return {
+            'version': INDEX_VERSION,
+            'log_size': self.log_size,
+            'overall': self.top(self.size),
+            'stages': {str(s): self.top(self.size, s) for s in self.stages},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError('unsupported index version')
+        idx = cls(log_size=data['log_size'])
+        # Per-stage lists may hold records that fell out of the overall top
+        seen = set()
+        for rec in itertools.chain(data['overall'], *data['stages'].values()):
+            key = json.dumps(rec, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                idx.add(rec)
+        return idx
+
+
+def _load_index():
+    """Read the index and catch up on the log tail it has not seen.
+
+    Only a missing or unreadable index triggers a full scan of the log.
+    """
+    try:
+        with open(SCORE_INDEX, 'r') as f:
+            idx = _TopIndex.from_json(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        idx = _TopIndex()
+        if not os.path.exists(SCORE_LOG):
+            for s in _read_legacy_scores():
+                idx.add(_make_record(s, None, None, None))
+    idx.replay(SCORE_LOG)
+    return idx
+
+
+def _read_legacy_scores():
     try:
         with open(SCORE_FILE, 'r') as f:
-            scores = json.load(f)
-        return sorted(scores, reverse=True)[:MAX_HIGH_SCORES]
-    except (FileNotFoundError, json.JSONDecodeError):
+            return [int(s) for s in json.load(f)]
+    except (FileNotFoundError, json.JSONDecodeError, TypeError, ValueError):
         return []
 
 
-def save_high_score(new_score):
-    """Add a new score to the high-scores list and persist to disk.
+def _make_record(score, stage, duration, tag):
+    return {
+        'score': int(score),
+        'stage': stage,
+        'duration': duration,
+        'time': round(time.time(), 3),
+        'tag': tag,
+    }
+
+
+# ---------- Public API ----------
+
+def load_high_scores():
+    """Return the top scores, reading from disk only on first use.
+
+    Returns:
+        list: Sorted list of the best ``MAX_HIGH_SCORES`` scores as ints.
+    """
+    return [r['score'] for r in top_scores(MAX_HIGH_SCORES)]
+
+
+def top_scores(n=MAX_HIGH_SCORES, stage=None):
+    """Return the best ``n`` run records overall, or among runs that ended on ``stage``.
+
+    ``n`` is capped at ``LEADERBOARD_INDEX_SIZE``.
+
+    Returns:
+        list: Record dicts with score, stage, duration (ms), time and tag.
+    """
+    global _index
+    with _cond:
+        if _index is None:
+            _index = _load_index()
+        return _index.top(n, stage)
+
+
+def save_high_score(new_score, stage=None, duration=None, tag=DEFAULT_TAG):
+    """Record a finished run and schedule it to be persisted in the background.
 
     Returns:
         list: Updated sorted high-score list.
     """
-    scores = load_high_scores()
-    scores.append(new_score)
-    scores = sorted(scores, reverse=True)[:MAX_HIGH_SCORES]
-    with open(SCORE_FILE, 'w') as f:
-        json.dump(scores, f)
-    return scores
+    rec = _make_record(new_score, stage, duration, tag)
+    top_scores(0)  # make sure the store is loaded
+    with _cond:
+        _index.add(rec)
+        _pending.append(rec)
+        _start_writer()
+        _cond.notify_all()
+    return load_high_scores()
+
+
+def flush_high_scores(timeout=LOCK_TIMEOUT * 2):
+    """Block until all pending saves are on disk (or the timeout expires).
+
+    Returns:
+        bool: True if nothing is left to write.
+    """
+    global _flushing
+    deadline = time.monotonic() + timeout
+    with _cond:
+        _flushing = True
+        _cond.notify_all()
+        try:
+            while _pending or _writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                _cond.wait(remaining)
+            return True
+        finally:
+            _flushing = False
+
+
+def iter_history():
+    """Yield every run record in the history log, oldest first (full scan)."""
+    try:
+        with open(SCORE_LOG, 'rb') as f:
+            for line in f:
+                if line.endswith(b'\n'):
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+
+# ---------- Background writer ----------
+
+def _start_writer():
+    """Start the writer thread on first save (caller holds _cond)."""
+    global _writer
+    if _writer is None:
+        _writer = threading.Thread(target=_writer_loop, name='score-writer', daemon=True)
+        _writer.start()
+        atexit.register(flush_high_scores)
+
+
+def _writer_loop():
+    global _index, _writing
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            if not _flushing:
+                _cond.wait(SAVE_COALESCE_DELAY)
+            batch = _pending[:]
+            _pending.clear()
+            _writing = True
+        retry = False
+        try:
+            merged = _write_records(batch)
+        except OSError as exc:
+            print(f'Warning: could not save high scores ({exc}); will retry.')
+            merged, retry = None, True
+        except Exception:
+            # A bug, not a busy disk: retrying would fail the same way, so the
+            # batch is dropped. The thread must not die, or every later save
+            # would wait on it forever.
+            print('Warning: could not save high scores; dropping '
+                  f'{len(batch)} run(s) from the log:')
+            traceback.print_exc()
+            merged = None
+        with _cond:
+            _writing = False
+            if retry:
+                _pending[:0] = batch
+            elif merged is not None:
+                for rec in _pending:
+                    merged.add(rec)
+                _index = merged
+            _cond.notify_all()
+        if retry:
+            time.sleep(1.0)
+
+
+def _write_records(records):
+    """Append records to the log and refresh the index, under the lock.
+
+    The on-disk index is re-read so runs saved by other instances are
+    picked up from the log tail as well.
+
+    Returns:
+        _TopIndex: The index now on disk.
+    """
+    _acquire_lock()
+    try:
+        idx = _load_index()
+        if idx.log_size == 0:
+            # Empty history: carry legacy top-5 scores (if any) into the log
+            records = idx.top(idx.size) + records
+            idx = _TopIndex()
+        with open(SCORE_LOG, 'ab+') as f:
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')  # terminate a line torn by a crashed writer
+            f.write(b''.join(json.dumps(r).encode() + b'\n' for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        idx.replay(SCORE_LOG)
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.scores-', suffix='.tmp',
+                                        dir=os.path.dirname(SCORE_INDEX))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(idx.to_json(), f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, SCORE_INDEX)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return idx
+    finally:
+        # Gone only if another instance took it for stale during a long stall
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(LOCK_FILE)
+
+
+def _acquire_lock():
+    """Create the lock file exclusively, waiting out other instances."""
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return
+        except FileExistsError:
+            if _break_stale_lock():
+                continue
+        if time.monotonic() > deadline:
+            raise TimeoutError('score log is locked by another instance')
+        time.sleep(0.01)
+
+
+def _break_stale_lock():
+    """Remove the lock file if it is left over from a crash.
+
+    Checking its age and removing it are two steps, so the lock is first
+    renamed to a name of this thread's own: only one instance can move
+    a given file. If the file moved is not the stale one that was checked,
+    another instance has broken that and taken the lock afresh in the
+    meantime, and it is put back.
+
+    Returns:
+        bool: True if the lock is gone and creating it can be retried now.
+    """
+    try:
+        stale = os.stat(LOCK_FILE)
+    except FileNotFoundError:
+        return True
+    if time.time() - stale.st_mtime <= LOCK_STALE_AFTER:
+        return False
+    aside = f'{LOCK_FILE}.{os.getpid()}-{threading.get_ident()}'
+    try:
+        os.rename(LOCK_FILE, aside)
+    except FileNotFoundError:
+        return True  # another instance broke it first
+    moved = os.stat(aside)
+    if (moved.st_ino, moved.st_mtime_ns) == (stale.st_ino, stale.st_mtime_ns):
+        os.unlink(aside)
+        return True
+    with contextlib.suppress(OSError):  # someone else holds the lock already
+        os.link(aside, LOCK_FILE)
+    os.unlink(aside)
+    return False
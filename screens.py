@@ -5,8 +5,10 @@ import os
 
 import pygame
 
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, BUTTON_W, BUTTON_H, FONT_PATH
-from renderer import draw_player_ship
+import sprites
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, BUTTON_W, BUTTON_H, FONT_PATH, SPRITE_FADE_STEPS
+from renderer import submit_hearts, submit_player_ship
+from renderqueue import RenderQueue, LAYER_HUD, LAYER_OVERLAY
 
 
 # Precomputed button rectangles
@@ -28,22 +30,107 @@ def _load_font(size):
 
 
 class Fonts:
-    """Pixel-art font collection using Press Start 2P."""
+    """Pixel-art font collection using Press Start 2P.
 
-    def __init__(self):
-        self.small = _load_font(10)
-        self.medium = _load_font(14)
-        self.large = _load_font(24)
-        self.title = _load_font(32)
-        self.button = _load_font(14)
-        self.score = _load_font(12)
+    Each font is loaded on first use, so screens only pay for the sizes
+    they draw with.
+    """
+
+    SIZES = {'small': 10, 'medium': 14, 'large': 24, 'title': 32, 'button': 14, 'score': 12}
+
+    def __getattr__(self, name):
+        size = self.SIZES.get(name)
+        if size is None:
+            raise AttributeError(name)
+        font = _load_font(size)
+        setattr(self, name, font)
+        return font
+
+
+# ---------- Text cache ----------
+
+TEXT_CACHE_SIZE = 256  # renders kept before the cache is reset
+
+_texts = {}
+_shadows = {}
+
+
+def _text(font, text, color):
+    """Return a cached antialiased render of ``text``.
+
+    Menu and HUD strings rarely change between frames, so rendering them
+    once avoids a font rasterization and surface allocation per frame.
+    """
+    key = (font, text, color)
+    surf = _texts.get(key)
+    if surf is None:
+        if len(_texts) >= TEXT_CACHE_SIZE:
+            _texts.clear()
+            _shadows.clear()
+        surf = _texts[key] = font.render(text, True, color)
+    return surf
+
+
+# ---------- Cached overlays ----------
+
+_overlays = {}
+_title_glow = None
+
+
+def _overlay(size, color, alpha):
+    """Return a cached solid surface of ``size`` and ``color`` set to ``alpha``.
+
+    Each alpha gets a surface of its own, so overlays queued in one frame
+    keep their alphas until the flush. They are subsurfaces sharing one
+    fill per size and color: every fade step reuses the same pixels and
+    the full-screen overlays are allocated once rather than every frame.
+    """
+    key = (size, color, alpha)
+    surf = _overlays.get(key)
+    if surf is None:
+        solid = _overlays.get((size, color))
+        if solid is None:
+            solid = _overlays[size, color] = pygame.Surface(size)
+            solid.fill(color)
+        surf = _overlays[key] = solid.subsurface(solid.get_rect())
+        surf.set_alpha(alpha)
+    return surf
+
+
+def _build_announcement(font, stage, level):
+    """Stage announcement text faded to ``level``, premultiplied."""
+    text = sprites.premultiplied(font.render(f'STAGE {stage}', True, (255, 255, 100)))
+    a = sprites.fade_alpha(level)
+    text.fill((a, a, a, a), special_flags=pygame.BLEND_RGBA_MULT)
+    return text
+
+
+def _build_announcement_shadow(font, stage):
+    """Drop shadow of the announcement; it stays at alpha 120 while the text fades."""
+    shadow = sprites.premultiplied(font.render(f'STAGE {stage}', True, (255, 255, 100)))
+    shadow.fill((0, 0, 0, 120), special_flags=pygame.BLEND_RGBA_MULT)
+    return shadow
+
+
+def prefetch_announcement(font, stage):
+    """Render the announcement of ``stage`` at every fade level into the sprite cache."""
+    for level in range(SPRITE_FADE_STEPS + 1):
+        sprites.get(('announce', stage, level), _build_announcement, font, stage, level)
+    sprites.get(('announce_shadow', stage), _build_announcement_shadow, font, stage)
+
+
+def forget_announcements(keep):
+    """Drop the cached announcements of every stage not in ``keep``.
+
+    Each stage's text is different, so in endless mode they would
+    otherwise pile up one set per stage.
+    """
+    sprites.evict(lambda key: key[0] in ('announce', 'announce_shadow') and key[1] not in keep)
 
 
 def _draw_retro_panel(surface, rect, bg_alpha=120, border_color=(100, 120, 180)):
     """Draw a retro-styled panel with border and translucent background."""
-    panel = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
-    panel.fill((10, 10, 30, bg_alpha))
-    surface.blit(panel, rect.topleft)
+    surface.blit(_overlay(rect.size, (10, 10, 30), bg_alpha), rect.topleft)
     pygame.draw.rect(surface, border_color, rect, width=2)
     # Corner highlights
     csize = 6
@@ -72,31 +159,62 @@ def _draw_button(surface, rect, label, font, mouse_pos, color_normal, color_hove
     # Border
     pygame.draw.rect(surface, brd_color, rect, width=2)
 
-    text = font.render(label, True, (255, 255, 255))
+    text = _text(font, label, (255, 255, 255))
     surface.blit(text, (rect.centerx - text.get_width() // 2,
                         rect.centery - text.get_height() // 2))
 
 
+def _shadow(text_surf):
+    """Return the cached dark drop shadow of a text render."""
+    shadow = _shadows.get(text_surf)
+    if shadow is None:
+        shadow = text_surf.copy()
+        shadow.fill((0, 0, 0), special_flags=pygame.BLEND_RGB_MIN)
+        shadow.set_alpha(120)
+        if len(_shadows) >= TEXT_CACHE_SIZE:
+            _shadows.clear()
+        _shadows[text_surf] = shadow
+    return shadow
+
+
 def _draw_text_with_shadow(surface, text_surf, x, y, shadow_offset=2):
     """Blit text with a dark drop shadow for readability."""
-    shadow = text_surf.copy()
-    shadow.fill((0, 0, 0), special_flags=pygame.BLEND_RGB_MIN)
-    shadow.set_alpha(120)
-    surface.blit(shadow, (x + shadow_offset, y + shadow_offset))
+    surface.blit(_shadow(text_surf), (x + shadow_offset, y + shadow_offset))
     surface.blit(text_surf, (x, y))
 
 
-def draw_title_screen(surface, fonts, high_scores, mouse_pos, title_frame, player_w, player_h):
-    """Draw the title screen."""
-    # Title text with glow pulse
-    pulse = 0.8 + 0.2 * math.sin(title_frame * 0.04)
+def _submit_text_with_shadow(queue, text_surf, x, y, shadow_offset=2):
+    """Queue text with its drop shadow on the HUD layer."""
+    queue.blit(LAYER_HUD, _shadow(text_surf), (x + shadow_offset, y + shadow_offset),
+               special_flags=0)
+    queue.blit(LAYER_HUD, text_surf, (x, y), special_flags=0)
+
+
+def submit_title_ship(queue, title_frame, player_w, player_h):
+    """Queue the title screen's bobbing player ship.
+
+    It goes through the render queue like the in-game ship, which keeps
+    its premultiplied glow off the texture backend's software layer.
+    """
+    bob = math.sin(title_frame * 0.05) * 8
+    submit_player_ship(queue, SCREEN_WIDTH // 2 - player_w // 2,
+                       int(SCREEN_HEIGHT // 2 - 50 + bob), player_w, player_h)
+
+
+def draw_title_screen(surface, fonts, high_scores, mouse_pos, title_frame):
+    """Draw the title screen over the ship queued by ``submit_title_ship``."""
+    # Title text with glow pulse (quantized so the renders can be cached)
+    pulse = 0.8 + 0.2 * round(math.sin(title_frame * 0.04) * 16) / 16
     title_color = (int(80 * pulse), int(180 * pulse), int(255 * pulse))
 
     # Title glow effect
-    glow_text = fonts.title.render('SPACE BLASTER', True, (40, 100, 200))
-    glow_surf = pygame.Surface((glow_text.get_width() + 8, glow_text.get_height() + 8),
-                               pygame.SRCALPHA)
-    glow_surf.blit(glow_text, (4, 4))
+    global _title_glow
+    if _title_glow is None:
+        glow_text = _text(fonts.title, 'SPACE BLASTER', (40, 100, 200))
+        _title_glow = pygame.Surface((glow_text.get_width() + 8, glow_text.get_height() + 8),
+                                     pygame.SRCALPHA)
+        _title_glow.blit(glow_text, (4, 4))
+    glow_surf = _title_glow
     glow_surf.set_alpha(int(60 * pulse))
     tx = SCREEN_WIDTH // 2 - glow_surf.get_width() // 2
     ty = SCREEN_HEIGHT // 5 - 10
@@ -104,24 +222,19 @@ def draw_title_screen(surface, fonts, high_scores, mouse_pos, title_frame, playe
     surface.blit(glow_surf, (tx + 2, ty + 2))
 
     # Title text
-    title_text = fonts.title.render('SPACE BLASTER', True, title_color)
+    title_text = _text(fonts.title, 'SPACE BLASTER', title_color)
     _draw_text_with_shadow(surface,
                            title_text,
                            SCREEN_WIDTH // 2 - title_text.get_width() // 2,
                            SCREEN_HEIGHT // 5 - 10, shadow_offset=3)
 
     # Subtitle
-    sub_text = fonts.small.render('Defend the galaxy!', True, (160, 180, 200))
+    sub_text = _text(fonts.small, 'Defend the galaxy!', (160, 180, 200))
     _draw_text_with_shadow(surface,
                            sub_text,
                            SCREEN_WIDTH // 2 - sub_text.get_width() // 2,
                            SCREEN_HEIGHT // 5 + 40)
 
-    # Decorative player ship (bobbing)
-    bob = math.sin(title_frame * 0.05) * 8
-    draw_player_ship(surface, SCREEN_WIDTH // 2 - player_w // 2,
-                     SCREEN_HEIGHT // 2 - 50 + bob, player_w, player_h)
-
     # START button
     _draw_button(surface, BUTTON_RECT, 'START', fonts.button, mouse_pos,
                  (20, 80, 180), (40, 120, 220), (60, 140, 230), (100, 200, 255))
@@ -133,70 +246,91 @@ def draw_title_screen(surface, fonts, high_scores, mouse_pos, title_frame, playe
                                  BUTTON_RECT.bottom + 20, panel_w, panel_h)
         _draw_retro_panel(surface, panel_rect, bg_alpha=140)
 
-        hs_title = fonts.small.render('HIGH SCORES', True, (180, 200, 255))
+        hs_title = _text(fonts.small, 'HIGH SCORES', (180, 200, 255))
         _draw_text_with_shadow(surface, hs_title,
                                SCREEN_WIDTH // 2 - hs_title.get_width() // 2,
                                panel_rect.top + 8)
         for idx, hs in enumerate(high_scores):
             color = (255, 215, 0) if idx == 0 else (200, 200, 220)
-            num_text = fonts.score.render(f'{idx + 1}.', True, (120, 140, 160))
-            score_text = fonts.score.render(f'{hs:,}', True, color)
+            num_text = _text(fonts.score, f'{idx + 1}.', (120, 140, 160))
+            score_text = _text(fonts.score, f'{hs:,}', color)
             row_y = panel_rect.top + 30 + idx * 24
             surface.blit(num_text, (panel_rect.left + 20, row_y))
             surface.blit(score_text, (panel_rect.right - 20 - score_text.get_width(), row_y))
 
 
-def draw_hud(surface, fonts, score, stage, lives, is_boosted=False):
-    """Draw the in-game HUD: hearts, score, stage, and boost indicator."""
-    from renderer import draw_hearts
-    draw_hearts(surface, lives)
+def submit_hud(queue, fonts, score, stage, lives, is_boosted=False):
+    """Queue the in-game HUD: hearts, score, stage, and boost indicator."""
+    submit_hearts(queue, lives)
 
-    score_text = fonts.score.render(f'SCORE {score:,}', True, (220, 230, 255))
-    _draw_text_with_shadow(surface, score_text,
-                           SCREEN_WIDTH - score_text.get_width() - 15, 12)
+    score_text = _text(fonts.score, f'SCORE {score:,}', (220, 230, 255))
+    _submit_text_with_shadow(queue, score_text,
+                             SCREEN_WIDTH - score_text.get_width() - 15, 12)
 
-    stage_hud = fonts.score.render(f'STAGE {stage}', True, (180, 200, 255))
-    _draw_text_with_shadow(surface, stage_hud,
-                           SCREEN_WIDTH // 2 - stage_hud.get_width() // 2, 12)
+    stage_hud = _text(fonts.score, f'STAGE {stage}', (180, 200, 255))
+    _submit_text_with_shadow(queue, stage_hud,
+                             SCREEN_WIDTH // 2 - stage_hud.get_width() // 2, 12)
 
     if is_boosted:
-        boost_text = fonts.small.render('SPEED UP!', True, (50, 255, 50))
+        boost_text = _text(fonts.small, 'SPEED UP!', (50, 255, 50))
         # Blink effect
         if (pygame.time.get_ticks() // 500) % 2 == 0:
-            _draw_text_with_shadow(surface, boost_text,
-                                   SCREEN_WIDTH // 2 - boost_text.get_width() // 2, 35)
+            _submit_text_with_shadow(queue, boost_text,
+                                     SCREEN_WIDTH // 2 - boost_text.get_width() // 2, 35)
 
 
-def draw_stage_effects(surface, fonts, stage, stage_flash, stage_announce):
-    """Draw stage transition flash and announcement."""
+def draw_hud(surface, fonts, score, stage, lives, is_boosted=False):
+    """Draw the in-game HUD: hearts, score, stage, and boost indicator."""
+    queue = RenderQueue(surface.get_rect())
+    submit_hud(queue, fonts, score, stage, lives, is_boosted)
+    queue.flush(surface)
+
+
+def submit_stage_effects(queue, fonts, stage, stage_flash, stage_announce):
+    """Queue the stage transition flash and announcement over the HUD."""
     if stage_flash > 0:
-        flash_s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        flash_s.fill((255, 255, 255, int(180 * (stage_flash / 12))))
-        surface.blit(flash_s, (0, 0))
+        queue.blit(LAYER_OVERLAY, _overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (255, 255, 255),
+                                           int(180 * (stage_flash / 12))), (0, 0),
+                   special_flags=0)
 
     if stage_announce > 0:
-        ann_alpha = min(255, stage_announce * 4)
-        ann_text = fonts.large.render(f'STAGE {stage}', True, (255, 255, 100))
-        ann_s = pygame.Surface(ann_text.get_size(), pygame.SRCALPHA)
-        ann_s.blit(ann_text, (0, 0))
-        ann_s.set_alpha(ann_alpha)
-        _draw_text_with_shadow(surface, ann_s,
-                               SCREEN_WIDTH // 2 - ann_text.get_width() // 2,
-                               SCREEN_HEIGHT // 2 - ann_text.get_height() // 2)
+        # Pre-rendered at SPRITE_FADE_STEPS alpha levels
+        level = sprites.fade_level(min(255, stage_announce * 4) / 255)
+        ann_text = sprites.get(('announce', stage, level), _build_announcement,
+                               fonts.large, stage, level)
+        shadow = sprites.get(('announce_shadow', stage), _build_announcement_shadow,
+                             fonts.large, stage)
+        x = SCREEN_WIDTH // 2 - ann_text.get_width() // 2
+        y = SCREEN_HEIGHT // 2 - ann_text.get_height() // 2
+        queue.blit(LAYER_OVERLAY, shadow, (x + 2, y + 2))
+        queue.blit(LAYER_OVERLAY, ann_text, (x, y))
 
 
-def draw_pause_screen(surface, fonts, score, stage, mouse_pos):
-    """Draw the pause overlay with continue/quit buttons."""
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 160))
-    surface.blit(overlay, (0, 0))
+def draw_stage_effects(surface, fonts, stage, stage_flash, stage_announce):
+    """Draw stage transition flash and announcement."""
+    queue = RenderQueue(surface.get_rect())
+    submit_stage_effects(queue, fonts, stage, stage_flash, stage_announce)
+    queue.flush(surface)
+
+
+def draw_pause_backdrop(surface, fonts):
+    """Draw the static part of the pause screen: dimmer, title and hint."""
+    surface.blit(_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0), 160), (0, 0))
 
     # PAUSED title
-    pause_text = fonts.large.render('PAUSED', True, (220, 220, 255))
+    pause_text = _text(fonts.large, 'PAUSED', (220, 220, 255))
     _draw_text_with_shadow(surface, pause_text,
                            SCREEN_WIDTH // 2 - pause_text.get_width() // 2,
                            SCREEN_HEIGHT // 2 - 90)
 
+    # Hint
+    esc_hint = _text(fonts.small, 'Press ESC to resume', (140, 140, 160))
+    surface.blit(esc_hint, (SCREEN_WIDTH // 2 - esc_hint.get_width() // 2,
+                            PAUSE_QUIT_RECT.bottom + 20))
+
+
+def draw_pause_buttons(surface, fonts, mouse_pos):
+    """Draw the continue/quit buttons (the only part that reacts to the mouse)."""
     # Continue button
     _draw_button(surface, PAUSE_CONTINUE_RECT, 'CONTINUE', fonts.button, mouse_pos,
                  (20, 110, 70), (40, 160, 100), (40, 160, 100), (80, 220, 140))
@@ -205,32 +339,31 @@ def draw_pause_screen(surface, fonts, score, stage, mouse_pos):
     _draw_button(surface, PAUSE_QUIT_RECT, 'QUIT', fonts.button, mouse_pos,
                  (110, 30, 30), (160, 50, 50), (160, 50, 50), (220, 80, 80))
 
-    # Hint
-    esc_hint = fonts.small.render('Press ESC to resume', True, (140, 140, 160))
-    surface.blit(esc_hint, (SCREEN_WIDTH // 2 - esc_hint.get_width() // 2,
-                            PAUSE_QUIT_RECT.bottom + 20))
 
+def draw_pause_screen(surface, fonts, score, stage, mouse_pos):
+    """Draw the pause overlay with continue/quit buttons."""
+    draw_pause_backdrop(surface, fonts)
+    draw_pause_buttons(surface, fonts, mouse_pos)
 
-def draw_game_over_screen(surface, fonts, score, stage, high_scores, mouse_pos):
-    """Draw the game-over overlay with score, high scores, and play again button."""
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 170))
-    surface.blit(overlay, (0, 0))
+
+def draw_game_over_backdrop(surface, fonts, score, stage, high_scores):
+    """Draw the static part of the game-over screen: dimmer, score and high scores."""
+    surface.blit(_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0), 170), (0, 0))
 
     # GAME OVER title
-    go_text = fonts.large.render('GAME OVER', True, (255, 60, 60))
+    go_text = _text(fonts.large, 'GAME OVER', (255, 60, 60))
     _draw_text_with_shadow(surface, go_text,
                            SCREEN_WIDTH // 2 - go_text.get_width() // 2,
                            SCREEN_HEIGHT // 5 - 10, shadow_offset=3)
 
     # Stage reached
-    stage_go = fonts.small.render(f'Stage {stage} reached', True, (120, 180, 255))
+    stage_go = _text(fonts.small, f'Stage {stage} reached', (120, 180, 255))
     _draw_text_with_shadow(surface, stage_go,
                            SCREEN_WIDTH // 2 - stage_go.get_width() // 2,
                            SCREEN_HEIGHT // 5 + 28)
 
     # Final score
-    final_text = fonts.medium.render(f'Your Score: {score:,}', True, (255, 220, 100))
+    final_text = _text(fonts.medium, f'Your Score: {score:,}', (255, 220, 100))
     _draw_text_with_shadow(surface, final_text,
                            SCREEN_WIDTH // 2 - final_text.get_width() // 2,
                            SCREEN_HEIGHT // 5 + 55)
@@ -242,7 +375,7 @@ def draw_game_over_screen(surface, fonts, score, stage, high_scores, mouse_pos):
                                  SCREEN_HEIGHT // 5 + 90, panel_w, panel_h)
         _draw_retro_panel(surface, panel_rect, bg_alpha=160, border_color=(120, 140, 200))
 
-        hs_title = fonts.small.render('HIGH SCORES', True, (180, 200, 255))
+        hs_title = _text(fonts.small, 'HIGH SCORES', (180, 200, 255))
         _draw_text_with_shadow(surface, hs_title,
                                SCREEN_WIDTH // 2 - hs_title.get_width() // 2,
                                panel_rect.top + 10)
@@ -257,26 +390,32 @@ def draw_game_over_screen(surface, fonts, score, stage, high_scores, mouse_pos):
             else:
                 color = (200, 200, 220)
 
-            num_text = fonts.score.render(f'{idx + 1}.', True, (120, 140, 160))
-            score_text = fonts.score.render(f'{hs:,}', True, color)
+            num_text = _text(fonts.score, f'{idx + 1}.', (120, 140, 160))
+            score_text = _text(fonts.score, f'{hs:,}', color)
             row_y = panel_rect.top + 34 + idx * 26
 
             # Highlight bar for current score
             if is_current:
                 hl_rect = pygame.Rect(panel_rect.left + 4, row_y - 3,
                                       panel_rect.w - 8, 22)
-                hl_surf = pygame.Surface((hl_rect.w, hl_rect.h), pygame.SRCALPHA)
-                hl_surf.fill((100, 255, 100, 30))
-                surface.blit(hl_surf, hl_rect.topleft)
+                surface.blit(_overlay(hl_rect.size, (100, 255, 100), 30), hl_rect.topleft)
                 pygame.draw.rect(surface, (100, 255, 100), hl_rect, width=1)
 
             surface.blit(num_text, (panel_rect.left + 24, row_y))
             surface.blit(score_text, (panel_rect.right - 24 - score_text.get_width(), row_y))
 
-    # Play Again button
+    hint_text = _text(fonts.small, 'or press R', (160, 160, 160))
+    surface.blit(hint_text, (SCREEN_WIDTH // 2 - hint_text.get_width() // 2,
+                             GAME_OVER_BUTTON_RECT.bottom + 12))
+
+
+def draw_game_over_buttons(surface, fonts, mouse_pos):
+    """Draw the play again button."""
     _draw_button(surface, GAME_OVER_BUTTON_RECT, 'PLAY AGAIN', fonts.button, mouse_pos,
                  (140, 30, 30), (200, 50, 50), (180, 50, 50), (255, 100, 80))
 
-    hint_text = fonts.small.render('or press R', True, (160, 160, 160))
-    surface.blit(hint_text, (SCREEN_WIDTH // 2 - hint_text.get_width() // 2,
-                             GAME_OVER_BUTTON_RECT.bottom + 12))
+
+def draw_game_over_screen(surface, fonts, score, stage, high_scores, mouse_pos):
+    """Draw the game-over overlay with score, high scores, and play again button."""
+    draw_game_over_backdrop(surface, fonts, score, stage, high_scores)
+    draw_game_over_buttons(surface, fonts, mouse_pos)
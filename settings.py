@@ -0,0 +1,41 @@
+"""Persistent player settings for Space Blaster.
+
+Settings are a small JSON object in ``SETTINGS_PATH`` (for now just the
+graphics quality preset). A missing or unreadable file reads as no
+settings; saving replaces the file atomically.
+"""
+
+import json
+import os
+import tempfile
+
+from config import SETTINGS_PATH
+
+
+def load_settings(path=SETTINGS_PATH):
+    """Read the saved settings.
+
+    Returns:
+        dict: The settings, or an empty dict if none are saved.
+    """
+    try:
+        with open(path) as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+
+def save_settings(settings, path=SETTINGS_PATH):
+    """Merge ``settings`` into the saved settings and write them."""
+    merged = load_settings(path)
+    merged.update(settings)
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix='.settings-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(merged, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
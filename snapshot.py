@@ -0,0 +1,289 @@
+"""Game-state snapshots for Space Blaster, and a rewind ring of them.
+
+``snapshot(game)`` packs the gameplay state into a few hundred bytes
+(about 15 KB in the densest endless stages), and ``restore(game, data)`` puts it
+back. The packed state covers the player, score and stage, every
+scheduled timer, the bullets and enemies with their formation paths, and
+the galaxy and celestial body. By default it also covers the ``random``
+module's state, so a restored game replays the same way; bots can use it
+as a checkpoint. Fixed fields are packed with ``struct`` and entity
+coordinates as ``array`` data, so no pygame object is ever pickled.
+
+Cosmetic state is left out. The starfield keeps scrolling, and
+explosions in flight are cleared on restore.
+
+Timers are stored relative to the scheduler's clock, which keeps running
+forward across a restore. Timers that are not in the snapshot, like the
+background drift, go on undisturbed.
+
+``SnapshotRing`` keeps the latest snapshots in preallocated memory, one
+every ``REWIND_INTERVAL`` ticks. Practice mode (``main.py --practice``)
+rewinds through it.
+"""
+
+import itertools
+import math
+import operator
+import random
+import struct
+from array import array
+
+import pygame
+
+from config import (
+    FPS, BULLET_WIDTH, BULLET_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT,
+    ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT,
+    REWIND_INTERVAL, REWIND_SECONDS, REWIND_SNAPSHOTS, SNAPSHOT_SLOT_BYTES,
+)
+from background import GALAXY_TINTS, CELESTIAL_TYPES
+
+MAGIC = b'SBSN'
+VERSION = 1
+STATES = ('TITLE', 'PLAYING', 'PAUSED', 'GAME_OVER')
+# The Game timers a snapshot covers
+TIMERS = ('invincible', 'stage_timer', 'stage_flash', 'stage_announce', 'shake',
+          'spawn_timer', 'galaxy_timer', 'celestial_timer')
+PATHS = ('straight', 'sine', 'dive', 'plain')
+CELESTIALS = tuple(CELESTIAL_TYPES)
+
+# magic, version, state, stage, score, player x and y, lives, speed boost,
+# ticks since the run started, formation frame, then the counts of player
+# bullets, enemies, enemy bullets and formation tables, and flags for the
+# galaxy, the celestial body and the random state
+_HEADER = struct.Struct('<4sBBHiiiB?IIHHHB???')
+# remaining ticks and period per timer, NaN for an idle timer or a one-shot
+_TIMERS = struct.Struct('<' + 'ff' * len(TIMERS))
+_TABLE = struct.Struct('<Bd')         # path, speed
+_GALAXY = struct.Struct('<hfBBffH')   # x, y, radius, tint, angle, speed, arm dots
+_CELESTIAL = struct.Struct('<BfffBbbB')  # type, x, y, speed, radius, moon x, y, radius
+_RANDOM = struct.Struct('<625Id')     # Mersenne Twister words and position, gauss_next
+
+
+_topleft = operator.attrgetter('topleft')
+
+
+def _coords(rects):
+    return array('h', itertools.chain.from_iterable(map(_topleft, rects)))
+
+
+def snapshot(game, rng=True):
+    """Pack ``game``'s gameplay state into bytes.
+
+    ``rng=False`` leaves out the ``random`` module's state (2.5 KB), for
+    snapshots that only need to restore the scene.
+
+    Returns:
+        bytes: The snapshot, for ``restore``.
+    """
+    now = game.scheduler.now
+    frame, tables, ships = game.formations.get_state(game.enemies)
+    galaxy, celestial = game.galaxy, game.celestial_obj
+    parts = [_HEADER.pack(
+        MAGIC, VERSION, STATES.index(game.state), game.stage, game.score,
+        game.player_x, game.player_y, game.player_lives, game.speed_boost_active,
+        now - game.run_start_tick, frame,
+        len(game.bullets), len(game.enemies), len(game.enemy_bullets), len(tables),
+        galaxy is not None, celestial is not None, rng)]
+
+    timers = []
+    for name in TIMERS:
+        timer = getattr(game, name)
+        if timer.active:
+            timers += (timer.due - now, math.nan if timer.period is None else timer.period)
+        else:
+            timers += (math.nan, math.nan)
+    parts.append(_TIMERS.pack(*timers))
+    parts.extend(_TABLE.pack(PATHS.index(path), speed) for path, speed in tables)
+
+    parts.append(_coords(game.bullets))
+    parts.append(_coords(game.enemy_bullets))
+    parts.append(_coords(game.enemies))
+    if ships:
+        table, column, flip, start = zip(*ships)
+        parts += (array('b', table), array('b', flip), array('h', column),
+                  array('i', [s - frame for s in start]))
+
+    if galaxy is not None:
+        parts.append(_GALAXY.pack(
+            galaxy['x'], galaxy['y'], galaxy['radius'], GALAXY_TINTS.index(galaxy['tint']),
+            galaxy['angle'], galaxy['speed'], galaxy['arm_dots']))
+    if celestial is not None:
+        moon_x, moon_y = celestial.get('moon_offset', (0, 0))
+        parts.append(_CELESTIAL.pack(
+            CELESTIALS.index(celestial['type']), celestial['x'], celestial['y'],
+            celestial['speed'], celestial['radius'], moon_x, moon_y,
+            celestial.get('moon_radius', 0)))
+    if rng:
+        _, state, gauss_next = random.getstate()
+        parts.append(_RANDOM.pack(*state, math.nan if gauss_next is None else gauss_next))
+    return b''.join(parts)
+
+
+def restore(game, data):
+    """Put ``game`` back in the state packed in ``data`` (see ``snapshot``).
+
+    Raises ``ValueError`` if ``data`` is not a snapshot of this version.
+    """
+    view = memoryview(data)
+    try:
+        (magic, version, state, stage, score, player_x, player_y, lives, boost, run_ticks,
+         frame, n_bullets, n_enemies, n_enemy_bullets, n_tables,
+         has_galaxy, has_celestial, has_rng) = _HEADER.unpack_from(view)
+    except struct.error:
+        raise ValueError('not a Space Blaster snapshot') from None
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'not a version {VERSION} Space Blaster snapshot')
+    offset = _HEADER.size
+
+    def take(typecode, count):
+        nonlocal offset
+        values = array(typecode)
+        values.frombytes(view[offset:offset + count * values.itemsize])
+        offset += count * values.itemsize
+        return values
+
+    timers = _TIMERS.unpack_from(view, offset)
+    offset += _TIMERS.size
+    tables = []
+    for _ in range(n_tables):
+        path, speed = _TABLE.unpack_from(view, offset)
+        tables.append((PATHS[path], speed))
+        offset += _TABLE.size
+    bullets = take('h', n_bullets * 2)
+    enemy_bullets = take('h', n_enemy_bullets * 2)
+    enemies = take('h', n_enemies * 2)
+    ship_tables, flips = take('b', n_enemies), take('b', n_enemies)
+    columns, starts = take('h', n_enemies), take('i', n_enemies)
+
+    previous_state, previous_stage = game.state, game.stage
+    game.state = STATES[state]
+    game.stage = stage
+    game.score = score
+    game.player_x, game.player_y = player_x, player_y
+    game.player_lives = lives
+    game.speed_boost_active = boost
+    cfg = game.get_stage_config()
+    game.enemy_speed = cfg['enemy_speed']
+    game.enemy_spawn_time = cfg['spawn_time']
+    game.enemy_fire_chance = cfg['fire_chance']
+
+    scheduler = game.scheduler
+    game.run_start_tick = scheduler.now - run_ticks
+    for i, name in enumerate(TIMERS):
+        timer = getattr(game, name)
+        remaining, period = timers[2 * i], timers[2 * i + 1]
+        if math.isnan(remaining):
+            timer.cancel()
+        else:
+            timer.start(remaining, None if math.isnan(period) else period)
+    if game.state == 'PAUSED':
+        scheduler.pause()
+    else:
+        scheduler.resume()
+
+    game.bullets = [pygame.Rect(x, y, BULLET_WIDTH, BULLET_HEIGHT)
+                    for x, y in zip(bullets[::2], bullets[1::2])]
+    game.enemy_bullets = [pygame.Rect(x, y, ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT)
+                          for x, y in zip(enemy_bullets[::2], enemy_bullets[1::2])]
+    game.enemies = [pygame.Rect(x, y, ENEMY_WIDTH, ENEMY_HEIGHT)
+                    for x, y in zip(enemies[::2], enemies[1::2])]
+    game.formations.set_state(game.enemies, frame, tables,
+                              [(t, c, f, frame + s)
+                               for t, c, f, s in zip(ship_tables, columns, flips, starts)])
+    game.particles.clear()
+
+    game.galaxy = None
+    if has_galaxy:
+        x, y, radius, tint, angle, speed, arm_dots = _GALAXY.unpack_from(view, offset)
+        offset += _GALAXY.size
+        game.galaxy = {'x': x, 'y': y, 'radius': radius, 'tint': GALAXY_TINTS[tint],
+                       'angle': angle, 'speed': speed, 'arm_dots': arm_dots}
+    game.celestial_obj = None
+    if has_celestial:
+        kind, x, y, speed, radius, moon_x, moon_y, moon_radius = _CELESTIAL.unpack_from(
+            view, offset)
+        offset += _CELESTIAL.size
+        obj = dict(CELESTIAL_TYPES[CELESTIALS[kind]], type=CELESTIALS[kind], x=x, y=y,
+                   speed=speed, radius=radius)
+        if moon_radius:
+            obj['moon_offset'] = (moon_x, moon_y)
+            obj['moon_radius'] = moon_radius
+        game.celestial_obj = obj
+    if has_rng:
+        *state, gauss_next = _RANDOM.unpack_from(view, offset)
+        random.setstate((3, tuple(state), None if math.isnan(gauss_next) else gauss_next))
+
+    game.menu_frame = None
+    if stage != previous_stage:
+        game.prefetcher.stage_started(stage)
+    if game.state in ('PLAYING', 'PAUSED') and (
+            stage != previous_stage or previous_state not in ('PLAYING', 'PAUSED')):
+        game.music.play(cfg['music'])
+        if game.state == 'PAUSED':
+            game.music.pause()
+
+
+class SnapshotRing:
+    """The latest ``capacity`` snapshots, one every ``interval`` ticks, in fixed memory.
+
+    Each snapshot gets a slot of ``slot_bytes``. A snapshot that does not
+    fit is skipped and counted in ``dropped``. The snapshots leave out the
+    random state (see ``snapshot``).
+    """
+
+    def __init__(self, capacity=REWIND_SNAPSHOTS, interval=REWIND_INTERVAL,
+                 slot_bytes=SNAPSHOT_SLOT_BYTES):
+        self.capacity = capacity
+        self.interval = interval
+        self.slot_bytes = slot_bytes
+        self._buffer = bytearray(capacity * slot_bytes)
+        self._sizes = array('I', bytes(4 * capacity))
+        self._next = 0   # slot the next snapshot goes into
+        self.count = 0   # snapshots held
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Forget every snapshot."""
+        self._next = 0
+        self.count = 0
+
+    def record(self, game):
+        """Take a snapshot if ``game``'s clock is on an interval tick.
+
+        Returns:
+            bool: True if a snapshot was stored.
+        """
+        if game.scheduler.now % self.interval:
+            return False
+        data = snapshot(game, rng=False)
+        if len(data) > self.slot_bytes:
+            self.dropped += 1
+            return False
+        start = self._next * self.slot_bytes
+        self._buffer[start:start + len(data)] = data
+        self._sizes[self._next] = len(data)
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def rewind(self, game, seconds=REWIND_SECONDS):
+        """Restore the snapshot from about ``seconds`` ago, or the oldest one held.
+
+        The snapshots newer than it are dropped, so rewinding again goes
+        further back.
+
+        Returns:
+            bool: False if there was no snapshot to restore.
+        """
+        if not self.count:
+            return False
+        back = min(self.count, max(1, round(seconds * FPS / self.interval)))
+        slot = (self._next - back) % self.capacity
+        start = slot * self.slot_bytes
+        restore(game, memoryview(self._buffer)[start:start + self._sizes[slot]])
+        self._next = slot
+        self.count -= back
+        return True
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Soak test for Space Blaster: an autopilot plays for hours, watching for leaks.
+
+Usage:
+    python soak.py [--minutes 120] [--interval 30] [--report soak-report.json]
+                   [--endless] [--quality NAME] [--realtime] [--no-tracemalloc]
+                   [--seed 0]
+
+The real ``Game`` runs headless (SDL's dummy video and audio drivers),
+steered by ``Autopilot`` through ``Game.autopilot``. A new run starts
+whenever one ends. Every ``--interval`` seconds a sample records:
+
+- RSS, the tracemalloc total and the top allocation sites (growth since
+  the end of the warm-up)
+- entity and particle counts, averaged over the interval's frames
+- sprite cache sizes, and the objects frozen out of garbage collection
+  (which must not grow across runs)
+- update + draw frame times
+
+The warm-up lasts until the first run has ended, or an endless run has
+been through every stage's look, so that the caches hold what a whole
+run draws; it is at least ``SOAK_WARMUP_SAMPLES`` samples. At the end,
+each series' growth from the first to the last third of the samples
+after the warm-up is checked against ``SOAK_LIMITS``. The JSON report
+holds the settings, samples, trends and the verdict. The exit status is
+1 if any series grew past its limit.
+Finished runs go to a temporary score log, not the leaderboard.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from config import (
+    FPS, QUALITY, PLAYER_WIDTH, PLAYER_HEIGHT, AUTOPILOT_DODGE_RANGE, AUTOPILOT_FIRE_EVERY,
+    STAGE_CONFIGS, SOAK_INTERVAL, SOAK_WARMUP_SAMPLES, SOAK_TOP_ALLOCATORS, SOAK_LIMITS,
+)
+
+WANDER = 0.02  # chance per frame of a random move, to vary the runs
+
+
+# ---------- Autopilot ----------
+
+class Autopilot:
+    """Steers under the nearest enemy and dodges enemy lasers close overhead.
+
+    ``env.scripted_actions`` plays by the same rules in the batched
+    environment. Call it with the game each frame (``Game.autopilot``).
+
+    Returns:
+        tuple: ``(dx, fire)``.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.frame = 0
+
+    def __call__(self, game):
+        self.frame += 1
+        cx = game.player_x + PLAYER_WIDTH // 2
+        top = game.player_y - AUTOPILOT_DODGE_RANGE
+        bottom = game.player_y + PLAYER_HEIGHT
+        threat = next((eb for eb in game.enemy_bullets
+                       if top < eb.y < bottom and abs(eb.centerx - cx) < PLAYER_WIDTH), None)
+        if threat is not None:
+            dx = 1 if threat.centerx <= cx else -1
+        else:
+            target = min(game.enemies, key=lambda e: abs(e.centerx - cx), default=None)
+            dx = 0 if target is None else (target.centerx > cx + 4) - (target.centerx < cx - 4)
+        if self.rng.random() < WANDER:
+            dx = self.rng.choice((-1, 0, 1))
+        return dx, self.frame % AUTOPILOT_FIRE_EVERY == 0
+
+
+# ---------- Sampling ----------
+
+def _rss_mb():
+    """Return the resident set size in MB, or None where it cannot be read.
+
+    Without ``/proc`` (outside Linux) this is the peak RSS instead.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _snapshot():
+    # Leave out the tracer's and this module's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+
+
+class Sampler:
+    """Accumulates per-frame measurements and turns them into interval samples."""
+
+    def __init__(self, game, trace):
+        self.game = game
+        self.trace = trace
+        self.baseline = None  # tracemalloc snapshot at the end of the warm-up
+        self.samples = []
+        self.warming_up = True
+        self._start = time.perf_counter()
+        self._reset()
+
+    def _reset(self):
+        self._frame_ms = []
+        self._entities = 0
+        self._particles = 0
+
+    def frame(self, ms):
+        """Record one frame that took ``ms`` to update and draw."""
+        game = self.game
+        self._frame_ms.append(ms)
+        self._entities += len(game.bullets) + len(game.enemies) + len(game.enemy_bullets)
+        self._particles += sum(game.particles.counts().values())
+
+    def sample(self, frames, runs):
+        """Close the interval and append its sample.
+
+        Samples are marked ``warmup`` up to and including the first one
+        taken after the first run ends or an endless run passes the last
+        configured stage.
+
+        Returns:
+            dict: The sample.
+        """
+        import sprites
+
+        warmup = self.warming_up
+        if (warmup and len(self.samples) + 1 >= SOAK_WARMUP_SAMPLES
+                and (runs > 1 or self.game.stage > len(STAGE_CONFIGS))):
+            self.warming_up = False
+        times = sorted(self._frame_ms)
+        n = len(times) or 1
+        sample = {
+            'elapsed_s': round(time.perf_counter() - self._start, 1),
+            'frames': frames,
+            'runs': runs,
+            'rss_mb': _rss_mb(),
+            'frame_ms': sum(times) / n,
+            'frame_p99_ms': times[len(times) * 99 // 100] if times else 0.0,
+            'entities': self._entities / n,
+            'particles': self._particles / n,
+            'sprites': sprites.size(),
+            'scaled_sprites': self.game.render_queue.scaled_sprites(),
+            'gc_frozen': gc.get_freeze_count(),
+            'stage': self.game.stage,
+            'warmup': warmup,
+        }
+        if self.trace:
+            sample['traced_mb'] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+            sample['top_allocators'] = self._top_allocators(warmup)
+        self.samples.append(sample)
+        self._reset()
+        return sample
+
+    def _top_allocators(self, warmup):
+        snapshot = _snapshot()
+        if warmup or self.baseline is None:
+            self.baseline = snapshot
+        stats = snapshot.compare_to(self.baseline, 'lineno')[:SOAK_TOP_ALLOCATORS]
+        return [{'where': f'{s.traceback[0].filename}:{s.traceback[0].lineno}',
+                 'size_kb': round(s.size / 1024, 1), 'growth_kb': round(s.size_diff / 1024, 1),
+                 'count': s.count}
+                for s in stats]
+
+
+def trends(samples, limits=SOAK_LIMITS):
+    """Compare the first and last third of the post-warm-up samples per series.
+
+    Returns:
+        dict: Per series ``first``, ``last``, ``growth``, ``limit`` and
+        ``failed``; series without readings are left out.
+    """
+    samples = [s for s in samples if not s.get('warmup')]
+    third = len(samples) // 3
+    result = {}
+    for name, limit in limits.items():
+        values = [s[name] for s in samples if s.get(name) is not None]
+        if not values:
+            continue
+        if third == 0:
+            result[name] = {'first': None, 'last': None, 'growth': None, 'limit': limit,
+                            'failed': False,
+                            'note': 'too few samples after the warm-up for a trend'}
+            continue
+        first = sum(values[:third]) / third
+        last = sum(values[-third:]) / third
+        result[name] = {'first': round(first, 3), 'last': round(last, 3),
+                        'growth': round(last - first, 3), 'limit': limit,
+                        'failed': last - first > limit}
+    return result
+
+
+# ---------- Soak run ----------
+
+def soak(args):
+    """Play until ``args.minutes`` have passed.
+
+    Returns:
+        dict: The report.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    if args.trace:
+        tracemalloc.start()
+    import pygame
+    import score
+    from game import Game
+
+    with tempfile.TemporaryDirectory() as score_dir:
+        score.SCORE_LOG = os.path.join(score_dir, 'scores.jsonl')
+        score.SCORE_INDEX = os.path.join(score_dir, 'scores.idx.json')
+        score.LOCK_FILE = score.SCORE_LOG + '.lock'
+        random.seed(args.seed)
+        game = Game(quality=args.quality, endless=args.endless)
+        game.autopilot = Autopilot(args.seed)
+        game.reset()
+        sampler = Sampler(game, args.trace)
+        started = time.time()
+        end = time.perf_counter() + args.minutes * 60
+        next_sample = time.perf_counter() + args.interval
+        frames, runs = 0, 1
+        while True:
+            now = time.perf_counter()
+            if now >= next_sample:
+                s = sampler.sample(frames, runs)
+                print(f'[{s["elapsed_s"]:8.0f} s] run {runs}, stage {s["stage"]}, '
+                      f'{frames} frames{" (warm-up)" if s["warmup"] else ""}: '
+                      f'frame {s["frame_ms"]:.2f} ms, rss {s["rss_mb"] or 0:.1f} MB, '
+                      f'{s["entities"]:.0f} entities, {s["particles"]:.0f} particles, '
+                      f'{s["sprites"]} sprites', flush=True)
+                next_sample = now + args.interval
+                if now >= end:
+                    break
+            game.handle_events()
+            start = time.perf_counter()
+            game.update()
+            game.music.update()
+            game.draw()
+            sampler.frame((time.perf_counter() - start) * 1000)
+            frames += 1
+            if game.state == 'GAME_OVER' and not game.particles.active:
+                game.reset()
+                runs += 1
+            if args.realtime:
+                game.pacer.tick(FPS)
+        score.flush_high_scores()
+        pygame.quit()
+
+    results = trends(sampler.samples)
+    failed = [name for name, t in results.items() if t['failed']]
+    last = sampler.samples[-1] if sampler.samples else {}
+    return {
+        'passed': not failed,
+        'failed': failed,
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'duration_s': round(time.time() - started, 1),
+        'frames': frames,
+        'runs': runs,
+        'settings': {'minutes': args.minutes, 'interval': args.interval,
+                     'quality': args.quality, 'endless': args.endless,
+                     'realtime': args.realtime, 'tracemalloc': args.trace, 'seed': args.seed},
+        'warmup_samples': sum(1 for s in sampler.samples if s['warmup']),
+        'trends': results,
+        'top_allocators': last.get('top_allocators', []),
+        'samples': [{k: v for k, v in s.items() if k != 'top_allocators'}
+                    for s in sampler.samples],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=120, help='how long to play')
+    parser.add_argument('--interval', type=float, default=SOAK_INTERVAL,
+                        help='seconds between samples')
+    parser.add_argument('--report', default='soak-report.json', help='JSON report path')
+    parser.add_argument('--endless', action='store_true', help='play endless mode')
+    parser.add_argument('--quality', default=QUALITY, help='graphics preset')
+    parser.add_argument('--realtime', action='store_true',
+                        help=f'pace frames at {FPS} FPS instead of running flat out')
+    parser.add_argument('--no-tracemalloc', dest='trace', action='store_false',
+                        help='skip allocation tracing (faster, no allocator report)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    report = soak(args)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, t in report['trends'].items():
+        if t['growth'] is None:
+            print(f'  {name:<15} {t["note"]}')
+        else:
+            print(f'  {name:<15} {t["first"]:10.2f} -> {t["last"]:10.2f}  '
+                  f'(growth {t["growth"]:+.2f}, limit {t["limit"]})'
+                  f'{"  FAILED" if t["failed"] else ""}')
+    verdict = 'passed' if report['passed'] else f'FAILED ({", ".join(report["failed"])})'
+    print(f'Soak test {verdict}: {report["runs"]} runs, {report["frames"]:,} frames '
+          f'in {report["duration_s"]:.0f} s; report in {args.report}')
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
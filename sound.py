@@ -1,58 +1,283 @@
-"""Procedural sound effect generation for Space Blaster."""
+"""Procedural sound effect generation for Space Blaster.
+
+Effects are synthesized lazily by a ``SoundBank`` the first time they are
+played. Each effect is generated as a small set of pitch/decay variants in
+one vectorized pass, and the resulting PCM is cached on disk under a key
+derived from the synthesis parameters, so later launches only load it.
+Builds that ship a baked asset pack read the PCM from it instead.
+
+A ``VoiceManager`` plays effects on a fixed pool of mixer channels with
+per-effect voice caps, rate limits and priority-based stealing, panned by
+the source x position using pre-panned copies of every variant.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
 
 import pygame
 
+import assetpack
+from config import (
+    SCREEN_WIDTH,
+    SAMPLE_RATE, SOUND_CACHE_DIR, SOUND_VARIANT_PITCH, SOUND_VARIANT_DECAY,
+    SOUND_PAN_STEPS, SOUND_PAN_WIDTH, SOUND_CHANNELS, SOUND_VOICES,
+)
+
+# Bump when the synthesis code changes in a way the parameters don't capture
+SYNTH_VERSION = 1
+
+# Synthesis parameters per effect; any change yields a new cache key
+SOUND_EFFECTS = {
+    # Laser zap: short descending sine sweep with harmonics
+    'laser': {'duration': 0.15, 'freq_start': 1800, 'freq_end': 400, 'decay': 18,
+              'volume': 0.35},
+    # Explosion: burst of shaped noise with a low thump
+    'explosion': {'duration': 0.35, 'thump_freq': 60, 'thump_decay': 12, 'noise_decay': 8,
+                  'seed': 7, 'volume': 0.4},
+    # Player hit: short harsh buzz
+    'hit': {'duration': 0.25, 'freq': 150, 'decay': 10, 'volume': 0.3},
+}
+
+
+# ---------- Synthesis ----------
+
+def _synth_laser(np, t, p, pitch, decay):
+    freq_sweep = (p['freq_start'] + (p['freq_end'] - p['freq_start'])
+                  * (t / p['duration'])) * pitch
+    phase = 2 * np.pi * np.cumsum(freq_sweep, axis=1) / SAMPLE_RATE
+    wave = 0.45 * np.sin(phase) + 0.15 * np.sin(phase * 2)
+    return wave * np.exp(-t * p['decay'] * decay)
+
+
+def _synth_explosion(np, t, p, pitch, decay):
+    rng = np.random.default_rng(p['seed'])
+    noise = rng.uniform(-1, 1, (pitch.shape[0], t.shape[1]))
+    thump = (0.6 * np.sin(2 * np.pi * p['thump_freq'] * pitch * t)
+             * np.exp(-t * p['thump_decay'] * decay))
+    return 0.5 * noise * np.exp(-t * p['noise_decay'] * decay) + thump
+
+
+def _synth_hit(np, t, p, pitch, decay):
+    wave = 0.5 * np.sign(np.sin(2 * np.pi * p['freq'] * pitch * t))
+    return wave * np.exp(-t * p['decay'] * decay)
 
-def init_sounds():
-    """Generate all game sounds using numpy.
+
+_SYNTHS = {'laser': _synth_laser, 'explosion': _synth_explosion, 'hit': _synth_hit}
+
+
+def synthesize(name):
+    """Render all variants of one effect as int16 PCM.
 
     Returns:
-        tuple: (laser_sound, explosion_sound, hit_sound, sounds_available)
+        np.ndarray: Mono samples, shape (variants, samples).
+    """
+    import numpy as np
+
+    p = SOUND_EFFECTS[name]
+    n = int(SAMPLE_RATE * p['duration'])
+    t = np.linspace(0, p['duration'], n, endpoint=False)[None, :]
+    pitch = np.array(SOUND_VARIANT_PITCH)[:, None]
+    decay = np.array(SOUND_VARIANT_DECAY)[:, None]
+    wave = _SYNTHS[name](np, t, p, pitch, decay)
+    return (np.clip(wave, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def cache_key(name):
+    """Hash of everything that determines an effect's samples."""
+    blob = json.dumps({
+        'version': SYNTH_VERSION, 'rate': SAMPLE_RATE, 'params': SOUND_EFFECTS[name],
+        'pitch': SOUND_VARIANT_PITCH, 'decay': SOUND_VARIANT_DECAY,
+    }, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+def _make_sound(pcm, left=1.0, right=1.0):
+    """Convert a mono int16 numpy array into a stereo pygame Sound."""
+    import numpy as np
+
+    stereo = np.empty((len(pcm), 2), np.int16)
+    stereo[:, 0] = pcm * left
+    stereo[:, 1] = pcm * right
+    return pygame.sndarray.make_sound(stereo)
+
+
+def _pan_gains():
+    """(left, right) gains per pan step; equal-power, unity at the center."""
+    import numpy as np
+
+    pans = np.linspace(-SOUND_PAN_WIDTH, SOUND_PAN_WIDTH, SOUND_PAN_STEPS)
+    theta = (pans + 1) * np.pi / 4
+    gains = np.minimum(1.0, np.sqrt(2) * np.stack((np.cos(theta), np.sin(theta)), axis=1))
+    return [tuple(g) for g in gains]
+
+
+# ---------- Sound bank ----------
+
+class SoundBank:
+    """Lazily synthesized, disk-cached sound effects with pitch variants.
+
+    ``play(name)`` picks a random variant each time, from a generator of its
+    own so that sounds never advance the game's ``random`` state (seeded
+    runs and snapshot replays stay the same with sound on or off).
+    ``timings`` maps each loaded effect to ``(source, seconds)`` where
+    source is ``'pack'``, ``'cache'`` or ``'synth'``. Every variant is also
+    kept in ``SOUND_PAN_STEPS`` pre-panned copies for the ``VoiceManager``.
     """
-    try:
+
+    def __init__(self, cache_dir=SOUND_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.timings = {}
+        self._panned = {}
+        self._rng = random.Random()
+        try:
+            import numpy  # noqa: F401
+            self.available = True
+        except ImportError:
+            print("Note: numpy not found — running without sound effects.")
+            self.available = False
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f'{name}-{cache_key(name)}.npy')
+
+    def load_pcm(self, name):
+        """Return the int16 variant array for an effect, from the asset pack, cache or synthesis."""
         import numpy as np
 
-        SAMPLE_RATE = 44100
-
-        def _make_sound(samples_array):
-            """Convert a float64 numpy array (-1..1) into a pygame Sound."""
-            samples_array = np.clip(samples_array, -1.0, 1.0)
-            pcm = (samples_array * 32767).astype(np.int16)
-            stereo = np.column_stack((pcm, pcm))
-            return pygame.sndarray.make_sound(stereo)
-
-        # Laser zap: short descending sine sweep with harmonics
-        dur_laser = 0.15
-        t_l = np.linspace(0, dur_laser, int(SAMPLE_RATE * dur_laser), endpoint=False)
-        freq_start, freq_end = 1800, 400
-        freq_sweep = freq_start + (freq_end - freq_start) * (t_l / dur_laser)
-        phase = 2 * np.pi * np.cumsum(freq_sweep) / SAMPLE_RATE
-        laser_wave = 0.45 * np.sin(phase) + 0.15 * np.sin(phase * 2)
-        env = np.exp(-t_l * 18)
-        laser_wave *= env
-        laser_sound = _make_sound(laser_wave)
-        laser_sound.set_volume(0.35)
-
-        # Explosion: burst of shaped noise with a low thump
-        dur_exp = 0.35
-        t_e = np.linspace(0, dur_exp, int(SAMPLE_RATE * dur_exp), endpoint=False)
-        noise = np.random.uniform(-1, 1, len(t_e))
-        thump = 0.6 * np.sin(2 * np.pi * 60 * t_e) * np.exp(-t_e * 12)
-        noise_env = np.exp(-t_e * 8)
-        explosion_wave = 0.5 * noise * noise_env + thump
-        explosion_sound = _make_sound(explosion_wave)
-        explosion_sound.set_volume(0.4)
-
-        # Player hit: short harsh buzz
-        dur_hit = 0.25
-        t_h = np.linspace(0, dur_hit, int(SAMPLE_RATE * dur_hit), endpoint=False)
-        hit_wave = 0.5 * np.sign(np.sin(2 * np.pi * 150 * t_h))
-        hit_wave *= np.exp(-t_h * 10)
-        hit_sound = _make_sound(hit_wave)
-        hit_sound.set_volume(0.3)
-
-        return laser_sound, explosion_sound, hit_sound, True
-
-    except ImportError:
-        print("Note: numpy not found — running without sound effects.")
-        return None, None, None, False
+        start = time.perf_counter()
+        path = self._cache_path(name)
+        pack = assetpack.default()
+        pcm = pack.pcm(name, cache_key(name)) if pack is not None else None
+        if pcm is not None:
+            source = 'pack'
+        else:
+            try:
+                pcm = np.load(path)
+                source = 'cache'
+            except (OSError, ValueError):
+                pcm = None
+        if pcm is None:
+            pcm = synthesize(name)
+            source = 'synth'
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, pcm)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # read-only install: synthesize again next launch
+        self.timings[name] = (source, time.perf_counter() - start)
+        return pcm
+
+    def panned(self, name):
+        """Return Sounds indexed [variant][pan step], loading the effect on first use."""
+        table = self._panned.get(name)
+        if table is None:
+            volume = SOUND_EFFECTS[name]['volume']
+            gains = _pan_gains()
+            table = [[_make_sound(v, left, right) for left, right in gains]
+                     for v in self.load_pcm(name)]
+            for row in table:
+                for s in row:
+                    s.set_volume(volume)
+            self._panned[name] = table
+        return table
+
+    def variants(self, name):
+        """Return the centered Sound of every variant of an effect."""
+        center = SOUND_PAN_STEPS // 2
+        return [row[center] for row in self.panned(name)]
+
+    def get(self, name):
+        """Return a random variant of an effect, or None without sound."""
+        if not self.available:
+            return None
+        return self._rng.choice(self.variants(name))
+
+    def play(self, name):
+        """Play a random variant of an effect (no-op without sound)."""
+        sound = self.get(name)
+        if sound is not None:
+            sound.play()
+
+    def preload(self):
+        """Load every effect now instead of on first use."""
+        if self.available:
+            for name in SOUND_EFFECTS:
+                self.panned(name)
+
+
+# ---------- Voice management ----------
+
+class VoiceManager:
+    """Plays bank effects on a fixed channel pool with caps, priorities and pan.
+
+    An effect at its voice cap restarts its own oldest voice. Otherwise it
+    takes a free channel, or steals the oldest voice of a lower-priority
+    effect; failing that it is dropped. Starts closer together than the
+    effect's ``min_interval`` are skipped. ``stats`` counts each outcome.
+    """
+
+    def __init__(self, bank, voices=SOUND_VOICES, num_channels=SOUND_CHANNELS):
+        self.bank = bank
+        self.voices = voices
+        self.available = bank.available and pygame.mixer.get_init() is not None
+        self.stats = {'played': 0, 'stolen': 0, 'dropped': 0, 'rate_limited': 0}
+        self._rng = random.Random()  # variant picks, apart from the game's random state
+        self._last_start = {name: -10 ** 9 for name in voices}
+        self._owner = [None] * num_channels  # (name, priority, start_ms) per channel
+        self._channels = []
+        if self.available:
+            if pygame.mixer.get_num_channels() < num_channels:
+                pygame.mixer.set_num_channels(num_channels)
+            pygame.mixer.set_reserved(num_channels)
+            self._channels = [pygame.mixer.Channel(i) for i in range(num_channels)]
+
+    def play(self, name, x=None):
+        """Play an effect, panned by screen x position when given.
+
+        Returns:
+            pygame.mixer.Channel or None: The channel used, if any.
+        """
+        if not self.available:
+            return None
+        cfg = self.voices[name]
+        now = pygame.time.get_ticks()
+        if now - self._last_start[name] < cfg['min_interval']:
+            self.stats['rate_limited'] += 1
+            return None
+
+        owner = self._owner
+        for i, ch in enumerate(self._channels):
+            if owner[i] is not None and not ch.get_busy():
+                owner[i] = None
+
+        mine = [i for i, o in enumerate(owner) if o is not None and o[0] == name]
+        if len(mine) >= cfg['cap']:
+            slot = min(mine, key=lambda i: owner[i][2])
+        elif None in owner:
+            slot = owner.index(None)
+        else:
+            lower = [i for i, o in enumerate(owner) if o[1] < cfg['priority']]
+            if not lower:
+                self.stats['dropped'] += 1
+                return None
+            slot = min(lower, key=lambda i: (owner[i][1], owner[i][2]))
+        if owner[slot] is not None:
+            self.stats['stolen'] += 1
+
+        if x is None:
+            pan = SOUND_PAN_STEPS // 2
+        else:
+            frac = min(1.0, max(0.0, x / SCREEN_WIDTH))
+            pan = round(frac * (SOUND_PAN_STEPS - 1))
+        sound = self._rng.choice(self.bank.panned(name))[pan]
+        channel = self._channels[slot]
+        channel.play(sound)
+        owner[slot] = (name, cfg['priority'], now)
+        self._last_start[name] = now
+        self.stats['played'] += 1
+        return channel
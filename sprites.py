@@ -0,0 +1,184 @@
+"""Cache of pre-rendered sprites for Space Blaster.
+
+Deterministic artwork — ship hulls, laser beams, celestial bodies, particle
+blobs — is drawn once into a premultiplied-alpha surface and reused; blit
+these surfaces with ``special_flags=BLEND``. Each sprite is first looked up
+in the baked asset pack (see ``bake.py``) and only rendered procedurally
+when the pack is missing, stale or lacks that key.
+
+``glow`` says whether ships, lasers and celestial bodies carry their own
+translucent glow; it is off while the bloom pass (``bloom.py``) draws glow
+for the whole frame, and is part of those sprites' keys.
+"""
+
+import pygame
+
+import assetpack
+from config import SPRITE_FADE_STEPS
+
+BLEND = pygame.BLEND_PREMULTIPLIED
+
+_cache = {}
+_rle = {}  # sprite -> (source, flags) to blit it with in software
+_rle_copies = set()
+_trimmed = {}  # sprite -> (copy without its transparent border, (dx, dy) of the copy)
+stats = {'pack': 0, 'built': 0}
+glow = True
+
+
+def get(key, build, *args):
+    """Return the sprite for ``key``, rendering it with ``build(*args)`` on a miss.
+
+    ``key`` is a tuple of strings, ints and tuples that fully determines the
+    image; ``build`` returns a premultiplied SRCALPHA Surface.
+    """
+    surf = _cache.get(key)
+    if surf is None:
+        pack = assetpack.default()
+        surf = pack.surface(key) if pack is not None else None
+        if surf is None:
+            surf = build(*args)
+            stats['built'] += 1
+        else:
+            stats['pack'] += 1
+        _cache[key] = surf
+    return surf
+
+
+def set_glow(enabled):
+    """Turn per-object glow in newly fetched sprites on or off."""
+    global glow
+    glow = enabled
+
+
+def cached():
+    """Return every sprite currently in the cache, by key."""
+    return dict(_cache)
+
+
+def size():
+    """Return the number of cached sprites, RLE and trimmed copies included."""
+    return len(_cache) + len(_rle) + len(_trimmed)
+
+
+def clear():
+    """Drop all cached sprites."""
+    _cache.clear()
+    _rle.clear()
+    _rle_copies.clear()
+    _trimmed.clear()
+
+
+def evict(stale):
+    """Drop every cached sprite whose key ``stale(key)`` is true, with its copies.
+
+    Returns:
+        int: The number of sprites dropped.
+    """
+    dropped = 0
+    for key in [key for key in list(_cache) if stale(key)]:
+        surf = _cache.pop(key, None)
+        if surf is None:
+            continue
+        entry = _rle.pop(surf, None)
+        if entry is not None:
+            _rle_copies.discard(entry[0])
+        _trimmed.pop(surf, None)
+        dropped += 1
+    return dropped
+
+
+def rle(surf):
+    """Return ``(source, special_flags)`` to blit a large sprite fast in software.
+
+    The source is a cached straight-alpha copy with SDL's RLE acceleration,
+    which skips transparent runs: for a ship sprite that is about three
+    times faster than a ``BLEND`` blit of the original. Without NumPy it
+    is the sprite itself with ``BLEND``.
+    """
+    entry = _rle.get(surf)
+    if entry is None:
+        try:
+            copy = unpremultiplied(surf)
+        except ImportError:
+            entry = (surf, BLEND)
+        else:
+            copy.set_alpha(255, pygame.RLEACCEL)
+            _rle_copies.add(copy)
+            entry = (copy, 0)
+        _rle[surf] = entry
+    return entry
+
+
+def is_rle(surf):
+    """True if ``surf`` is a copy returned by ``rle``, which lives as long as its sprite."""
+    return surf in _rle_copies
+
+
+def trimmed(surf):
+    """Return ``(copy, (dx, dy))``: a sprite cropped to its visible pixels.
+
+    The copy is still premultiplied, and drawn at ``(x + dx, y + dy)`` it
+    covers exactly what the sprite drawn at ``(x, y)`` would. Blitting it
+    skips the fully transparent border, which is most of the cost for
+    sprites drawn by the thousand such as laser beams.
+    """
+    entry = _trimmed.get(surf)
+    if entry is None:
+        rect = surf.get_bounding_rect()
+        copy = surf.subsurface(rect).copy() if rect.size != surf.get_size() else surf
+        entry = _trimmed[surf] = (copy, rect.topleft)
+    return entry
+
+
+# ---------- Building ----------
+
+def canvas(w, h):
+    """Return a transparent surface to draw a sprite on."""
+    return pygame.Surface((w, h), pygame.SRCALPHA)
+
+
+def premultiplied(surf):
+    """Return a premultiplied copy of a straight-alpha SRCALPHA surface.
+
+    Surfaces with padded rows (such as font renders) are repacked first:
+    ``premul_alpha`` assumes tightly packed pixels.
+    """
+    if surf.get_pitch() != surf.get_width() * 4:
+        packed = canvas(*surf.get_size())
+        packed.blit(surf, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        surf = packed
+    return surf.premul_alpha()
+
+
+def unpremultiplied(surf):
+    """Return a straight-alpha copy of a premultiplied sprite (needs NumPy)."""
+    import numpy as np
+
+    out = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
+    alpha = pygame.surfarray.array_alpha(surf).astype(np.uint32)
+    rgb = pygame.surfarray.array3d(surf).astype(np.uint32)
+    rgb = np.minimum(255, rgb * 255 // np.maximum(alpha, 1)[..., None])
+    pygame.surfarray.blit_array(out, rgb.astype(np.uint8))
+    pygame.surfarray.pixels_alpha(out)[...] = alpha
+    return out
+
+
+def layer(dest, surf, pos):
+    """Composite a straight-alpha surface onto a premultiplied sprite canvas.
+
+    Opaque shapes can be drawn on the canvas directly; translucent ones are
+    drawn on their own surface and layered with this, which keeps the
+    blending exact where the canvas is still transparent.
+    """
+    dest.blit(premultiplied(surf), pos, special_flags=BLEND)
+
+
+def fade_level(frac):
+    """Quantize a 0..1 fade fraction to one of ``SPRITE_FADE_STEPS`` cached levels."""
+    return min(SPRITE_FADE_STEPS, max(0, round(frac * SPRITE_FADE_STEPS)))
+
+
+def fade_alpha(level, max_alpha=255):
+    """Alpha for a fade level, as passed to the sprite builders."""
+    return int(max_alpha * level / SPRITE_FADE_STEPS)
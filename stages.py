@@ -0,0 +1,43 @@
+"""Stage settings for Space Blaster, including endless mode's procedural stages.
+
+The first stages are the hand-made ``STAGE_CONFIGS``. In the normal game
+the last of them lasts until the run ends. In endless mode every stage
+after it is generated: it borrows the look (background, enemy colors,
+celestial body) of the configured stages in turn, keeps the last stage's
+music intensity, and ramps the difficulty by the ``ENDLESS_*`` factors in
+``config.py``.
+"""
+
+import functools
+
+from config import (
+    STAGE_CONFIGS,
+    ENDLESS_SPAWN_RATE, ENDLESS_MIN_SPAWN_TIME, ENDLESS_FIRE_RATE, ENDLESS_MAX_FIRE_CHANCE,
+    ENDLESS_SPEED_STEP, ENDLESS_MAX_ENEMY_SPEED,
+)
+
+
+@functools.lru_cache(maxsize=64)
+def stage_config(stage, endless=False):
+    """Return the config dict for a stage (numbered from 1).
+
+    The dicts are shared: treat them as read-only.
+    """
+    if stage <= len(STAGE_CONFIGS) or not endless:
+        return STAGE_CONFIGS[min(stage, len(STAGE_CONFIGS)) - 1]
+    last = STAGE_CONFIGS[-1]
+    look = STAGE_CONFIGS[(stage - 1) % len(STAGE_CONFIGS)]
+    k = stage - len(STAGE_CONFIGS)  # stages past the last configured one
+    return dict(
+        look,
+        enemy_speed=min(ENDLESS_MAX_ENEMY_SPEED, last['enemy_speed'] + ENDLESS_SPEED_STEP * k),
+        spawn_time=max(ENDLESS_MIN_SPAWN_TIME,
+                       round(last['spawn_time'] / ENDLESS_SPAWN_RATE ** k)),
+        fire_chance=min(ENDLESS_MAX_FIRE_CHANCE, last['fire_chance'] * ENDLESS_FIRE_RATE ** k),
+        music=dict(look['music'], intensity=last['music']['intensity']),
+    )
+
+
+def is_last_stage(stage, endless=False):
+    """Return True if no stage follows ``stage``."""
+    return not endless and stage >= len(STAGE_CONFIGS)
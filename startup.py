@@ -0,0 +1,55 @@
+"""Startup phase timing for ``main.py --startup-report``."""
+
+import threading
+import time
+
+
+class StartupTimer:
+    """Records named phases as wall-clock offsets from process start.
+
+    Disabled timers accept every call and do nothing, so the game can mark
+    phases unconditionally.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self._phases = []
+        self._background = []
+        self._reported = False
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        """End the current foreground phase under the given name."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._phases.append((phase, now - self._last, now - self.t0))
+        self._last = now
+
+    def mark_background(self, phase, started):
+        """Record a phase that ran on another thread from ``started`` until now."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            self._background.append((phase, now - started, now - self.t0))
+            late = self._reported
+        if late:
+            print(f'  [bg] {phase:<26}{(now - started) * 1000:9.1f} ms  '
+                  f'(ready at {(now - self.t0) * 1000:.1f} ms)')
+
+    def report(self):
+        """Print the per-phase breakdown (once)."""
+        if not self.enabled or self._reported:
+            return
+        with self._lock:
+            self._reported = True
+            background = list(self._background)
+        print('Startup report (ms):')
+        print(f'  {"phase":<31}{"took":>9}   {"at":>9}')
+        for phase, took, at in self._phases:
+            print(f'  {phase:<31}{took * 1000:9.1f}   {at * 1000:9.1f}')
+        for phase, took, at in background:
+            print(f'  [bg] {phase:<26}{took * 1000:9.1f}   {at * 1000:9.1f}')
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Difficulty sweep for Space Blaster: simulate many sessions per parameter set.
+
+Usage:
+    python sweep.py PARAM=V1,V2,... [PARAM=...] [--stage N] [--sessions 256]
+                    [--minutes 5] [--workers 0] [--seed 0] [--out results.csv]
+
+PARAM is ``enemy_speed``, ``spawn_time`` or ``fire_chance``. Every
+combination of the listed values is one grid point. Without ``--stage``
+the values are multipliers on every stage in ``STAGE_CONFIGS``. With
+``--stage N`` they replace stage N's values. For example:
+
+    python sweep.py enemy_speed=0.8,1,1.2 fire_chance=1,1.5,2
+    python sweep.py --stage 3 spawn_time=1000,1400,1800
+
+Each grid point plays ``--sessions`` games of the batched environment
+(``env.BatchEnv``) with the scripted player (``env.scripted_actions``).
+Enemies come in each stage's ``formations``, flying the game's paths.
+A session ends when the player runs out of lives, or is cut off after
+``--minutes`` of game time. The sessions are split into tasks of
+``SWEEP_CHUNK`` that run on a process pool, so a sweep scales with the
+number of cores. Every grid point replays the same random seeds, which
+keeps the comparisons between points fair.
+
+The table reports, per grid point:
+
+- survival time (mean and 10th/50th/90th percentiles, in seconds)
+- the share of sessions cut off while still alive
+- score (mean and median)
+- the distribution of the stage reached
+
+``--out`` also writes it as CSV, or as JSON if the name ends in ``.json``.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+from config import FPS, STAGE_CONFIGS, SWEEP_SESSIONS, SWEEP_MAX_MINUTES, SWEEP_CHUNK
+from env import BatchEnv, scripted_actions
+
+PARAMS = ('enemy_speed', 'spawn_time', 'fire_chance')
+
+
+# ---------- Grid ----------
+
+def parse_grid(specs):
+    """Parse ``PARAM=V1,V2`` strings into ``[(param, [values])]``.
+
+    Raises ``ValueError`` for unknown parameters or values that are not numbers.
+    """
+    grid = []
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in PARAMS:
+            raise ValueError(f'unknown parameter {name!r} (use {", ".join(PARAMS)})')
+        grid.append((name, [float(v) for v in values.split(',')]))
+    return grid
+
+
+def grid_points(grid):
+    """Return every combination of the grid's values as a dict per point."""
+    names = [name for name, _ in grid]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(v for _, v in grid))]
+
+
+def stage_configs(point, stage=None):
+    """Return ``STAGE_CONFIGS`` with a grid point applied.
+
+    Values replace stage ``stage``'s settings, or multiply every stage's
+    settings when ``stage`` is None.
+    """
+    configs = [dict(c) for c in STAGE_CONFIGS]
+    for name, value in point.items():
+        if stage is None:
+            for c in configs:
+                c[name] *= value
+        else:
+            configs[stage - 1][name] = value
+    return configs
+
+
+# ---------- Simulation (worker processes) ----------
+
+def run_sessions(configs, sessions, seed, max_frames):
+    """Play ``sessions`` games to their end or to ``max_frames``.
+
+    Returns:
+        tuple: Per session: frames survived, score, stage reached and
+        whether it was cut off, as NumPy arrays.
+    """
+    env = BatchEnv(sessions, seed=seed, stage_configs=configs)
+    frames = np.full(sessions, max_frames, np.int64)
+    score = np.zeros(sessions, np.int64)
+    stage = np.zeros(sessions, np.int32)
+    over = np.zeros(sessions, bool)
+    for frame in range(1, max_frames + 1):
+        _, _, dones = env.step(scripted_actions(env, frame))
+        ended = dones & ~over
+        if ended.any():
+            # Finished games restart at once; only each session's first counts
+            frames[ended] = env.final_frames[ended]
+            score[ended] = env.final_score[ended]
+            stage[ended] = env.final_stage[ended]
+            over |= ended
+            if over.all():
+                break
+    alive = ~over
+    score[alive] = env.score[alive]
+    stage[alive] = env.stage[alive]
+    return frames, score, stage, alive
+
+
+# ---------- Sweep ----------
+
+def summarize(point, frames, score, stage, cut_off):
+    """Aggregate one grid point's sessions into a results row.
+
+    Returns:
+        dict: The row.
+    """
+    seconds = frames / FPS
+    p10, p50, p90 = np.percentile(seconds, (10, 50, 90))
+    row = dict(point)
+    row.update({
+        'sessions': len(frames),
+        'survival_mean_s': round(float(seconds.mean()), 1),
+        'survival_p10_s': round(float(p10), 1),
+        'survival_p50_s': round(float(p50), 1),
+        'survival_p90_s': round(float(p90), 1),
+        'cut_off_pct': round(float(cut_off.mean()) * 100, 1),
+        'score_mean': round(float(score.mean())),
+        'score_p50': round(float(np.median(score))),
+    })
+    counts = np.bincount(stage, minlength=len(STAGE_CONFIGS) + 1)[1:]
+    for i, count in enumerate(counts, 1):
+        row[f'stage{i}_pct'] = round(count / len(stage) * 100, 1)
+    return row
+
+
+def sweep(grid, stage=None, sessions=SWEEP_SESSIONS, minutes=SWEEP_MAX_MINUTES,
+          workers=0, seed=0):
+    """Simulate every grid point on a process pool.
+
+    Returns:
+        list: One results row (see ``summarize``) per grid point.
+    """
+    points = grid_points(grid)
+    max_frames = int(minutes * 60 * FPS)
+    chunks = [min(SWEEP_CHUNK, sessions - lo) for lo in range(0, sessions, SWEEP_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    results = [[] for _ in points]
+    with concurrent.futures.ProcessPoolExecutor(workers or multiprocessing.cpu_count()) as pool:
+        futures = {pool.submit(run_sessions, stage_configs(point, stage), n, s, max_frames): i
+                   for i, point in enumerate(points) for n, s in zip(chunks, seeds)}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            results[futures[future]].append(future.result())
+            print(f'\r  {done}/{len(futures)} tasks', end='', flush=True)
+    print()
+    return [summarize(point, *(np.concatenate(parts) for parts in zip(*chunk_results)))
+            for point, chunk_results in zip(points, results)]
+
+
+def print_table(rows, grid):
+    """Print the results rows as an aligned table."""
+    names = [name for name, _ in grid]
+    stages = [k for k in rows[0] if k.startswith('stage')]
+    header = (''.join(f'{n:>13}' for n in names)
+              + f'{"survival s (mean p10/p50/p90)":>32}{"cut off":>9}{"score mean/p50":>16}'
+              + '   stage reached ' + ' '.join(f'{k[5:-4]:>5}' for k in stages))
+    print(header)
+    for row in rows:
+        print(''.join(f'{row[n]:>13g}' for n in names)
+              + f'{row["survival_mean_s"]:>10.1f} {row["survival_p10_s"]:>6.1f}/'
+                f'{row["survival_p50_s"]:.1f}/{row["survival_p90_s"]:.1f}'.rjust(22)
+              + f'{row["cut_off_pct"]:>8.1f}%'
+              + f'{row["score_mean"]:>9}/{row["score_p50"]:<6}'
+              + '                 ' + ' '.join(f'{row[k]:>4.0f}%' for k in stages))
+
+
+def write_results(rows, path):
+    """Write the results rows as CSV, or JSON if ``path`` ends in .json."""
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.json'):
+            json.dump(rows, f, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('grid', nargs='+', help='PARAM=V1,V2,... (repeatable)')
+    parser.add_argument('--stage', type=int, choices=range(1, len(STAGE_CONFIGS) + 1),
+                        help='set this stage\'s values instead of scaling every stage')
+    parser.add_argument('--sessions', type=int, default=SWEEP_SESSIONS,
+                        help='simulated sessions per grid point')
+    parser.add_argument('--minutes', type=float, default=SWEEP_MAX_MINUTES,
+                        help='game time after which a session is cut off')
+    parser.add_argument('--workers', type=int, default=0, help='worker processes, 0 = one per core')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--out', help='also write the results to this CSV or JSON file')
+    args = parser.parse_args()
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    workers = args.workers or multiprocessing.cpu_count()
+    points = len(grid_points(grid))
+    print(f'Sweeping {points} grid points x {args.sessions} sessions on {workers} workers')
+    start = time.perf_counter()
+    rows = sweep(grid, args.stage, args.sessions, args.minutes, workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print_table(rows, grid)
+    played = sum(r['survival_mean_s'] * r['sessions'] for r in rows) * FPS
+    print(f'{points * args.sessions} sessions in {elapsed:.1f} s '
+          f'({played / elapsed:,.0f} session frames/s)')
+    if args.out:
+        write_results(rows, args.out)
+
+
+if __name__ == '__main__':
+    main()